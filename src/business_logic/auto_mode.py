@@ -0,0 +1,257 @@
+"""``auto`` mode: pick the parser mode, worker count and chunk size for a log.
+
+The choice uses the log size, how much of the log the type filter keeps (estimated from
+a few header-only samples) and the cores available. When a calibration file written by
+the benchmark harness (``python -m src bench LOG --calibrate``) matches this machine, the
+mode with the lowest predicted time wins; otherwise a fixed rule picks it.
+"""
+
+import json
+import os
+import platform
+import time
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Set
+
+from src.business_logic.backends import InterpreterBackend
+from src.business_logic.mav_core import scan_fmts, walkable_fmts
+from src.business_logic.sources import DEFAULT_IO, BlockReader, index_dir, open_log
+from src.business_logic.summary import summarize_range
+
+CALIBRATION_ENV_VAR = "BIN_READER_CALIBRATION"
+CALIBRATION_VERSION = 1
+SAMPLE_WINDOWS = 4
+SAMPLE_BYTES = 1 << 20
+SMALL_LOG = 16 << 20
+MIN_CHUNK = 4 << 20
+CHUNKS_PER_WORKER = 2
+MAX_WORKERS = 16
+# below this share of the log the filtered modes send little data back from the workers
+SELECTIVE = 0.25
+
+
+def calibration_path() -> Path:
+    """``$BIN_READER_CALIBRATION`` or ``calibration.json`` next to the block indexes (``sources.index_dir``)."""
+    override = os.environ.get(CALIBRATION_ENV_VAR)
+    if override:
+        return Path(override)
+    return Path(index_dir()) / "calibration.json"
+
+
+def _has_numpy() -> bool:
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _machine() -> Dict[str, Any]:
+    return {"cpu_count": os.cpu_count() or 1, "python": platform.python_version(), "numpy": _has_numpy()}
+
+
+def available_modes() -> List[str]:
+    modes = ["linear", "threads", "process"]
+    if InterpreterBackend.supported():
+        modes.append("interpreters")
+    return modes
+
+
+# -------------------------
+# Log inspection
+# -------------------------
+def _selectivity(mm: Any, type_filter: Optional[Set[str]]) -> float:
+    """Share of message bytes kept by ``type_filter``, from a few windows spread over the log."""
+    if not type_filter:
+        return 1.0
+    fmts = walkable_fmts(scan_fmts(mm))
+    size = len(mm)
+    starts = sorted({max(0, (size - SAMPLE_BYTES) * i // max(1, SAMPLE_WINDOWS - 1)) for i in range(SAMPLE_WINDOWS)})
+    total = wanted = 0
+    for start in starts:
+        data = mm[start : start + SAMPLE_BYTES]
+        for msg_type, entry in summarize_range(data, 0, len(data), fmts).items():
+            total += entry["bytes"]
+            if fmts[msg_type]["Name"] in type_filter:
+                wanted += entry["bytes"]
+    return wanted / total if total else 1.0
+
+
+def inspect_log(file_path: str, type_filter: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Raw size, block count (None for plain logs) and estimated filter selectivity."""
+    with open_log(file_path) as mm:
+        blocks = len(mm.blocks) if isinstance(mm, BlockReader) else None
+        if blocks is not None and blocks <= 1:
+            # one block cannot be split, and sampling it would decompress all of it
+            return {"size": len(mm), "blocks": blocks, "selectivity": 1.0}
+        selectivity = _selectivity(mm, set(type_filter) if type_filter else None)
+        return {"size": len(mm), "blocks": blocks, "selectivity": selectivity}
+
+
+# -------------------------
+# Planning
+# -------------------------
+def load_calibration(path: Optional[Path] = None) -> Optional[Dict[str, Any]]:
+    """Calibration data for this machine, or None if missing or taken elsewhere."""
+    try:
+        with open(path or calibration_path(), encoding="utf-8") as f:
+            calibration = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if calibration.get("version") != CALIBRATION_VERSION or calibration.get("machine") != _machine():
+        return None
+    return calibration
+
+
+def predict_seconds(entry: Dict[str, float], size: int, selectivity: float) -> float:
+    """Startup plus a per-MB cost interpolated between a skip-everything and a full parse."""
+    per_mb = entry["skip_s_per_mb"] + selectivity * (entry["full_s_per_mb"] - entry["skip_s_per_mb"])
+    return entry["startup_s"] + size / (1 << 20) * per_mb
+
+
+def _workers(size: int, cores: int, blocks: Optional[int]) -> int:
+    workers = min(cores, MAX_WORKERS, max(1, size // MIN_CHUNK))
+    return min(workers, blocks) if blocks else workers
+
+
+def _chunk_size(size: int, workers: int) -> int:
+    return max(MIN_CHUNK, -(-size // (workers * CHUNKS_PER_WORKER)))
+
+
+def choose_plan(
+    file_path: str,
+    type_filter: Optional[List[str]] = None,
+    cores: Optional[int] = None,
+    calibration: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Return ``{"mode", "workers", "chunk_size", "selectivity", "reason"}`` for parsing ``file_path``.
+
+    ``calibration`` defaults to the calibration file when it was recorded on this machine.
+    """
+    cores = cores or os.cpu_count() or 1
+    info = inspect_log(file_path, type_filter)
+    size, selectivity = info["size"], info["selectivity"]
+    workers = _workers(size, cores, info["blocks"])
+    plan = {"mode": "linear", "workers": 1, "chunk_size": None, "selectivity": selectivity}
+
+    if workers == 1 or size < SMALL_LOG:
+        return {**plan, "reason": "small log, single block or single core"}
+
+    calibration = calibration if calibration is not None else load_calibration()
+    if calibration:
+        modes = [mode for mode in available_modes() if mode in calibration["modes"]]
+        estimates = {mode: predict_seconds(calibration["modes"][mode], size, selectivity) for mode in modes}
+        mode = min(estimates, key=estimates.get) if estimates else "linear"
+        reason = "calibration: " + ", ".join(f"{m} {s:.2f}s" for m, s in sorted(estimates.items(), key=lambda x: x[1]))
+    elif _has_numpy():
+        mode, reason = "threads", "bulk NumPy decode runs outside the GIL"
+    elif selectivity <= SELECTIVE:
+        mode, reason = "process", "selective filter keeps worker results small"
+    else:
+        mode, reason = "linear", "full parse: pickling every message costs more than it saves"
+
+    if mode == "linear":
+        return {**plan, "reason": reason}
+    return {**plan, "mode": mode, "workers": workers, "chunk_size": _chunk_size(size, workers), "reason": reason}
+
+
+def create_parser(
+    file_path: str,
+    type_filter: Optional[List[str]] = None,
+    plan: Optional[Dict[str, Any]] = None,
+    io: str = DEFAULT_IO,
+):
+    """Parser for ``plan`` (chosen with ``choose_plan`` if not given), reading with ``io``.
+
+    Both kinds of parser provide ``iter_messages()`` and ``to_dataframes()``.
+    """
+    from src.business_logic.mav_parser_chunked import MAVParserChunked
+    from src.business_logic.mav_parser_linear import MAVParserLinear
+    from src.business_logic.mav_parser_process import MAVParserProcess
+    from src.business_logic.mav_parser_threads import MAVParserThreads
+
+    plan = plan or choose_plan(file_path, type_filter)
+    mode, workers, chunk_size = plan["mode"], plan["workers"], plan["chunk_size"]
+    if mode == "linear":
+        return MAVParserLinear(file_path, type_filter=type_filter, io=io)
+    if mode == "threads":
+        return MAVParserThreads(file_path, type_filter, workers, chunk_size, io=io)
+    if mode == "process":
+        return MAVParserProcess(file_path, type_filter, workers, chunk_size, io=io)
+    return MAVParserChunked(file_path, type_filter, workers, chunk_size, backend=mode, io=io)
+
+
+# -------------------------
+# Calibration
+# -------------------------
+def _time_parse(file_path: str, mode: str, type_filter: Optional[List[str]], cores: int) -> float:
+    size = os.path.getsize(file_path)
+    workers = _workers(size, cores, None)
+    plan = {"mode": mode, "workers": workers, "chunk_size": _chunk_size(size, workers)}
+    start = time.perf_counter()
+    parser = create_parser(file_path, type_filter, plan)
+    if mode == "linear":
+        with parser:
+            parser.parse_all()
+    else:
+        parser.run()
+    return time.perf_counter() - start
+
+
+def _calibration_filter(file_path: str) -> Optional[Dict[str, Any]]:
+    """The message type closest to 5% of the log, for the filtered timing."""
+    from src.business_logic.mav_parser_chunked import MAVParserChunked
+
+    types = MAVParserChunked(file_path).summarize()["types"]
+    total = sum(entry["bytes"] for entry in types.values())
+    if not total:
+        return None
+    candidates = [(abs(entry["bytes"] / total - 0.05), name) for name, entry in types.items() if name != "FMT"]
+    if not candidates:
+        return None
+    name = min(candidates)[1]
+    return {"types": [name], "selectivity": types[name]["bytes"] / total}
+
+
+def calibrate(
+    file_path: str, modes: Optional[List[str]] = None, path: Optional[Path] = None, head_bytes: int = 256 << 10
+) -> Dict[str, Any]:
+    """Time every mode on ``file_path`` (full and filtered) and on its head; write the calibration file.
+
+    Use a log of at least a few hundred MB so the per-MB costs dominate the measurement.
+    """
+    modes = modes or available_modes()
+    cores = os.cpu_count() or 1
+    size = os.path.getsize(file_path)
+    size_mb = size / (1 << 20)
+    sample = _calibration_filter(file_path)
+
+    head_path = Path(str(path or calibration_path()) + ".head.bin")
+    head_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(file_path, "rb") as src, open(head_path, "wb") as dst:
+        dst.write(src.read(head_bytes))
+
+    results: Dict[str, Dict[str, float]] = {}
+    try:
+        for mode in modes:
+            startup = _time_parse(str(head_path), mode, None, cores)
+            full = max(0.0, _time_parse(file_path, mode, None, cores) - startup) / size_mb
+            skip = full
+            if sample and sample["selectivity"] < 1:
+                filtered = max(0.0, _time_parse(file_path, mode, sample["types"], cores) - startup) / size_mb
+                skip = max(0.0, (filtered - sample["selectivity"] * full) / (1 - sample["selectivity"]))
+            results[mode] = {"startup_s": startup, "full_s_per_mb": full, "skip_s_per_mb": skip}
+    finally:
+        head_path.unlink()
+
+    calibration = {
+        "version": CALIBRATION_VERSION,
+        "machine": _machine(),
+        "file_size": size,
+        "filter": sample,
+        "modes": results,
+    }
+    target = Path(path or calibration_path())
+    with open(target, "w", encoding="utf-8") as f:
+        json.dump(calibration, f, indent=2)
+    return calibration
@@ -0,0 +1,238 @@
+"""Execution backends: run a chunk worker over many chunks and yield results in order."""
+
+import marshal
+import os
+import queue
+import sys
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from importlib import import_module
+from multiprocessing import Pool, cpu_count
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from src.utils.logger import (
+    disable_queue_logging,
+    enable_queue_logging,
+    queue_logging_enabled,
+    worker_logging_kwargs,
+)
+
+
+class SerialBackend:
+    """Run every chunk in the calling thread."""
+
+    name = "serial"
+    pickles_args = False
+    fallback: Optional[str] = None
+
+    @classmethod
+    def supported(cls) -> bool:
+        return True
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = 1
+
+    def __enter__(self) -> "SerialBackend":
+        return self
+
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        pass
+
+    def map(self, func: Callable, args_list: Iterable) -> Iterator:
+        return map(func, args_list)
+
+
+class ThreadBackend(SerialBackend):
+    """Run chunks on a thread pool (shares memory, bound by the GIL for pure-Python work)."""
+
+    name = "threads"
+    pickles_args = False
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = workers or min(os.cpu_count() or 8, 16)
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def __enter__(self) -> "ThreadBackend":
+        self._executor = ThreadPoolExecutor(max_workers=self.workers)
+        return self
+
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._executor = None
+
+    def map(self, func: Callable, args_list: Iterable) -> Iterator:
+        return self._executor.map(func, args_list)
+
+
+class ProcessBackend(SerialBackend):
+    """Run chunks on a process pool; arguments and results are pickled."""
+
+    name = "process"
+    pickles_args = True
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = workers or cpu_count()
+        self._pool = None
+        self._owns_logging = False
+
+    def __enter__(self) -> "ProcessBackend":
+        # workers send their records to a listener here instead of writing to the console themselves
+        self._owns_logging = not queue_logging_enabled()
+        enable_queue_logging()
+        self._pool = Pool(processes=self.workers, **worker_logging_kwargs())
+        return self
+
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        if exc_type:
+            self._pool.terminate()
+        else:
+            self._pool.close()
+        self._pool.join()
+        self._pool = None
+        if self._owns_logging:
+            # flushes what the workers logged before the run returns
+            disable_queue_logging()
+
+    def map(self, func: Callable, args_list: Iterable) -> Iterator:
+        return self._pool.imap(func, args_list)
+
+
+@lru_cache(maxsize=None)
+def _interpreters_module() -> Optional[Any]:
+    """PEP 734 interpreters API: public from Python 3.14, shipped under test.support in 3.13."""
+    try:
+        from concurrent import interpreters
+
+        return interpreters
+    except ImportError:
+        pass
+    if sys.version_info < (3, 13):
+        # older test.support.interpreters predates the per-interpreter GIL and queues
+        return None
+    try:
+        from test.support import interpreters
+    except ImportError:
+        return None
+    return interpreters if hasattr(interpreters, "create_queue") else None
+
+
+_ARRAY_KEY = "__array__"
+
+
+def _pack(obj: Any) -> Any:
+    """Make worker output marshal-friendly: ``array.array`` travels as one bytes blob."""
+    if isinstance(obj, array):
+        return {_ARRAY_KEY: (obj.typecode, obj.tobytes())}
+    if isinstance(obj, dict):
+        return {key: _pack(value) for key, value in obj.items()}
+    if isinstance(obj, tuple):
+        return tuple(_pack(value) for value in obj)
+    return obj
+
+
+def _unpack(obj: Any) -> Any:
+    if isinstance(obj, dict):
+        if len(obj) == 1 and _ARRAY_KEY in obj:
+            typecode, data = obj[_ARRAY_KEY]
+            values = array(typecode)
+            values.frombytes(data)
+            return values
+        return {key: _unpack(value) for key, value in obj.items()}
+    if isinstance(obj, tuple):
+        return tuple(_unpack(value) for value in obj)
+    return obj
+
+
+def run_interpreter_task(task: bytes, results: Any) -> None:
+    """Runs inside a sub-interpreter: call the named worker and send back its marshalled result."""
+    module_name, func_name, args = marshal.loads(task)
+    func = getattr(import_module(module_name), func_name)
+    results.put(marshal.dumps(_pack(func(args))))
+
+
+class InterpreterBackend(SerialBackend):
+    """Run chunks in sub-interpreters, each with its own GIL (Python 3.13+).
+
+    Every worker thread drives one long-lived interpreter, so imports happen once per
+    worker rather than once per chunk. Arguments and results cross as ``marshal`` bytes
+    over an interpreter queue, which is much cheaper than pickling through a pipe. The
+    worker function must be a module-level function. Falls back to the process backend
+    when sub-interpreters are not available.
+    """
+
+    name = "interpreters"
+    pickles_args = True
+    fallback = "process"
+
+    @classmethod
+    def supported(cls) -> bool:
+        return _interpreters_module() is not None
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = workers or min(os.cpu_count() or 8, 16)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._idle: "queue.Queue[Any]" = queue.Queue()
+        self._workers: list = []
+
+    def __enter__(self) -> "InterpreterBackend":
+        self._executor = ThreadPoolExecutor(max_workers=self.workers)
+        return self
+
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._executor = None
+        for interp, _ in self._workers:
+            interp.close()
+        self._workers = []
+        self._idle = queue.Queue()
+
+    def _acquire(self) -> Any:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        interpreters = _interpreters_module()
+        interp = interpreters.create()
+        results = interpreters.create_queue()
+        interp.prepare_main(path=tuple(sys.path))
+        # the queue type has to be importable in the sub-interpreter before a queue can be shared
+        interp.exec(f"import sys\nsys.path[:] = list(path)\nimport {type(results).__module__}")
+        interp.prepare_main(results=results)
+        interp.exec("from src.business_logic.backends import run_interpreter_task")
+        worker = (interp, results)
+        self._workers.append(worker)
+        return worker
+
+    def _call(self, task: bytes) -> Any:
+        worker = self._acquire()
+        try:
+            interp, results = worker
+            interp.prepare_main(task=task)
+            interp.exec("run_interpreter_task(task, results)")
+            return _unpack(marshal.loads(results.get()))
+        finally:
+            self._idle.put(worker)
+
+    def map(self, func: Callable, args_list: Iterable) -> Iterator:
+        tasks = (marshal.dumps((func.__module__, func.__qualname__, args)) for args in args_list)
+        return self._executor.map(self._call, tasks)
+
+
+BACKENDS = {
+    SerialBackend.name: SerialBackend,
+    ThreadBackend.name: ThreadBackend,
+    ProcessBackend.name: ProcessBackend,
+    InterpreterBackend.name: InterpreterBackend,
+}
+
+
+def get_backend(name: str, workers: Optional[int] = None):
+    """Instantiate a backend by name, following ``fallback`` when the runtime lacks support."""
+    try:
+        backend_cls = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown backend {name!r}, expected one of {sorted(BACKENDS)}") from None
+    while not backend_cls.supported():
+        backend_cls = BACKENDS[backend_cls.fallback]
+    return backend_cls(workers)
@@ -0,0 +1,336 @@
+"""Bulk chunk decoding with NumPy for the thread backend.
+
+The header walk, the payload gather and the column conversions run as whole-array
+operations, most of which release the GIL, so thread workers decode in parallel without
+the pickling cost of processes. Output is identical to ``mav_core.process_chunk`` and
+``columnar.process_chunk_buffers``; both are used as fallbacks when NumPy is missing.
+"""
+
+from bisect import bisect_left
+from itertools import repeat
+from typing import List, Dict, Any, Tuple, Optional, Set
+
+from src.business_logic.columnar import (
+    buffer_rows,
+    decode_type_buffers,
+    merge_buffers,
+    process_chunk_buffers,
+    read_chunk_records,
+)
+from src.business_logic.mav_core import attach_structs, parse_message, process_chunk
+from src.business_logic.limits import estimate_nbytes
+from src.business_logic.progress import Checkpoint, current_checkpoint
+from src.business_logic.sources import open_range, prefetches
+from src.utils.config import HEADER, FORMAT_TO_STRUCT
+from src.utils.logger import error_reporter
+
+# NumPy field type for every struct character used by FORMAT_TO_STRUCT
+STRUCT_TO_NUMPY = {
+    "b": "i1",
+    "B": "u1",
+    "h": "<i2",
+    "H": "<u2",
+    "i": "<i4",
+    "I": "<u4",
+    "q": "<i8",
+    "Q": "<u8",
+    "f": "<f4",
+    "d": "<f8",
+}
+
+
+def _numpy():
+    try:
+        import numpy
+
+        return numpy
+    except ImportError:
+        return None
+
+
+def record_dtype(fmt_info: Dict[str, Any]) -> Optional[Any]:
+    """Packed structured dtype for one message payload, or None if the format cannot be mapped."""
+    import numpy as np
+
+    if "RecordDtype" in fmt_info:
+        return fmt_info["RecordDtype"]
+
+    fields = []
+    dtype = None
+    if len(fmt_info["Columns"]) == len(fmt_info["Format"]):
+        for col, fmt_char in zip(fmt_info["Columns"], fmt_info["Format"]):
+            code = FORMAT_TO_STRUCT.get(fmt_char)
+            if code is None:
+                break
+            if fmt_char == "a":
+                fields.append((col, "<i2", (32,)))
+            elif code.endswith("s"):
+                fields.append((col, ("V" if col == "Data" else "S") + code[:-1]))
+            else:
+                fields.append((col, STRUCT_TO_NUMPY[code]))
+        else:
+            try:
+                dtype = np.dtype(fields)
+            except (TypeError, ValueError):
+                dtype = None
+    fmt_info["RecordDtype"] = dtype
+    return dtype
+
+
+def locate_messages(data: Any, start: int, end: int, fmts: Dict[int, Dict[str, Any]]) -> Tuple[Any, Any]:
+    """Absolute offsets and types of the messages in [start, end), in file order.
+
+    Finds the same messages as the byte-by-byte walk in ``mav_core.decode_chunk``: header
+    candidates come from one vectorised comparison, and Python only steps through the few
+    places where a candidate overlaps the message before it (a header pattern in a payload).
+    """
+    import numpy as np
+
+    h0, h1 = HEADER
+    limit = end - 3 - start
+    if limit <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.uint8)
+
+    lengths = np.zeros(256, dtype=np.int64)
+    for msg_type, fmt_info in fmts.items():
+        lengths[msg_type] = fmt_info["Length"]
+
+    window = data[start:end]
+    hits = np.flatnonzero((window[:limit] == h0) & (window[1 : limit + 1] == h1))
+    types = window[hits + 2]
+    lens = lengths[types]
+    known = lens > 0
+    hits, types, lens = hits[known], types[known], lens[known]
+    ends = hits + lens
+
+    if len(hits) > 1:
+        # index of the first candidate at or after each message end; the walk follows these links
+        following = np.searchsorted(hits, ends)
+        irregular = np.flatnonzero(following[:-1] != np.arange(1, len(hits))).tolist()
+        if irregular:
+            keep = np.zeros(len(hits), dtype=bool)
+            i = 0
+            while i < len(hits):
+                k = bisect_left(irregular, i)
+                j = irregular[k] if k < len(irregular) else len(hits) - 1
+                keep[i : j + 1] = True
+                i = int(following[j])
+            hits, types, ends = hits[keep], types[keep], ends[keep]
+
+    overflow = np.flatnonzero(ends > end - start)
+    if len(overflow):
+        hits, types = hits[: overflow[0]], types[: overflow[0]]
+    return hits + start, types
+
+
+def gather_records(data: Any, offsets: Any, dtype: Any) -> Tuple[Any, int]:
+    """Copy the payloads at ``offsets`` into one record array; also return how many did not fit."""
+    import numpy as np
+
+    size = dtype.itemsize
+    fits = offsets + 3 + size <= len(data)
+    dropped = int(len(offsets) - np.count_nonzero(fits))
+    offsets = offsets[fits]
+    if not len(offsets) or size == 0:
+        return np.zeros(len(offsets), dtype=dtype), dropped
+    rows = np.lib.stride_tricks.sliding_window_view(data, size)[offsets + 3]
+    return rows.view(dtype)[:, 0], dropped
+
+
+def _message_columns(records: Any, fmt_info: Dict[str, Any], rounding: bool) -> List[list]:
+    """Convert a record array to per-column Python lists with the decoder's scaling and strings."""
+    import numpy as np
+
+    columns = []
+    for kind, col, extra in fmt_info["Processors"]:
+        values = records[col]
+        if kind == "string":
+            decoded: Dict[bytes, str] = {}
+            raw = values.tolist()
+            for item in set(raw):
+                decoded[item] = item.decode("ascii", errors="ignore")
+            columns.append([decoded[item] for item in raw])
+        elif kind in ("bytes", "array"):
+            columns.append(values.tolist())
+        else:
+            scale, round_it = extra
+            if scale != 1:
+                values = values.astype(np.float64) * scale
+            column = values.tolist()
+            if rounding and round_it and values.dtype.kind == "f":
+                column = [round(v, 7) for v in column]
+            columns.append(column)
+    return columns
+
+
+def decode_chunk_bulk(
+    data: Any,
+    start: int,
+    end: int,
+    fmts: Dict[int, Dict[str, Any]],
+    type_filter: Optional[Set[str]] = None,
+    rounding: bool = True,
+    checkpoint: Optional[Checkpoint] = None,
+) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """Bulk equivalent of ``mav_core.decode_chunk`` over a uint8 array of the file.
+
+    ``checkpoint(offset, messages, nbytes)`` is called after each message type, with the
+    offset estimated from the share of the chunk's messages handled so far; when it returns
+    True the remaining types are skipped.
+    """
+    import numpy as np
+
+    offsets, types = locate_messages(data, start, end, fmts)
+    parts: List[Tuple[Any, List[Dict[str, Any]]]] = []
+    errors: Dict[str, int] = {}
+    present, counts = np.unique(types, return_counts=True)
+    handled = done = nbytes = 0
+
+    for msg_type, count in zip(present.tolist(), counts.tolist()):
+        fmt_info = fmts[msg_type]
+        name = fmt_info["Name"]
+        handled += count
+        if type_filter and name not in type_filter:
+            continue
+        type_offsets = offsets[types == msg_type]
+        dtype = record_dtype(fmt_info)
+
+        if dtype is None:
+            view = memoryview(data)
+            decoded = [(off, parse_message(fmt_info, view, off + 3, rounding)) for off in type_offsets.tolist()]
+            good = [(off, msg) for off, msg in decoded if msg is not None]
+            dropped = len(decoded) - len(good)
+            parts.append((np.array([off for off, _ in good], dtype=np.int64), [msg for _, msg in good]))
+        else:
+            fits = type_offsets + 3 + dtype.itemsize <= len(data)
+            records, dropped = gather_records(data, type_offsets, dtype)
+            keys = ["mavpackettype", *(col for _, col, _ in fmt_info["Processors"])]
+            rows = zip(repeat(name), *_message_columns(records, fmt_info, rounding))
+            parts.append((type_offsets[fits], [dict(zip(keys, row)) for row in rows]))
+        if dropped:
+            errors[name] = errors.get(name, 0) + dropped
+        done += len(parts[-1][1])
+        nbytes += estimate_nbytes(parts[-1][1])
+        if checkpoint is not None and checkpoint(start + (end - start) * handled // len(types), done, nbytes):
+            break
+
+    if not parts:
+        return [], errors
+    messages = [msg for _, msgs in parts for msg in msgs]
+    order = np.argsort(np.concatenate([offs for offs, _ in parts]), kind="stable")
+    return [messages[i] for i in order.tolist()], errors
+
+
+def decode_buffers_bulk(
+    data: Any, start: int, end: int, fmts: Dict[int, Dict[str, Any]], type_filter: Optional[Set[str]] = None
+) -> Dict[str, Dict[str, Any]]:
+    """Bulk equivalent of ``scan_offsets`` + ``decode_buffers``: raw NumPy columns per type."""
+    import numpy as np
+
+    offsets, types = locate_messages(data, start, end, fmts)
+    found = {}
+    for msg_type in np.unique(types).tolist():
+        if not type_filter or fmts[msg_type]["Name"] in type_filter:
+            found[msg_type] = offsets[types == msg_type]
+    return decode_offsets_bulk(data, found, fmts)
+
+
+def decode_offsets_bulk(
+    data: Any, offsets: Dict[int, Any], fmts: Dict[int, Dict[str, Any]]
+) -> Dict[str, Dict[str, Any]]:
+    """Bulk equivalent of ``columnar.decode_buffers``: one structured gather per type, not a struct per message."""
+    import numpy as np
+
+    buffers: Dict[str, Dict[str, Any]] = {}
+    for msg_type, type_offsets in offsets.items():
+        fmt_info = fmts[msg_type]
+        if fmt_info["StructSize"] > fmt_info["Length"] - 3:
+            continue
+        type_offsets = np.asarray(type_offsets, dtype=np.int64)
+        dtype = record_dtype(fmt_info)
+        if dtype is None:
+            buffers[fmt_info["Name"]] = decode_type_buffers(memoryview(data), type_offsets.tolist(), fmt_info)
+            continue
+
+        records, _ = gather_records(data, type_offsets, dtype)
+        columns: Dict[str, Any] = {}
+        for kind, col, _ in fmt_info["Processors"]:
+            if kind in ("string", "bytes"):
+                columns[col] = records[col].tolist()
+            else:
+                columns[col] = np.ascontiguousarray(records[col])
+        buffers[fmt_info["Name"]] = columns
+    return buffers
+
+
+def merge_arrays(parts: List[Dict[str, Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    """Concatenate per-chunk NumPy (or ``array.array``) columns in chunk order."""
+    import numpy as np
+
+    collected: Dict[str, Dict[str, list]] = {}
+    for part in parts:
+        for name, columns in part.items():
+            target = collected.setdefault(name, {col: [] for col in columns})
+            for col, values in columns.items():
+                target[col].append(values)
+
+    merged: Dict[str, Dict[str, Any]] = {}
+    for name, columns in collected.items():
+        merged[name] = {}
+        for col, pieces in columns.items():
+            if isinstance(pieces[0], list):
+                merged[name][col] = [item for piece in pieces for item in piece]
+            else:
+                merged[name][col] = np.concatenate([np.asarray(piece) for piece in pieces])
+    return merged
+
+
+def process_chunk_bulk(args) -> Tuple[int, List[Dict[str, Any]]]:
+    """Thread worker: ``mav_core.process_chunk`` with the bulk decoder when NumPy is available."""
+    np = _numpy()
+    index, file_path, chunk, fmts, type_filter, rounding = args
+    if np is None or prefetches(file_path):
+        # "pread" streams the chunk through a prefetch thread instead of reading it in one piece
+        return process_chunk(args)
+
+    attach_structs(fmts)
+    with open_range(file_path, *chunk) as (buf, start, end):
+        data = np.frombuffer(buf, dtype=np.uint8)
+        messages, errors = decode_chunk_bulk(data, start, end, fmts, type_filter, rounding, current_checkpoint())
+        del data
+
+    if errors:
+        error_reporter.report(index, errors)
+    return index, messages
+
+
+def process_chunk_buffers_bulk(args) -> Tuple[int, Dict[str, Dict[str, Any]]]:
+    """Thread worker: ``columnar.process_chunk_buffers`` with the bulk decoder when NumPy is available."""
+    np = _numpy()
+    if np is None:
+        return process_chunk_buffers(args)
+
+    index, file_path, chunk, fmts, type_filter = args
+    attach_structs(fmts)
+    packed = read_chunk_records(file_path, chunk, fmts, type_filter)
+    if packed is not None:
+        data = np.frombuffer(packed[0], dtype=np.uint8)
+        buffers = decode_offsets_bulk(data, packed[1], fmts)
+        del data
+        end = chunk[1]
+    else:
+        with open_range(file_path, *chunk) as (buf, start, end):
+            data = np.frombuffer(buf, dtype=np.uint8)
+            buffers = decode_buffers_bulk(data, start, end, fmts, type_filter)
+            del data
+    checkpoint = current_checkpoint()
+    if checkpoint is not None:
+        checkpoint(end, buffer_rows(buffers), estimate_nbytes(buffers))
+    return index, buffers
+
+
+def merge_buffers_bulk(parts: List[Dict[str, Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    """Merge worker output from either bulk worker (NumPy columns or the ``array`` fallback)."""
+    if _numpy() is None:
+        return merge_buffers(parts)
+    return merge_arrays(parts)
@@ -0,0 +1,233 @@
+"""Column-wise decoding: find every message of a type first, then unpack the type in one go.
+
+``scan_offsets`` walks only the message headers and records the offsets of each type;
+``decode_columns`` and ``decode_buffers`` then gather each type's payloads and unpack them
+in a single ``iter_unpack`` pass into column lists or typed ``array.array`` buffers. ``process_chunk_buffers`` is the
+worker entry point of the parallel parsers' columnar output.
+"""
+
+import struct
+from array import array
+from itertools import chain
+from typing import List, Dict, Any, Optional, Set, Tuple, Union, Callable, Iterator
+
+from src.business_logic.mav_core import attach_structs, iter_records
+from src.business_logic.limits import estimate_nbytes
+from src.business_logic.progress import current_checkpoint
+from src.business_logic.sources import open_range, prefetch_reader
+from src.utils.config import HEADER, FMT_TYPE, FMT_LENGTH, FORMAT_TO_STRUCT, STRING_FORMATS
+
+
+def scan_offsets(
+    mv: Union[bytes, memoryview],
+    start: int,
+    end: int,
+    fmts: Dict[int, Dict[str, Any]],
+    type_filter: Optional[Set[str]] = None,
+    on_fmt: Optional[Callable[[int], None]] = None,
+) -> Dict[int, List[int]]:
+    """Walk message headers in [start, end) and collect message offsets per type.
+
+    When ``on_fmt`` is given it is called with the offset of every FMT message before
+    the lookup, so formats can be learned while walking (linear mode).
+    """
+    offsets: Dict[int, List[int]] = {}
+    h0, h1 = HEADER
+    offset = start
+
+    while offset < end - 3:
+        if mv[offset] == h0 and mv[offset + 1] == h1:
+            msg_type = mv[offset + 2]
+            if on_fmt is not None and msg_type == FMT_TYPE:
+                if offset + FMT_LENGTH > end:
+                    break
+                on_fmt(offset)
+                if msg_type not in fmts:
+                    offset += FMT_LENGTH
+                    continue
+            fmt_info = fmts.get(msg_type)
+            if fmt_info:
+                length = fmt_info["Length"]
+                if offset + length > end:
+                    break
+                if type_filter is None or fmt_info["Name"] in type_filter:
+                    offsets.setdefault(msg_type, []).append(offset)
+                offset += length
+                continue
+        offset += 1
+    return offsets
+
+
+def pack_records(
+    records: Iterator[Tuple[int, int, Any, int]],
+    fmts: Dict[int, Dict[str, Any]],
+    type_filter: Optional[Set[str]] = None,
+    on_fmt: Optional[Callable[[int, Any], Any]] = None,
+    ranges: Optional[List[Tuple[int, int]]] = None,
+) -> Tuple[bytearray, Dict[int, List[int]]]:
+    """``scan_offsets`` for a record stream (``mav_core.iter_records``), which cannot be indexed afterwards.
+
+    The wanted records are copied back to back into one buffer as the stream is read; returns
+    the buffer and the offsets of the records in it per type, ready for the decoders. ``on_fmt``
+    is called with ``(position, buffer)`` of every FMT record; ``ranges`` keeps only the records
+    starting inside them.
+    """
+    packed = bytearray()
+    offsets: Dict[int, List[int]] = {}
+    for offset, msg_type, buf, pos in records:
+        if ranges is not None and not any(start <= offset < end for start, end in ranges):
+            continue
+        if on_fmt is not None and msg_type == FMT_TYPE:
+            on_fmt(pos, buf)
+        fmt_info = fmts.get(msg_type)
+        if fmt_info and (type_filter is None or fmt_info["Name"] in type_filter):
+            offsets.setdefault(msg_type, []).append(len(packed))
+            packed += buf[pos : pos + fmt_info["Length"]]
+    return packed, offsets
+
+
+def read_chunk_records(
+    file_path: str, chunk: Tuple[int, int], fmts: Dict[int, Dict[str, Any]], type_filter: Optional[Set[str]] = None
+) -> Optional[Tuple[bytearray, Dict[int, List[int]]]]:
+    """``pack_records`` over a chunk read with a ``PrefetchReader`` ("pread"); None for the other strategies."""
+    reader = prefetch_reader(file_path, *chunk)
+    if reader is None:
+        return None
+    with reader:
+        return pack_records(iter_records(reader, fmts), fmts, type_filter)
+
+
+def _unpack_raw_columns(mv: Union[bytes, memoryview], type_offsets: List[int], fmt_info: Dict[str, Any]) -> List[tuple]:
+    """Gather the payloads of one type and unpack them in a single ``iter_unpack`` pass."""
+    if not type_offsets:
+        return []
+    compiled = fmt_info.get("CompiledStruct") or struct.Struct(fmt_info["CombinedFmt"])
+    size = compiled.size
+    payload = b"".join(mv[offset + 3 : offset + 3 + size] for offset in type_offsets)
+    return list(zip(*compiled.iter_unpack(payload)))
+
+
+def decode_type_columns(
+    mv: Union[bytes, memoryview], type_offsets: List[int], fmt_info: Dict[str, Any], rounding: bool = True
+) -> Dict[str, list]:
+    """Unpack all messages of one type in bulk and return them column by column."""
+    raw_columns = _unpack_raw_columns(mv, type_offsets, fmt_info)
+
+    columns: Dict[str, list] = {}
+    idx = 0
+    for kind, col, extra in fmt_info["Processors"]:
+        if not raw_columns:
+            columns[col] = []
+        elif kind == "array":
+            columns[col] = [list(values) for values in zip(*raw_columns[idx : idx + extra])]
+            idx += extra
+        elif kind == "string":
+            columns[col] = [v.rstrip(b"\x00").decode("ascii", errors="ignore") for v in raw_columns[idx]]
+            idx += 1
+        elif kind == "bytes":
+            columns[col] = list(raw_columns[idx])
+            idx += 1
+        else:
+            values = raw_columns[idx]
+            idx += 1
+            scale, round_it = extra
+            if scale != 1:
+                values = [v * scale for v in values]
+            if rounding and round_it and isinstance(values[0], float):
+                values = [round(v, 7) for v in values]
+            columns[col] = list(values)
+
+    return columns
+
+
+def decode_columns(
+    mv: Union[bytes, memoryview],
+    offsets: Dict[int, List[int]],
+    fmts: Dict[int, Dict[str, Any]],
+    rounding: bool = True,
+) -> Dict[str, Dict[str, list]]:
+    """Decode collected offsets into ``{type_name: {column: values}}`` without per-row dicts."""
+    tables: Dict[str, Dict[str, list]] = {}
+    for msg_type, type_offsets in offsets.items():
+        fmt_info = fmts[msg_type]
+        if struct.calcsize(fmt_info["CombinedFmt"]) > fmt_info["Length"] - 3:
+            continue
+        tables[fmt_info["Name"]] = decode_type_columns(mv, type_offsets, fmt_info, rounding)
+    return tables
+
+
+def decode_type_buffers(
+    mv: Union[bytes, memoryview], type_offsets: List[int], fmt_info: Dict[str, Any]
+) -> Dict[str, Union[array, list]]:
+    """Unpack one type into raw typed buffers: ``array.array`` per numeric column.
+
+    Values are left unscaled; arrays (``a``) are stored flattened, 32 items per message,
+    and string columns keep their raw bytes.
+    """
+    raw_columns = _unpack_raw_columns(mv, type_offsets, fmt_info)
+    buffers: Dict[str, Union[array, list]] = {}
+    idx = 0
+    for col, fmt_char in zip(fmt_info["Columns"], fmt_info["Format"]):
+        if fmt_char == "a":
+            buffers[col] = array("h", chain.from_iterable(zip(*raw_columns[idx : idx + 32])))
+            idx += 32
+        elif fmt_char in STRING_FORMATS:
+            buffers[col] = list(raw_columns[idx]) if raw_columns else []
+            idx += 1
+        else:
+            buffers[col] = array(FORMAT_TO_STRUCT[fmt_char], raw_columns[idx] if raw_columns else ())
+            idx += 1
+    return buffers
+
+
+def decode_buffers(
+    mv: Union[bytes, memoryview], offsets: Dict[int, List[int]], fmts: Dict[int, Dict[str, Any]]
+) -> Dict[str, Dict[str, Union[array, list]]]:
+    """Decode collected offsets into ``{type_name: {column: typed buffer}}``."""
+    buffers: Dict[str, Dict[str, Union[array, list]]] = {}
+    for msg_type, type_offsets in offsets.items():
+        fmt_info = fmts[msg_type]
+        if struct.calcsize(fmt_info["CombinedFmt"]) > fmt_info["Length"] - 3:
+            continue
+        buffers[fmt_info["Name"]] = decode_type_buffers(mv, type_offsets, fmt_info)
+    return buffers
+
+
+def merge_buffers(parts: List[Dict[str, Dict[str, Union[array, list]]]]) -> Dict[str, Dict[str, Union[array, list]]]:
+    """Concatenate per-chunk buffers in chunk order."""
+    merged: Dict[str, Dict[str, Union[array, list]]] = {}
+    for part in parts:
+        for name, columns in part.items():
+            target = merged.get(name)
+            if target is None:
+                merged[name] = columns
+                continue
+            for col, values in columns.items():
+                target[col].extend(values)
+    return merged
+
+
+def buffer_rows(buffers: Dict[str, Dict[str, Any]]) -> int:
+    """Number of messages held in ``{type_name: {column: buffer}}``."""
+    return sum(len(next(iter(columns.values()), ())) for columns in buffers.values())
+
+
+def process_chunk_buffers(args) -> Tuple[int, Dict[str, Dict[str, Union[array, list]]]]:
+    """Worker entry point: decode one chunk of a file into typed column buffers."""
+    index, file_path, chunk, fmts, type_filter = args
+    attach_structs(fmts)
+
+    packed = read_chunk_records(file_path, chunk, fmts, type_filter)
+    if packed is not None:
+        buffers = decode_buffers(memoryview(packed[0]), packed[1], fmts)
+        end = chunk[1]
+    else:
+        with open_range(file_path, *chunk) as (buf, start, end):
+            mv = memoryview(buf)
+            offsets = scan_offsets(mv, start, end, fmts, type_filter)
+            buffers = decode_buffers(mv, offsets, fmts)
+            del mv
+    checkpoint = current_checkpoint()
+    if checkpoint is not None:
+        checkpoint(end, buffer_rows(buffers), estimate_nbytes(buffers))
+    return index, buffers
@@ -0,0 +1,179 @@
+"""Dependency-free columnar output: one ``array.array`` per column and one shared string list.
+
+Numeric columns keep the typecode of their FMT format character (``FORMAT_TO_STRUCT``),
+or become ``"d"`` when they are scaled; string and ``Data`` columns hold ``"I"`` codes into
+a list of interned values shared by every type. Every column supports the buffer
+protocol, so ``memoryview(columns["IMU"]["GyrX"])`` (or ``numpy.frombuffer``, where
+available) hands the data on without a copy. An IMU sample takes a few tens of bytes
+instead of the few hundred of a message dict.
+"""
+
+from array import array
+from typing import List, Dict, Any, Optional, Iterator, Tuple, Union
+
+from src.business_logic.columnar import process_chunk_buffers
+
+STRING_CODE = "I"
+SCALED_CODE = "d"
+
+
+class StringPool:
+    """Interned strings (and raw ``Data`` blobs); columns store indices into ``values``."""
+
+    def __init__(self, values: Optional[List[Union[str, bytes]]] = None):
+        self.values: List[Union[str, bytes]] = list(values or [])
+        self._codes: Dict[Union[str, bytes], int] = {value: code for code, value in enumerate(self.values)}
+
+    def add(self, value: Union[str, bytes]) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def encode(self, raw_values: List[bytes], decode: bool = True) -> array:
+        """Codes for raw fixed-width values; each distinct value is decoded once."""
+        code_of = {}
+        for raw in set(raw_values):
+            code_of[raw] = self.add(raw.rstrip(b"\x00").decode("ascii", errors="ignore") if decode else raw)
+        return array(STRING_CODE, [code_of[raw] for raw in raw_values])
+
+    def remap(self, values: List[Union[str, bytes]]) -> List[int]:
+        """Codes in this pool for the values of another pool, in that pool's order."""
+        return [self.add(value) for value in values]
+
+
+def compact_buffers(
+    buffers: Dict[str, Dict[str, Union[array, list]]], fmts: Dict[int, Dict[str, Any]]
+) -> Tuple[Dict[str, Dict[str, array]], List[Union[str, bytes]]]:
+    """Turn raw typed buffers (``columnar.decode_buffers``) into compact tables and their string list.
+
+    Scaled columns are multiplied out once per column; nothing is rounded here (see
+    ``CompactColumns.column``).
+    """
+    fmt_by_name = {fmt_info["Name"]: fmt_info for fmt_info in fmts.values()}
+    pool = StringPool()
+    tables: Dict[str, Dict[str, array]] = {}
+    for name, columns in buffers.items():
+        table = tables[name] = {}
+        for kind, col, extra in fmt_by_name[name]["Processors"]:
+            values = columns[col]
+            if kind in ("string", "bytes"):
+                table[col] = pool.encode(values, decode=kind == "string")
+            elif kind == "numeric" and extra[0] != 1:
+                scale = extra[0]
+                table[col] = array(SCALED_CODE, [v * scale for v in values])
+            else:
+                table[col] = values
+    return tables, pool.values
+
+
+def process_chunk_compact(args) -> Tuple[int, Tuple[Dict[str, Dict[str, array]], List[Union[str, bytes]]]]:
+    """Worker entry point: decode one chunk of a file into compact tables and their string list."""
+    index, _, _, fmts, _ = args
+    _, buffers = process_chunk_buffers(args)
+    return index, compact_buffers(buffers, fmts)
+
+
+class CompactColumns:
+    """``{type_name: {column: array.array}}`` plus the shared string list of one parse.
+
+    columns = parser.to_arrays()
+    columns["IMU"]["AccX"]  # array("f", ...), supports the buffer protocol
+    columns.column("MSG", "Message")  # decoded values, strings resolved
+    columns.strings  # interned strings, indexed by the codes in string columns
+    """
+
+    def __init__(
+        self,
+        tables: Dict[str, Dict[str, array]],
+        strings: List[Union[str, bytes]],
+        fmts: Dict[int, Dict[str, Any]],
+        rounding: bool = True,
+        units: Optional[Dict[str, Dict[str, Any]]] = None,
+    ):
+        self.tables = tables
+        self.strings = strings
+        self.rounding = rounding
+        # {type: {column: {"unit", "mult"}}} when the log carries FMTU messages (see ``units``)
+        self.units = units or {}
+        self._processors = {
+            info["Name"]: {col: (kind, extra) for kind, col, extra in info["Processors"]}
+            for info in fmts.values()
+            if info["Name"] in tables
+        }
+
+    @classmethod
+    def merge(
+        cls,
+        parts: List[Tuple[Dict[str, Dict[str, array]], List[Union[str, bytes]]]],
+        fmts: Dict[int, Dict[str, Any]],
+        rounding: bool = True,
+        units: Optional[Dict[str, Dict[str, Any]]] = None,
+    ) -> "CompactColumns":
+        """Concatenate per-chunk results in chunk order, re-coding their strings into one pool."""
+        coded = {
+            (info["Name"], col)
+            for info in fmts.values()
+            for kind, col, _ in info["Processors"]
+            if kind in ("string", "bytes")
+        }
+        pool = StringPool()
+        merged: Dict[str, Dict[str, array]] = {}
+        for tables, strings in parts:
+            remap = pool.remap(strings)
+            identity = remap == list(range(len(remap)))
+            for name, columns in tables.items():
+                target = merged.setdefault(name, {})
+                for col, values in columns.items():
+                    if not identity and (name, col) in coded:
+                        values = array(STRING_CODE, [remap[code] for code in values])
+                    if col in target:
+                        target[col].extend(values)
+                    else:
+                        target[col] = values
+        return cls(merged, pool.values, fmts, rounding, units)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.tables
+
+    def __getitem__(self, name: str) -> Dict[str, array]:
+        return self.tables[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.tables)
+
+    def count(self, name: str) -> int:
+        """Number of messages of type ``name``."""
+        columns = self.tables.get(name)
+        if not columns:
+            return 0
+        col, values = next(iter(columns.items()))
+        kind, extra = self._processors[name][col]
+        return len(values) // extra if kind == "array" else len(values)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the column buffers (the string list not included)."""
+        return sum(values.itemsize * len(values) for columns in self.tables.values() for values in columns.values())
+
+    def column(self, name: str, col: str) -> list:
+        """Values of one column as the message dicts hold them: strings resolved, arrays per message, rounded."""
+        values = self.tables[name][col]
+        kind, extra = self._processors[name][col]
+        if kind in ("string", "bytes"):
+            strings = self.strings
+            return [strings[code] for code in values]
+        if kind == "array":
+            return [values[i : i + extra].tolist() for i in range(0, len(values), extra)]
+        if self.rounding and extra[1] and values.typecode in "fd":
+            return [round(v, 7) for v in values]
+        return values.tolist()
+
+    def rows(self, name: str) -> Iterator[Dict[str, Any]]:
+        """Messages of type ``name`` as dicts, in file order (for spot checks; the columns are the point)."""
+        columns = {col: self.column(name, col) for col in self.tables[name]}
+        for values in zip(*columns.values()):
+            message = {"mavpackettype": name}
+            message.update(zip(columns, values))
+            yield message
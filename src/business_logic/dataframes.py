@@ -0,0 +1,91 @@
+from array import array
+from typing import Dict, Any, Optional, Union
+
+from src.utils.config import STRING_FORMATS
+
+# pandas dtype for every FMT format character (before scaling)
+FORMAT_DTYPES = {
+    "a": "int16",
+    "b": "int8",
+    "B": "uint8",
+    "h": "int16",
+    "H": "uint16",
+    "i": "int32",
+    "I": "uint32",
+    "f": "float32",
+    "d": "float64",
+    "c": "int16",
+    "C": "uint16",
+    "e": "int32",
+    "E": "uint32",
+    "L": "int32",
+    "M": "uint8",
+    "q": "int64",
+    "Q": "uint64",
+}
+
+
+def _categorical(values: list) -> Any:
+    """Decode fixed-width strings once per distinct value and return a Categorical.
+
+    Categories are in order of first appearance, so they are the same from run to run.
+    """
+    import numpy as np
+    import pandas as pd
+
+    categories: Dict[str, int] = {}
+    code_of: Dict[bytes, int] = {}
+    for raw in dict.fromkeys(values):
+        text = raw.rstrip(b"\x00").decode("ascii", errors="ignore")
+        code_of[raw] = categories.setdefault(text, len(categories))
+    codes = np.fromiter((code_of[raw] for raw in values), dtype=np.int32, count=len(values))
+    return pd.Categorical.from_codes(codes, categories=list(categories))
+
+
+def build_dataframe(name: str, buffers: Dict[str, Union[array, list]], fmt_info: Dict[str, Any], rounding: bool = True):
+    """Build one DataFrame from typed buffers without copying numeric columns."""
+    import numpy as np
+    import pandas as pd
+
+    data = {}
+    for (kind, col, extra), fmt_char in zip(fmt_info["Processors"], fmt_info["Format"]):
+        buf = buffers[col]
+        if fmt_char in STRING_FORMATS:
+            data[col] = pd.Series(buf, dtype=object) if col == "Data" else _categorical(buf)
+            continue
+
+        values = buf if isinstance(buf, np.ndarray) else np.frombuffer(buf, dtype=buf.typecode)
+        values = values.astype(FORMAT_DTYPES[fmt_char], copy=False)
+        if fmt_char == "a":
+            data[col] = pd.Series(list(values.reshape(-1, 32)), dtype=object)
+            continue
+
+        scale, round_it = extra
+        if scale != 1:
+            # ``parse_message`` scales the Python float, so a float32 field is scaled in float64 too
+            values = values.astype(np.float64, copy=False) * scale
+        if rounding and round_it and values.dtype.kind == "f":
+            # ``parse_message`` rounds the float value as a Python float, so round in float64 as well
+            values = np.round(values.astype(np.float64, copy=False), 7)
+        data[col] = values
+
+    return pd.DataFrame(data, copy=False)
+
+
+def build_dataframes(
+    buffers: Dict[str, Dict[str, Union[array, list]]],
+    fmts: Dict[int, Dict[str, Any]],
+    rounding: bool = True,
+    units: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> Dict[str, Any]:
+    """Return ``{type_name: DataFrame}`` with dtypes derived from the FMT format characters.
+
+    ``units`` (see ``units.units_table``) is attached per frame as ``df.attrs["units"]``.
+    """
+    fmt_by_name = {fmt_info["Name"]: fmt_info for fmt_info in fmts.values()}
+    frames = {}
+    for name, columns in buffers.items():
+        frames[name] = build_dataframe(name, columns, fmt_by_name[name], rounding)
+        if units and name in units:
+            frames[name].attrs["units"] = units[name]
+    return frames
@@ -0,0 +1,336 @@
+"""Derived signals computed while parsing: rolling statistics over TimeUS windows.
+
+A ``Rolling`` transform names one message type, the column (or columns, combined per
+message) it reads and a statistic over a trailing window of ``window`` microseconds:
+each output at time t aggregates the samples in (t - window, t]. Parallel workers decode
+only the types the transforms need and run the transforms on their chunk; samples in the
+first ``window`` of a chunk depend on the previous chunk, so the worker also returns its
+first and last ``window`` of raw samples and the parent recomputes just those outputs.
+The result is the same as one pass over the whole log.
+
+Statistics are small classes with ``add(t, v)``, ``remove(t, v)`` (oldest sample first)
+and ``value()``; besides the built-in names, ``stat`` accepts "package.module:Class" so
+custom statistics resolve by import inside any worker. TimeUS must not decrease within
+a message type.
+"""
+
+import math
+from bisect import bisect_left, bisect_right
+from collections import deque
+from importlib import import_module
+from typing import List, Dict, Any, Optional, Sequence, Tuple, Union
+
+from src.business_logic.columnar import decode_columns, read_chunk_records, scan_offsets
+from src.business_logic.limits import estimate_nbytes
+from src.business_logic.mav_core import attach_structs
+from src.business_logic.progress import current_checkpoint
+from src.business_logic.sources import open_range
+
+TIME_COLUMN = "TimeUS"
+COMBINE = ("product", "norm", "sum")
+
+
+# -------------------------
+# Statistics
+# -------------------------
+class Mean:
+    def __init__(self):
+        self.total = 0.0
+        self.count = 0
+
+    def add(self, t: float, v: float) -> None:
+        self.total += v
+        self.count += 1
+
+    def remove(self, t: float, v: float) -> None:
+        self.total -= v
+        self.count -= 1
+
+    def value(self) -> float:
+        return self.total / self.count
+
+
+class RMS(Mean):
+    def add(self, t: float, v: float) -> None:
+        super().add(t, v * v)
+
+    def remove(self, t: float, v: float) -> None:
+        super().remove(t, v * v)
+
+    def value(self) -> float:
+        return math.sqrt(max(0.0, super().value()))
+
+
+class Integral:
+    """Trapezoidal integral over the window, in value x seconds."""
+
+    def __init__(self):
+        # area of the step from the previous sample to each sample in the window
+        self.areas: deque = deque()
+        self.total = 0.0
+        self.last: Optional[Tuple[float, float]] = None
+
+    def add(self, t: float, v: float) -> None:
+        area = 0.0 if self.last is None else (v + self.last[1]) * (t - self.last[0]) * 0.5e-6
+        self.areas.append(area)
+        self.total += area
+        self.last = (t, v)
+
+    def remove(self, t: float, v: float) -> None:
+        self.total -= self.areas.popleft()
+
+    def value(self) -> float:
+        # the oldest sample's step starts outside the window
+        return self.total - self.areas[0]
+
+
+class Extreme:
+    """Sliding max (or min) with a monotonic queue."""
+
+    sign = 1
+
+    def __init__(self):
+        self.queue: deque = deque()
+        self.added = 0
+        self.removed = 0
+
+    def add(self, t: float, v: float) -> None:
+        key = v * self.sign
+        while self.queue and self.queue[-1][1] <= key:
+            self.queue.pop()
+        self.queue.append((self.added, key))
+        self.added += 1
+
+    def remove(self, t: float, v: float) -> None:
+        if self.queue[0][0] == self.removed:
+            self.queue.popleft()
+        self.removed += 1
+
+    def value(self) -> float:
+        return self.queue[0][1] * self.sign
+
+
+class Min(Extreme):
+    sign = -1
+
+
+STATS = {"mean": Mean, "rms": RMS, "integral": Integral, "max": Extreme, "min": Min}
+
+
+def resolve_stat(stat: str) -> type:
+    """Statistic class for a built-in name or a "package.module:Class" path."""
+    if stat in STATS:
+        return STATS[stat]
+    module_name, sep, qualname = stat.partition(":")
+    if not sep:
+        raise ValueError(f"Unknown statistic {stat!r}; expected one of {sorted(STATS)} or 'module:Class'")
+    return getattr(import_module(module_name), qualname)
+
+
+# -------------------------
+# Transforms
+# -------------------------
+class Rolling:
+    """Rolling ``stat`` of ``column`` of ``msg_type`` over a trailing ``window`` of microseconds.
+
+    ``column`` may be several columns, combined per message by ``combine`` ("product", e.g.
+    Volt x Curr for power; "norm", e.g. the acceleration magnitude; or "sum"). ``every``
+    thins the output to the first sample of every ``every`` microseconds. ``window=None``
+    is allowed for "integral" and gives the running integral since the start of the log.
+
+        Rolling("vibe", "IMU", ("AccX", "AccY", "AccZ"), 1_000_000, stat="rms", combine="norm")
+        Rolling("energy_wh", "BAT", ("Volt", "Curr"), None, stat="integral")
+    """
+
+    def __init__(
+        self,
+        name: str,
+        msg_type: str,
+        column: Union[str, Sequence[str]],
+        window: Optional[int],
+        stat: str = "mean",
+        combine: str = "product",
+        every: Optional[int] = None,
+    ):
+        if combine not in COMBINE:
+            raise ValueError(f"combine must be one of {COMBINE}, got {combine!r}")
+        if window is None and stat != "integral":
+            raise ValueError("window=None (since the start of the log) is only supported for stat='integral'")
+        if window is not None and window <= 0:
+            raise ValueError("window must be a positive number of microseconds")
+        resolve_stat(stat)
+        self.name = name
+        self.msg_type = msg_type
+        self.columns = (column,) if isinstance(column, str) else tuple(column)
+        self.window = window
+        self.stat = stat
+        self.combine = combine
+        self.every = every
+
+    def args(self) -> tuple:
+        """Constructor arguments as plain values, so the transform crosses any backend."""
+        return self.name, self.msg_type, self.columns, self.window, self.stat, self.combine, self.every
+
+
+def series_values(columns: Dict[str, list], transform: Rolling) -> Tuple[list, list]:
+    """``(times, values)`` of one transform's input in a decoded table."""
+    times = columns[TIME_COLUMN]
+    inputs = [columns[col] for col in transform.columns]
+    if len(inputs) == 1:
+        return times, list(inputs[0])
+    if transform.combine == "product":
+        values = [math.prod(row) for row in zip(*inputs)]
+    elif transform.combine == "norm":
+        values = [math.sqrt(sum(x * x for x in row)) for row in zip(*inputs)]
+    else:
+        values = [sum(row) for row in zip(*inputs)]
+    return times, values
+
+
+def _emitted(t: float, previous: Optional[float], every: Optional[int]) -> bool:
+    return every is None or previous is None or t // every != previous // every
+
+
+def run_window(
+    transform: Rolling, times: list, values: list, start: int = 0, previous: Optional[float] = None
+) -> Tuple[list, list]:
+    """Slide the window over the samples; return the outputs of samples ``start`` onwards.
+
+    Samples before ``start`` only fill the window. ``previous`` is the time of the sample
+    before ``times[0]`` (for ``every``), if there is one.
+    """
+    stat = resolve_stat(transform.stat)()
+    window = transform.window
+    every = transform.every
+    out_t: list = []
+    out_v: list = []
+    oldest = 0
+    for i, (t, v) in enumerate(zip(times, values)):
+        stat.add(t, v)
+        while times[oldest] <= t - window:
+            stat.remove(times[oldest], values[oldest])
+            oldest += 1
+        if i >= start and _emitted(t, times[i - 1] if i else previous, every):
+            out_t.append(t)
+            out_v.append(stat.value())
+    return out_t, out_v
+
+
+def _running_integral(transform: Rolling, times: list, values: list, start: int = 1) -> Tuple[list, list, float]:
+    """Running trapezoidal integral from ``times[0]``; outputs of samples ``start`` onwards and the total."""
+    out_t: list = []
+    out_v: list = []
+    total = 0.0
+    for i in range(1, len(times)):
+        total += (values[i] + values[i - 1]) * (times[i] - times[i - 1]) * 0.5e-6
+        if i >= start and _emitted(times[i], times[i - 1], transform.every):
+            out_t.append(times[i])
+            out_v.append(total)
+    return out_t, out_v, total
+
+
+def derive_part(columns: Optional[Dict[str, list]], transform: Rolling) -> Optional[Dict[str, Any]]:
+    """One transform over one chunk's table: finished outputs plus what the parent needs at the edges."""
+    if not columns or not columns.get(TIME_COLUMN):
+        return None
+    times, values = series_values(columns, transform)
+    if transform.window is None:
+        out_t, out_v, total = _running_integral(transform, times, values)
+        first, last = ([times[0]], [values[0]]), ([times[-1]], [values[-1]])
+        return {"head": first, "body": (out_t, out_v), "tail": last, "total": total}
+    window = transform.window
+    # outputs of samples within ``window`` of the chunk start depend on the previous chunk
+    head = max(1, bisect_left(times, times[0] + window))
+    tail = bisect_right(times, times[-1] - window)
+    return {
+        "head": (times[:head], values[:head]),
+        "body": run_window(transform, times, values, head),
+        "tail": (times[tail:], values[tail:]),
+    }
+
+
+def merge_parts(parts: List[Optional[Dict[str, Any]]], transform: Rolling) -> Dict[str, list]:
+    """Join per-chunk results in chunk order into ``{"TimeUS": [...], name: [...]}``."""
+    out_t: list = []
+    out_v: list = []
+    carry_t: list = []
+    carry_v: list = []
+    total = 0.0
+    for part in parts:
+        if part is None:
+            continue
+        head_t, head_v = part["head"]
+        previous = carry_t[-1] if carry_t else None
+        if transform.window is None:
+            # shift the chunk's running integral by everything before it
+            if previous is not None:
+                total += (head_v[0] + carry_v[-1]) * (head_t[0] - previous) * 0.5e-6
+            if _emitted(head_t[0], previous, transform.every):
+                out_t.append(head_t[0])
+                out_v.append(total)
+            body_t, body_v = part["body"]
+            out_t.extend(body_t)
+            out_v.extend(total + v for v in body_v)
+            total += part["total"]
+            carry_t, carry_v = part["tail"]
+            continue
+
+        fixed_t, fixed_v = run_window(transform, carry_t + head_t, carry_v + head_v, len(carry_t), previous)
+        out_t.extend(fixed_t)
+        out_v.extend(fixed_v)
+        out_t.extend(part["body"][0])
+        out_v.extend(part["body"][1])
+        tail_t, tail_v = part["tail"]
+        carry_t, carry_v = carry_t + tail_t, carry_v + tail_v
+        keep = bisect_right(carry_t, tail_t[-1] - transform.window)
+        carry_t, carry_v = carry_t[keep:], carry_v[keep:]
+    return {TIME_COLUMN: out_t, transform.name: out_v}
+
+
+def check_transforms(transforms: Sequence[Rolling]) -> None:
+    names = [transform.name for transform in transforms]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Derived series names must be unique: {names}")
+
+
+# -------------------------
+# Pipeline
+# -------------------------
+def derive_tables(
+    tables: Dict[str, Dict[str, list]], transform_args: Sequence[tuple]
+) -> List[Optional[Dict[str, Any]]]:
+    """Run every transform (given by ``Rolling.args()``) over decoded ``{type: {column: values}}``."""
+    transforms = [Rolling(*args) for args in transform_args]
+    return [derive_part(tables.get(transform.msg_type), transform) for transform in transforms]
+
+
+def merge_derived(
+    parts: List[List[Optional[Dict[str, Any]]]], transforms: Sequence[Rolling]
+) -> Dict[str, Dict[str, list]]:
+    """``{name: {"TimeUS": [...], name: [...]}}`` from per-chunk ``derive_tables`` results in chunk order."""
+    return {
+        transform.name: merge_parts([chunk[i] for chunk in parts], transform) for i, transform in enumerate(transforms)
+    }
+
+
+def process_chunk_derived(args) -> Tuple[int, List[Optional[Dict[str, Any]]]]:
+    """Worker entry point: decode the types the transforms read in one chunk and run the transforms."""
+    index, file_path, chunk, fmts, _, transform_args = args
+    attach_structs(fmts)
+    wanted = {spec[1] for spec in transform_args}
+
+    packed = read_chunk_records(file_path, chunk, fmts, wanted)
+    if packed is not None:
+        tables = decode_columns(memoryview(packed[0]), packed[1], fmts, rounding=False)
+        end = chunk[1]
+    else:
+        with open_range(file_path, *chunk) as (buf, start, end):
+            mv = memoryview(buf)
+            offsets = scan_offsets(mv, start, end, fmts, wanted)
+            tables = decode_columns(mv, offsets, fmts, rounding=False)
+            del mv
+    parts = derive_tables(tables, transform_args)
+    checkpoint = current_checkpoint()
+    if checkpoint is not None:
+        checkpoint(end, sum(len(next(iter(table.values()), ())) for table in tables.values()), estimate_nbytes(tables))
+    return index, parts
@@ -0,0 +1,163 @@
+"""CSV/TSV and JSON Lines exporters that format in the workers.
+
+Every worker decodes its chunk, formats the rows as text and writes them to part files in
+a temporary directory next to the output; only the part paths go back to the parent, which
+appends the parts to the output files in chunk order with ``os.copy_file_range`` (or
+``os.sendfile``), so the bytes never pass through Python. The output is the same as
+formatting the messages one by one with ``RowWriter``.
+"""
+
+import csv
+import io
+import json
+import os
+from typing import List, Dict, Any, Optional, TextIO, Tuple
+
+from src.business_logic.mav_core import process_chunk
+
+EXPORT_FORMATS = ("csv", "tsv", "jsonl")
+# bytes per copy call when appending a part file
+COPY_BLOCK = 1 << 30
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (bytes, bytearray)):
+        return value.hex()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class RowWriter:
+    """Write message rows to a text stream as JSON Lines, CSV or TSV."""
+
+    def __init__(self, stream: TextIO, fmt: str, columns: Optional[List[str]] = None, header: bool = True):
+        self.stream = stream
+        self.fmt = fmt
+        self.columns = columns
+        self.writer = None
+        # one encoder for every row: json.dumps builds a new one per call when given ``default``
+        self.encode = json.JSONEncoder(default=_json_default).encode
+        if fmt != "jsonl":
+            self.writer = csv.writer(stream, delimiter="\t" if fmt == "tsv" else ",", lineterminator="\n")
+            if columns and header:
+                self.writer.writerow(columns)
+
+    def write(self, row: Dict[str, Any]) -> None:
+        if self.writer is None:
+            self.stream.write(self.encode(row) + "\n")
+        elif self.columns:
+            self.writer.writerow([row.get(col, "") for col in self.columns])
+        else:
+            self.writer.writerow(row.values())
+
+
+def project(msg: Dict[str, Any], columns: Optional[List[str]]) -> Optional[Dict[str, Any]]:
+    """Keep only the requested columns; messages without any of them are dropped."""
+    if not columns:
+        return msg
+    row = {"mavpackettype": msg["mavpackettype"]}
+    for col in columns:
+        if col in msg:
+            row[col] = msg[col]
+    return row if len(row) > 1 else None
+
+
+def check_format(fmt: str) -> str:
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"fmt must be one of {EXPORT_FORMATS}, got {fmt!r}")
+    return fmt
+
+
+def header_line(fmt: str, columns: Optional[List[str]]) -> bytes:
+    """The header row ``RowWriter`` starts a CSV/TSV file with (nothing for JSON Lines)."""
+    text = io.StringIO()
+    if fmt != "jsonl" and columns:
+        RowWriter(text, fmt, columns)
+    return text.getvalue().encode("utf-8")
+
+
+def export_chunk(args) -> Tuple[int, Dict[str, Tuple[Optional[List[str]], str]]]:
+    """Worker entry point: decode one chunk and write its rows to part files, one per output file.
+
+    Returns ``{type_name: (header, part_path)}``, or ``{"": ...}`` for a single output file.
+    """
+    index, file_path, chunk, fmts, type_filter, fmt, columns, by_type, directory, rounding = args
+    _, messages = process_chunk((index, file_path, chunk, fmts, type_filter, rounding))
+
+    texts: Dict[str, io.StringIO] = {}
+    writers: Dict[str, RowWriter] = {}
+    headers: Dict[str, Optional[List[str]]] = {}
+    for msg in messages:
+        row = project(msg, columns)
+        if row is None:
+            continue
+        key = row.pop("mavpackettype") if by_type else ""
+        writer = writers.get(key)
+        if writer is None:
+            # per-type files are headed by the requested columns or the type's own; a single file as in ``dump``
+            headers[key] = (columns or list(row)) if by_type else (["mavpackettype", *columns] if columns else None)
+            texts[key] = io.StringIO()
+            writer = writers[key] = RowWriter(texts[key], fmt, headers[key], header=False)
+        writer.write(row)
+    del messages
+
+    parts = {}
+    for number, (key, text) in enumerate(texts.items()):
+        path = os.path.join(directory, f"{index:06d}.{number}.part")
+        with open(path, "wb") as f:
+            f.write(text.getvalue().encode("utf-8"))
+        parts[key] = (headers[key], path)
+    return index, parts
+
+
+def copy_into(src_fd: int, dst_fd: int, size: int) -> None:
+    """Append ``size`` bytes from ``src_fd`` to ``dst_fd`` in the kernel, falling back to read/write."""
+    copied = 0
+    for copy in ("copy_file_range", "sendfile", None):
+        try:
+            while copied < size:
+                count = min(size - copied, COPY_BLOCK)
+                if copy == "copy_file_range":
+                    sent = os.copy_file_range(src_fd, dst_fd, count)
+                elif copy == "sendfile":
+                    sent = os.sendfile(dst_fd, src_fd, None, count)
+                else:
+                    sent = os.write(dst_fd, os.read(src_fd, count))
+                if sent == 0:
+                    raise EOFError(f"part file ended {size - copied} bytes early")
+                copied += sent
+            return
+        except (AttributeError, OSError):
+            # not available on this platform or between these file systems: the file positions
+            # moved by whatever was copied, so the next method carries on from there
+            if copy is None:
+                raise
+
+
+def write_exports(
+    parts: List[Dict[str, Tuple[Optional[List[str]], str]]], output: str, fmt: str, by_type: bool = True
+) -> Dict[str, str]:
+    """Append the workers' part files (in chunk order) to the output files; ``{type_name: path}``.
+
+    Part files are removed as soon as they are copied.
+    """
+    outputs: Dict[str, str] = {}
+    for part in parts:
+        for key in part:
+            if key not in outputs:
+                outputs[key] = os.path.join(output, f"{key}.{fmt}") if by_type else output
+
+    for key, path in outputs.items():
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+        try:
+            header = next(part[key][0] for part in parts if key in part)
+            os.write(fd, header_line(fmt, header))
+            for part in parts:
+                if key not in part:
+                    continue
+                part_path = part[key][1]
+                with open(part_path, "rb") as src:
+                    copy_into(src.fileno(), fd, os.fstat(src.fileno()).st_size)
+                os.remove(part_path)
+        finally:
+            os.close(fd)
+    return outputs
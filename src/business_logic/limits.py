@@ -0,0 +1,190 @@
+"""Cancellation, deadlines and memory budgets for parallel runs.
+
+A run shares one small ``stop`` mapping with its workers (a plain dict for threads, a
+manager dict for processes). Workers check it at their progress checkpoints, together
+with the deadline and the run's memory budget, and stop decoding when a limit is hit;
+the parser then returns what was decoded so far and records why in ``parser.stopped``.
+
+Memory is the estimated size of the decoded messages (``estimate_nbytes``): the chunks
+still being decoded plus the results the parent already holds.
+"""
+
+import sys
+import threading
+import time
+from typing import Dict, Any, Optional, Callable, List, MutableMapping, Tuple
+
+CANCELLED = "cancelled"
+DEADLINE = "deadline"
+MEMORY = "memory"
+
+# keys of the shared stop mapping besides the per-chunk byte estimates (int keys)
+REASON_KEY = "reason"
+RETAINED_KEY = "retained"
+# messages sampled when estimating the size of a decoded list
+SIZE_SAMPLES = 8
+
+
+class RunStopped(Exception):
+    """Raised inside a run to unwind its backend once a limit is hit."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class CancelToken:
+    """Thread-safe cancellation flag; ``cancel()`` it from any thread to stop the runs using it."""
+
+    def __init__(self):
+        self._reason: Optional[str] = None
+        self._callbacks: List[Callable[[str], None]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._reason is not None
+
+    @property
+    def reason(self) -> Optional[str]:
+        return self._reason
+
+    def cancel(self, reason: str = CANCELLED) -> None:
+        with self._lock:
+            if self._reason is not None:
+                return
+            self._reason = reason
+            callbacks = list(self._callbacks)
+        for callback in callbacks:
+            callback(reason)
+
+    def on_cancel(self, callback: Callable[[str], None]) -> Callable[[], None]:
+        """Call ``callback(reason)`` on cancellation (now, if already cancelled); returns an unsubscribe function."""
+        with self._lock:
+            if self._reason is None:
+                self._callbacks.append(callback)
+                return lambda: self._unsubscribe(callback)
+        callback(self._reason)
+        return lambda: None
+
+    def _unsubscribe(self, callback: Callable[[str], None]) -> None:
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+
+# -------------------------
+# Size estimates
+# -------------------------
+def message_size(message: Dict[str, Any]) -> int:
+    """Approximate bytes held by one decoded message (the dict and its values; keys are shared)."""
+    return sys.getsizeof(message) + sum(sys.getsizeof(value) for value in message.values())
+
+
+def estimate_nbytes(result: Any) -> int:
+    """Approximate size of a worker result: a list of messages or ``{type: {column: buffer}}``."""
+    if isinstance(result, list):
+        if not result:
+            return 0
+        step = max(1, len(result) // SIZE_SAMPLES)
+        sample = result[::step][:SIZE_SAMPLES]
+        return sys.getsizeof(result) + len(result) * sum(map(message_size, sample)) // len(sample)
+    if isinstance(result, dict):
+        columns = (column for buffers in result.values() if isinstance(buffers, dict) for column in buffers.values())
+        return sum(map(sys.getsizeof, columns))
+    return 0
+
+
+# -------------------------
+# Worker side
+# -------------------------
+class ChunkLimits:
+    """Limits checked from inside one chunk worker.
+
+    ``store`` is the run's shared stop mapping; without one (sub-interpreter workers) only
+    the deadline is checked here and the rest is left to the parent.
+    """
+
+    def __init__(
+        self,
+        index: int,
+        store: Optional[MutableMapping] = None,
+        deadline: Optional[float] = None,
+        max_memory: Optional[int] = None,
+    ):
+        self.index = index
+        self.store = store
+        self.deadline = deadline
+        self.max_memory = max_memory
+
+    def check(self, nbytes: int) -> Optional[str]:
+        """Record this chunk's decoded size; return the reason to stop, if any."""
+        if self.store is None:
+            return DEADLINE if self.deadline is not None and time.time() > self.deadline else None
+        self.store[self.index] = nbytes
+        state = self.store.copy()
+        reason = state.get(REASON_KEY) or exceeded(state, self.deadline, self.max_memory)
+        if reason:
+            self.store.setdefault(REASON_KEY, reason)
+        return reason
+
+
+def exceeded(state: Dict[Any, Any], deadline: Optional[float], max_memory: Optional[int]) -> Optional[str]:
+    """Deadline or memory reason for a snapshot of the stop mapping, or None."""
+    if deadline is not None and time.time() > deadline:
+        return DEADLINE
+    if max_memory is not None:
+        in_flight = sum(value for key, value in state.items() if isinstance(key, int))
+        if in_flight + state.get(RETAINED_KEY, 0) > max_memory:
+            return MEMORY
+    return None
+
+
+# -------------------------
+# Parent side
+# -------------------------
+class RunLimits:
+    """Parent side of one run: links the cancel token, tracks retained results, decides when to stop."""
+
+    def __init__(
+        self,
+        store: MutableMapping,
+        cancel: Optional[CancelToken] = None,
+        timeout: Optional[float] = None,
+        max_memory: Optional[int] = None,
+    ):
+        self.store = store
+        self.deadline = time.time() + timeout if timeout is not None else None
+        self.max_memory = max_memory
+        self.retained = 0
+        self._unsubscribe = cancel.on_cancel(self.stop) if cancel is not None else (lambda: None)
+
+    def __enter__(self) -> "RunLimits":
+        return self
+
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        self._unsubscribe()
+
+    def stop(self, reason: str) -> None:
+        self.store.setdefault(REASON_KEY, reason)
+
+    def worker_args(self, shared: bool = True) -> Tuple[Optional[MutableMapping], Optional[float], Optional[int]]:
+        """``ChunkLimits`` arguments after the chunk index; plain values so they cross any backend."""
+        return (self.store if shared else None), self.deadline, self.max_memory
+
+    def chunk_done(self, index: int, nbytes: int = 0, last: bool = False) -> Optional[str]:
+        """Account for a finished chunk (``nbytes`` kept by the parent); return the reason to stop, if any.
+
+        After the ``last`` chunk only a stop that reached the workers counts: the run is complete otherwise.
+        """
+        self.retained += nbytes
+        self.store.pop(index, None)
+        self.store[RETAINED_KEY] = self.retained
+        return self.store.get(REASON_KEY) if last else self.check()
+
+    def check(self) -> Optional[str]:
+        state = self.store.copy()
+        reason = state.get(REASON_KEY) or exceeded(state, self.deadline, self.max_memory)
+        if reason:
+            self.stop(reason)
+        return reason
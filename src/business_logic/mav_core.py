@@ -0,0 +1,540 @@
+"""Decode core shared by every parser: format compiler, message decoder and chunk planner."""
+
+import mmap
+import struct
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import List, Dict, Any, Tuple, Optional, Set, Union, Iterator, Callable
+
+from src.business_logic.limits import estimate_nbytes
+from src.business_logic.progress import REPORT_EVERY, Checkpoint, current_checkpoint
+from src.business_logic.sources import BlockReader, open_range, prefetch_reader
+from src.utils.config import (
+    HEADER,
+    FMT_TYPE,
+    FMT_HEADER,
+    FMT_LENGTH,
+    FORMAT_TO_STRUCT,
+    STRING_FORMATS,
+    FIELD_SCALERS,
+    FORMAT_SCALERS,
+    ROUNDING,
+)
+from src.utils.logger import error_reporter
+
+FMT_STRUCT = struct.Struct("<BB4s16s64s")
+MAX_HEAD_SCAN = 50_000_000
+MAX_RECORD = 256  # message lengths are one byte
+FMT_CACHE_SIZE = 4096  # compiled FMT records kept per process (see ``FormatCache``)
+
+
+def build_processors(
+    columns: List[str],
+    format_str: str,
+    name: str,
+    scaling: Optional[Dict[str, float]] = None,
+    rounding: Optional[Set[str]] = None,
+) -> List[Tuple[str, str, Any]]:
+    """Per column ``(kind, column, extra)``.
+
+    ``numeric`` carries ``(scale, round_to_7_digits)``, ``array`` the item count; ``string``
+    and ``bytes`` (the raw ``Data`` column) carry nothing.
+    """
+    processors = []
+    for col, fmt_char in zip(columns, format_str):
+        if fmt_char == "a":
+            processors.append(("array", col, 32))
+        elif fmt_char in STRING_FORMATS:
+            processors.append(("bytes" if col == "Data" else "string", col, 0))
+        else:
+            if scaling is None:
+                scale = FIELD_SCALERS.get(col) or FORMAT_SCALERS.get(fmt_char) or 1
+            else:
+                scale = scaling.get(col, 1)
+            if rounding is None:
+                round_it = col in ROUNDING or (name == "GPS" and col == "Alt")
+            else:
+                round_it = col in rounding or (name == "GPS" and col == "Alt")
+            processors.append(("numeric", col, (scale, round_it)))
+    return processors
+
+
+def build_plan(processors: List[Tuple[str, str, Any]]) -> Optional[Tuple[Tuple[str, ...], tuple, Tuple[int, ...]]]:
+    """Flat decode plan ``(keys, scaled, strings)`` for formats without array columns, else None.
+
+    ``scaled`` holds ``(index, scale, round_it)`` only for the values that need work and
+    ``strings`` the indices to decode, so ``parse_message`` skips everything else.
+    """
+    if any(kind == "array" for kind, _, _ in processors):
+        return None
+    keys = tuple(col for _, col, _ in processors)
+    scaled = tuple(
+        (i, extra[0], extra[1])
+        for i, (kind, _, extra) in enumerate(processors)
+        if kind == "numeric" and (extra[0] != 1 or extra[1])
+    )
+    strings = tuple(i for i, (kind, _, _) in enumerate(processors) if kind == "string")
+    return keys, scaled, strings
+
+
+def _compile_fmt(record: bytes) -> Optional[Tuple[int, Dict[str, Any]]]:
+    fmt_type, fmt_length, name_b, format_b, cols_b = FMT_STRUCT.unpack_from(record, 3)
+    if fmt_length < 3:
+        return None
+
+    name = name_b.rstrip(b"\x00").decode("ascii", errors="ignore")
+    format_str = format_b.rstrip(b"\x00").decode("ascii", errors="ignore")
+    columns_raw = cols_b.rstrip(b"\x00").decode("ascii", errors="ignore")
+    columns = [c.strip() for c in columns_raw.split(",") if c.strip()]
+    combined_fmt = "<" + "".join(FORMAT_TO_STRUCT.get(c, "") for c in format_str if c in FORMAT_TO_STRUCT)
+
+    scaling = {}
+    for col, fmt_char in zip(columns, format_str):
+        scaling[col] = FIELD_SCALERS.get(col) or FORMAT_SCALERS.get(fmt_char) or 1
+    rounding = ROUNDING.intersection(columns)
+    compiled = compiled_struct(combined_fmt)
+    processors = build_processors(columns, format_str, name, scaling, rounding)
+
+    return fmt_type, {
+        "Name": name,
+        "Length": fmt_length,
+        "Format": format_str,
+        "Columns": columns,
+        "CombinedFmt": combined_fmt,
+        "StructSize": compiled.size,
+        "CompiledStruct": compiled,
+        "Scaling": scaling,
+        "Rounding": rounding,
+        "Processors": processors,
+        "Plan": build_plan(processors),
+    }
+
+
+class FormatCache:
+    """Process-wide LRU of compiled FMT records, keyed by the raw 89-byte record.
+
+    Logs from the same firmware carry identical FMT blocks, so a batch over many logs
+    compiles each definition once. Lookups hand out shallow copies: parsers replace keys of
+    their entries (``apply_units``, ``attach_structs``) but never mutate the shared values.
+    """
+
+    def __init__(self, maxsize: int = FMT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[bytes, Optional[Tuple[int, Dict[str, Any]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def compile(self, record: bytes) -> Optional[Tuple[int, Dict[str, Any]]]:
+        """``(type, fmt_info)`` for one raw FMT record, compiled on first sight."""
+        with self._lock:
+            found = record in self._entries
+            if found:
+                self.hits += 1
+                self._entries.move_to_end(record)
+                entry = self._entries[record]
+        if not found:
+            entry = _compile_fmt(record)
+            with self._lock:
+                self.misses += 1
+                self._entries[record] = entry
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return None if entry is None else (entry[0], dict(entry[1]))
+
+    def info(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries), "maxsize": self.maxsize}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+
+FORMAT_CACHE = FormatCache()
+
+
+@lru_cache(maxsize=FMT_CACHE_SIZE)
+def compiled_struct(combined_fmt: str) -> struct.Struct:
+    """Shared ``struct.Struct`` per format string, so workers do not rebuild them for every chunk."""
+    return struct.Struct(combined_fmt)
+
+
+def compile_fmt(record: Union[bytes, memoryview], offset: int = 0) -> Optional[Tuple[int, Dict[str, Any]]]:
+    """Compile the raw FMT message starting at ``offset`` (header included) into ``(type, fmt_info)``.
+
+    Returns None for records that cannot describe a message (length shorter than a header).
+    Definitions are compiled once per process (see ``FORMAT_CACHE``).
+    """
+    return FORMAT_CACHE.compile(bytes(record[offset : offset + FMT_LENGTH]))
+
+
+# per-process caches attached to fmt entries; rebuilt wherever the entries are used
+RUNTIME_KEYS = frozenset({"CompiledStruct", "RecordDtype"})
+
+
+def portable_fmts(fmts: Dict[int, Dict[str, Any]]) -> Dict[int, Dict[str, Any]]:
+    """Copy of ``fmts`` with plain values only (compiled structs cannot be pickled or marshalled)."""
+    return {t: {k: v for k, v in info.items() if k not in RUNTIME_KEYS} for t, info in fmts.items()}
+
+
+def attach_structs(fmts: Dict[int, Dict[str, Any]]) -> Dict[int, Dict[str, Any]]:
+    """Re-create compiled structs dropped by ``portable_fmts`` (e.g. in a worker process)."""
+    for info in fmts.values():
+        if "CompiledStruct" not in info:
+            info["CompiledStruct"] = compiled_struct(info["CombinedFmt"])
+    return fmts
+
+
+def walkable_fmts(fmts: Dict[int, Dict[str, Any]]) -> Dict[int, Dict[str, Any]]:
+    """``fmts`` plus an FMT entry, so header walks step over FMT records even in logs that do not describe FMT."""
+    if FMT_TYPE in fmts:
+        return fmts
+    return {**fmts, FMT_TYPE: {"Name": "FMT", "Length": FMT_LENGTH, "Format": "", "Columns": []}}
+
+
+def parse_message(
+    fmt_info: Dict[str, Any], mv: Union[bytes, memoryview], payload_offset: int, rounding: bool = True
+) -> Optional[Dict[str, Any]]:
+    """Decode one message payload into a dict with scaling, rounding and strings applied."""
+    compiled = fmt_info.get("CompiledStruct")
+    try:
+        if compiled is None:
+            values = struct.unpack_from(fmt_info["CombinedFmt"], mv, payload_offset)
+        else:
+            values = compiled.unpack_from(mv, payload_offset)
+    except struct.error:
+        return None
+
+    plan = fmt_info.get("Plan")
+    if plan is not None:
+        keys, scaled, strings = plan
+        if len(values) < len(keys):
+            return None
+        if scaled or strings:
+            values = list(values)
+            for i, scale, round_it in scaled:
+                val = values[i]
+                if scale != 1:
+                    val *= scale
+                if rounding and round_it and isinstance(val, float):
+                    val = round(val, 7)
+                values[i] = val
+            for i in strings:
+                values[i] = values[i].rstrip(b"\x00").decode("ascii", errors="ignore")
+        message = {"mavpackettype": fmt_info["Name"]}
+        message.update(zip(keys, values))
+        return message
+
+    processors = fmt_info.get("Processors")
+    if processors is None:
+        processors = build_processors(
+            fmt_info["Columns"], fmt_info["Format"], fmt_info["Name"], fmt_info.get("Scaling"), fmt_info.get("Rounding")
+        )
+
+    message: Dict[str, Any] = {"mavpackettype": fmt_info["Name"]}
+    idx = 0
+    try:
+        for kind, col, extra in processors:
+            if kind == "numeric":
+                val = values[idx]
+                scale, round_it = extra
+                if scale != 1:
+                    val *= scale
+                if rounding and round_it and isinstance(val, float):
+                    val = round(val, 7)
+                message[col] = val
+                idx += 1
+            elif kind == "string":
+                message[col] = values[idx].rstrip(b"\x00").decode("ascii", errors="ignore")
+                idx += 1
+            elif kind == "bytes":
+                message[col] = values[idx]
+                idx += 1
+            else:
+                message[col] = list(values[idx : idx + extra])
+                idx += extra
+    except IndexError:
+        return None
+    return message
+
+
+def scan_fmts(mm: Union[bytes, mmap.mmap, BlockReader], max_head: int = MAX_HEAD_SCAN) -> Dict[int, Dict[str, Any]]:
+    """Compile every FMT definition found in the head of the file."""
+    fmts: Dict[int, Dict[str, Any]] = {}
+    size = len(mm)
+    max_head = min(size, max_head)
+    offset = 0
+
+    while offset < max_head - 3:
+        pos = mm.find(FMT_HEADER, offset)
+        if pos == -1 or pos >= max_head:
+            break
+        if pos + FMT_LENGTH <= size:
+            compiled = compile_fmt(mm[pos : pos + FMT_LENGTH])
+            if compiled:
+                fmts[compiled[0]] = compiled[1]
+            offset = pos + FMT_LENGTH
+        else:
+            offset += 1
+    return fmts
+
+
+def find_records(
+    mm: Union[bytes, mmap.mmap, BlockReader],
+    fmts: Dict[int, Dict[str, Any]],
+    name: str,
+    start: int = 0,
+    end: Optional[int] = None,
+) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """``(offset, message)`` for the records of type ``name`` in [start, end), located with ``find``.
+
+    Meant for rare types (FMTU, EV, ...), which this finds without walking the other
+    messages. A candidate counts only when the next record starts right after it (or the
+    log ends), which rules out header bytes that happen to occur inside other payloads.
+    """
+    found = [(msg_type, info) for msg_type, info in fmts.items() if info["Name"] == name]
+    if not found:
+        return
+    msg_type, fmt_info = found[0]
+    length = fmt_info["Length"]
+    marker = bytes(HEADER) + bytes([msg_type])
+    size = len(mm)
+    end = size if end is None else min(end, size)
+    offset = start
+    while True:
+        pos = mm.find(marker, offset, end)
+        if pos == -1:
+            return
+        offset = pos + 1
+        record = bytes(mm[pos : pos + length + 2])
+        if len(record) < length or (len(record) == length + 2 and record[length:] != bytes(HEADER)):
+            continue
+        msg = parse_message(fmt_info, record, 3, rounding=False)
+        if msg is not None:
+            offset = pos + length
+            yield pos, msg
+
+
+def plan_chunks(
+    mm: Union[bytes, mmap.mmap, BlockReader],
+    fmts: Dict[int, Dict[str, Any]],
+    num_chunks: int,
+    start: int = 0,
+    end: Optional[int] = None,
+) -> List[Tuple[int, int]]:
+    """Split [start, end) of the file (default: all of it) into ``num_chunks`` ranges that each start on a header."""
+    size = len(mm)
+    end = size if end is None else end
+    chunk_size = (end - start) // num_chunks
+    desired_cuts = [start + chunk_size * (i + 1) for i in range(num_chunks - 1)]
+    chunks: List[Tuple[int, int]] = []
+    chunk_start = start
+
+    for cut in desired_cuts:
+        offset = max(cut, chunk_start)
+        while offset < end - 3:
+            pos = mm.find(HEADER, offset, end)
+            if pos == -1:
+                offset = end
+                break
+            offset = pos
+            msg_type = mm[offset + 2]
+            if msg_type in fmts:
+                msg_len = fmts[msg_type]["Length"]
+                if offset + msg_len <= size:
+                    if offset > chunk_start:
+                        chunks.append((chunk_start, offset))
+                        chunk_start = offset
+                    break
+            offset += 1
+        if offset >= end - 3:
+            break
+
+    chunks.append((chunk_start, end))
+    return chunks
+
+
+def decode_chunk(
+    mv: Union[bytes, memoryview],
+    start: int,
+    end: int,
+    fmts: Dict[int, Dict[str, Any]],
+    type_filter: Optional[Set[str]] = None,
+    rounding: bool = True,
+    checkpoint: Optional[Checkpoint] = None,
+) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """Decode all messages in [start, end); also return decode failures per type.
+
+    ``checkpoint(offset, messages, nbytes)`` is called every ``REPORT_EVERY`` decoded messages
+    and at the end; when it returns True decoding stops and the messages so far are returned.
+    """
+    messages: List[Dict[str, Any]] = []
+    errors: Dict[str, int] = {}
+    h0, h1 = HEADER
+    offset = start
+
+    while offset < end - 3:
+        if mv[offset] == h0 and mv[offset + 1] == h1:
+            fmt_info = fmts.get(mv[offset + 2])
+            if fmt_info:
+                length = fmt_info["Length"]
+                if offset + length > end:
+                    break
+                if type_filter and fmt_info["Name"] not in type_filter:
+                    offset += length
+                    continue
+                message = parse_message(fmt_info, mv, offset + 3, rounding)
+                if message:
+                    messages.append(message)
+                    if checkpoint is not None and not len(messages) % REPORT_EVERY:
+                        if checkpoint(offset, len(messages), estimate_nbytes(messages)):
+                            end = offset
+                            break
+                else:
+                    errors[fmt_info["Name"]] = errors.get(fmt_info["Name"], 0) + 1
+                offset += length
+                continue
+        offset += 1
+    if checkpoint is not None:
+        checkpoint(end, len(messages), estimate_nbytes(messages))
+    return messages, errors
+
+
+def stream_reader(stream: Any) -> Callable[[memoryview], Optional[int]]:
+    """``read_into(view) -> bytes read`` for a socket or a binary stream, taking whatever it has ready.
+
+    Sockets use ``recv_into``; buffered streams (stdin, pipes, ``socket.makefile``) ``readinto1``,
+    which does not wait for the view to fill, so records reach the caller as soon as they arrive.
+    """
+    for name in ("recv_into", "readinto1", "readinto"):
+        method = getattr(stream, name, None)
+        if method is not None:
+            return method
+
+    def read_into(view: memoryview) -> int:
+        data = stream.read(len(view))
+        view[: len(data)] = data
+        return len(data)
+
+    return read_into
+
+
+def iter_records(
+    stream: Any, fmts: Dict[int, Dict[str, Any]], read_size: int = 1 << 20
+) -> Iterator[Tuple[int, int, bytearray, int]]:
+    """Walk the messages of a sequential byte stream (a decompressing reader, a pipe, a socket).
+
+    Yields ``(offset, msg_type, buffer, position)``: the record starting at raw ``offset``
+    sits at ``position`` in ``buffer``. FMT records are yielded whether or not their type
+    is known; definitions the consumer adds to ``fmts`` apply to the following records.
+    Bytes that do not start a known record are skipped until the next header. Follows the
+    linear parser: a record cut off by the end of the stream ends the walk.
+
+    The bytes live in one ``bytearray`` of ``read_size + MAX_RECORD`` bytes that is refilled
+    in place (the unread tail moves to the front), so memory stays bounded however long the
+    stream runs; a yielded buffer is only valid until the next record is requested. The
+    stream is only read when the next record is incomplete.
+    """
+    read_into = stream_reader(stream)
+    buf = bytearray(read_size + MAX_RECORD)
+    view = memoryview(buf)
+    base = pos = filled = 0
+
+    def refill() -> bool:
+        nonlocal base, pos, filled
+        tail = filled - pos
+        buf[:tail] = buf[pos:filled]
+        base, pos, filled = base + pos, 0, tail
+        read = read_into(view[filled:])
+        filled += read or 0
+        return bool(read)
+
+    try:
+        while True:
+            found = buf.find(HEADER, pos, filled)
+            if found == -1:
+                # keep a last byte that may be the first half of a header
+                pos = max(pos, filled - 1)
+                if not refill():
+                    return
+                continue
+            pos = found
+            if filled - pos < 3:
+                if not refill():
+                    return
+                continue
+
+            msg_type = buf[pos + 2]
+            if msg_type == FMT_TYPE:
+                length = FMT_LENGTH
+            elif msg_type in fmts:
+                length = fmts[msg_type]["Length"]
+            else:
+                pos += 1
+                continue
+            if filled - pos < length:
+                if not refill():
+                    return
+                continue
+            yield base + pos, msg_type, buf, pos
+            pos += length
+    finally:
+        view.release()
+
+
+def decode_records(
+    records: Iterator[Tuple[int, int, Any, int]],
+    start: int,
+    end: int,
+    fmts: Dict[int, Dict[str, Any]],
+    type_filter: Optional[Set[str]] = None,
+    rounding: bool = True,
+    checkpoint: Optional[Checkpoint] = None,
+) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """``decode_chunk`` for the records of a stream (``iter_records``) over file bytes [start, end)."""
+    messages: List[Dict[str, Any]] = []
+    errors: Dict[str, int] = {}
+    for offset, msg_type, buf, pos in records:
+        fmt_info = fmts.get(msg_type)
+        if not fmt_info or (type_filter and fmt_info["Name"] not in type_filter):
+            continue
+        message = parse_message(fmt_info, buf, pos + 3, rounding)
+        if message:
+            messages.append(message)
+            if checkpoint is not None and not len(messages) % REPORT_EVERY:
+                if checkpoint(start + offset, len(messages), estimate_nbytes(messages)):
+                    end = start + offset
+                    break
+        else:
+            errors[fmt_info["Name"]] = errors.get(fmt_info["Name"], 0) + 1
+    if checkpoint is not None:
+        checkpoint(end, len(messages), estimate_nbytes(messages))
+    return messages, errors
+
+
+def process_chunk(args) -> Tuple[int, List[Dict[str, Any]]]:
+    """Worker entry point: decode one chunk of a file into message dicts."""
+    index, file_path, chunk, fmts, type_filter, rounding = args
+    attach_structs(fmts)
+
+    reader = prefetch_reader(file_path, *chunk)
+    if reader is not None:
+        # "pread": the next window is read on a background thread while this one decodes
+        with reader:
+            messages, errors = decode_records(
+                iter_records(reader, fmts), *chunk, fmts, type_filter, rounding, current_checkpoint()
+            )
+    else:
+        with open_range(file_path, *chunk) as (buf, start, end):
+            mv = memoryview(buf)
+            messages, errors = decode_chunk(mv, start, end, fmts, type_filter, rounding, current_checkpoint())
+            del mv
+
+    if errors:
+        error_reporter.report(index, errors)
+    return index, messages
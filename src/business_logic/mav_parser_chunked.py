@@ -0,0 +1,292 @@
+import os
+import queue
+import tempfile
+from contextlib import ExitStack
+from multiprocessing import Manager
+from typing import List, Dict, Any, Tuple, Optional, Iterator, MutableMapping
+
+from src.business_logic.backends import get_backend
+from src.business_logic.columnar import merge_buffers, process_chunk_buffers
+from src.business_logic.compact import CompactColumns, process_chunk_compact
+from src.business_logic.derived import Rolling, check_transforms, merge_derived, process_chunk_derived
+from src.business_logic.exporters import check_format, export_chunk, header_line, write_exports
+from src.business_logic.limits import CancelToken, RunLimits, RunStopped, estimate_nbytes
+from src.business_logic.mav_core import (
+    compile_fmt,
+    parse_message,
+    portable_fmts,
+    process_chunk,
+    scan_fmts,
+)
+from src.business_logic.profiling import DEFAULT_INTERVAL, new_run_id, profiled_chunk, write_report
+from src.business_logic.segments import Segments, check_segments, plan_segments, segment_ranges
+from src.business_logic.progress import (
+    PROGRESS_INTERVAL,
+    ProgressCallback,
+    ProgressMonitor,
+    ProgressTracker,
+    chunk_tasks,
+    tracked_chunk,
+)
+from src.business_logic.sources import DEFAULT_IO, PREAD_CHUNK, BlockReader, check_io, io_chunk, open_log
+from src.business_logic.summary import merge_summaries, summarize_chunk
+from src.business_logic.units import CONFIG_SCALING, LOG_SCALING, apply_units, check_scaling, scan_units, units_table
+from src.utils.config import ROUNDING
+
+
+class MAVParserChunked:
+    """Parse binary MAV messages chunk by chunk on an execution backend.
+
+    The FMT scan, chunk planning and decoding live in ``mav_core``; subclasses only pick
+    the backend ("serial", "threads", "process" or "interpreters").
+    """
+
+    backend_name = "serial"
+
+    def __init__(
+        self,
+        file_path: str,
+        type_filter: Optional[List[str]] = None,
+        workers: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+        backend: Optional[str] = None,
+        profile: Optional[str] = None,
+        profiler: str = "sample",
+        progress: Optional[ProgressCallback] = None,
+        cancel: Optional[CancelToken] = None,
+        timeout: Optional[float] = None,
+        max_memory: Optional[int] = None,
+        scaling: str = CONFIG_SCALING,
+        segments: Segments = None,
+        io: str = DEFAULT_IO,
+    ):
+        self.file_path = file_path
+        self.backend_name = backend or self.backend_name
+        self.workers = get_backend(self.backend_name, workers).workers
+        self.chunk_size = chunk_size
+        self.fmts: Dict[int, Dict[str, Any]] = {}
+        self.type_filter = set(type_filter) if type_filter else None
+        self.chunks: List[Tuple[int, int]] = []
+        self.messages: List[Dict[str, Any]] = []
+        self.message_count = 0
+
+        self.rounding_columns: frozenset[str] = ROUNDING
+        # opt-in profiling: artifact directory and "sample" / "cprofile" (see ``profiling``)
+        self.profile = profile
+        self.profiler = profiler
+        self.profile_report: Optional[Dict[str, Any]] = None
+        # called with a progress event dict a few times per second (see ``progress``)
+        self.progress = progress
+        # opt-in limits (see ``limits``): a run stops early with partial results and the reason in ``stopped``
+        self.cancel = cancel
+        self.timeout = timeout
+        self.max_memory = max_memory
+        self.stopped: Optional[str] = None
+        # "config": FIELD_SCALERS / FORMAT_SCALERS; "log": the log's FMTU/MULT multipliers (see ``units``)
+        self.scaling = check_scaling(scaling)
+        self.log_units: Dict[str, Any] = {"units": {}, "mults": {}, "fields": {}}
+        # "flight", "armed" or (start, end) offsets: decode only those ranges (see ``segments``)
+        self.segments = check_segments(segments)
+        self.segment_table: List[Dict[str, Any]] = []
+        # how workers read their chunk of a plain log: "mmap", "madvise", "pread" or "range" (see ``sources``)
+        self.io = check_io(io)
+
+    _process_chunk = staticmethod(process_chunk)
+    _process_chunk_buffers = staticmethod(process_chunk_buffers)
+    _merge_buffers = staticmethod(merge_buffers)
+    _parse_message = staticmethod(parse_message)
+
+    def scan_file_and_prepare_chunks(self) -> None:
+        self.chunks = []
+        self._scan_fmts()
+        self._prepare_safe_chunks()
+
+    def _scan_fmts(self) -> None:
+        """Scan file head for FMT definitions and the FMTU/UNIT/MULT tables."""
+        with open_log(self.file_path) as mm:
+            self.fmts.update(scan_fmts(mm))
+            self.log_units = scan_units(mm, self.fmts)
+        if self.scaling == LOG_SCALING:
+            apply_units(self.fmts, self.log_units)
+
+    @property
+    def units(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """``{type: {column: {"unit", "mult"}}}`` from the log's FMTU messages (after a run)."""
+        return units_table(self.fmts, self.log_units)
+
+    def _parse_fmt(self, chunk: memoryview) -> None:
+        """Parse one FMT definition and store it in self.fmts."""
+        compiled = compile_fmt(chunk)
+        if compiled:
+            self.fmts[compiled[0]] = compiled[1]
+
+    def _num_chunks(self, size: int) -> int:
+        if self.chunk_size:
+            return max(1, -(-size // self.chunk_size))
+        num_chunks = min(os.cpu_count() or 8, 16)
+        if self.io == "pread":
+            # workers that read a chunk in one piece (see ``sources``) never hold more than PREAD_CHUNK
+            num_chunks = max(num_chunks, -(-size // PREAD_CHUNK))
+        return num_chunks
+
+    def _prepare_safe_chunks(self) -> None:
+        """Split the file (or its ``segments``) into chunks that each start on a message header."""
+        with open_log(self.file_path) as mm:
+            ranges = [(0, len(mm))]
+            if self.segments is not None:
+                self.segment_table, ranges = segment_ranges(mm, self.fmts, self.segments)
+            num_chunks = self._num_chunks(sum(end - start for start, end in ranges))
+            if isinstance(mm, BlockReader):
+                # a compressed log cannot be split finer than its blocks
+                num_chunks = min(num_chunks, max(1, len(mm.blocks)))
+            self.chunks = plan_segments(mm, self.fmts, ranges, num_chunks)
+
+    def _backend(self):
+        return get_backend(self.backend_name, self.workers)
+
+    def _chunk_args(self, backend, *extra: Any) -> List[tuple]:
+        fmts = portable_fmts(self.fmts) if backend.pickles_args else self.fmts
+        return [(i, self.file_path, chunk, fmts, self.type_filter, *extra) for i, chunk in enumerate(self.chunks)]
+
+    def _limited(self) -> bool:
+        return self.cancel is not None or self.timeout is not None or self.max_memory is not None
+
+    def _shared(self, stack: ExitStack, backend) -> Tuple[Any, Optional[MutableMapping]]:
+        """Progress queue and stop mapping shared with the workers.
+
+        In-process objects for threads, manager proxies for processes. Sub-interpreter workers
+        can share neither, so they report progress per finished chunk and only check the deadline.
+        """
+        if backend.name == "interpreters":
+            return None, None
+        if backend.pickles_args:
+            manager = stack.enter_context(Manager())
+            return manager.Queue(), manager.dict()
+        return queue.Queue(), {}
+
+    def _map(self, func, *extra: Any, retain: bool = True) -> Iterator:
+        """Run ``func`` over every chunk and yield its results in chunk order.
+
+        Every chunk runs inside the opt-in profiling, I/O strategy and progress/limit wrappers.
+        When a limit is hit the run stops after the results so far and ``stopped`` holds the reason.
+        ``retain`` tells whether the caller keeps the results, which counts against ``max_memory``.
+        """
+        self.stopped = None
+        backend = self._backend()
+        tasks = self._chunk_args(backend, *extra)
+        settings = {"dir": self.profile, "run": new_run_id(), "profiler": self.profiler, "interval": DEFAULT_INTERVAL}
+        if self.profile:
+            func, tasks = profiled_chunk, [(func.__module__, func.__name__, settings, args) for args in tasks]
+        if self.io != DEFAULT_IO:
+            func, tasks = io_chunk, [(func.__module__, func.__name__, self.io, args) for args in tasks]
+
+        sizes = [end - start for start, end in self.chunks]
+        tracker = limits = None
+        try:
+            with ExitStack() as stack:
+                channel = store = None
+                if self.progress or self._limited():
+                    channel, store = self._shared(stack, backend)
+                if self.progress:
+                    tracker = ProgressTracker(self.progress, sum(sizes), len(self.chunks))
+                    if channel is not None:
+                        stack.enter_context(ProgressMonitor(tracker, channel))
+                else:
+                    channel = None
+                if self._limited():
+                    limits = RunLimits({} if store is None else store, self.cancel, self.timeout, self.max_memory)
+                    stack.enter_context(limits)
+                if channel is not None or limits is not None:
+                    worker_limits = limits.worker_args(shared=store is not None) if limits else None
+                    tasks = chunk_tasks(func, tasks, self.chunks, channel, PROGRESS_INTERVAL, worker_limits)
+                    func = tracked_chunk
+
+                backend = stack.enter_context(backend)
+                for done, result in enumerate(backend.map(func, tasks), 1):
+                    if tracker is not None:
+                        messages = len(result[1]) if isinstance(result[1], list) else None
+                        tracker.chunk_done(result[0], sizes[result[0]], messages)
+                    reason = None
+                    if limits is not None:
+                        nbytes = estimate_nbytes(result[1]) if retain else 0
+                        reason = limits.chunk_done(result[0], nbytes, last=done == len(tasks))
+                    yield result
+                    if reason:
+                        raise RunStopped(reason)
+        except RunStopped as stop:
+            self.stopped = stop.reason
+
+        if tracker is not None:
+            tracker.finish()
+        if self.profile:
+            self.profile_report = write_report(self.profile, settings["run"])
+
+    def to_dataframes(self, rounding: bool = True) -> Dict[str, Any]:
+        """Parse the file in parallel into ``{type_name: pandas.DataFrame}``."""
+        from src.business_logic.dataframes import build_dataframes
+
+        self.scan_file_and_prepare_chunks()
+        parts = [buffers for _, buffers in self._map(self._process_chunk_buffers)]
+        return build_dataframes(self._merge_buffers(parts), self.fmts, rounding, self.units)
+
+    def to_arrays(self, rounding: bool = True) -> CompactColumns:
+        """Parse the file in parallel into ``array.array`` columns (see ``compact``); needs no NumPy."""
+        self.scan_file_and_prepare_chunks()
+        parts = [part for _, part in self._map(process_chunk_compact)]
+        return CompactColumns.merge(parts, self.fmts, rounding, self.units)
+
+    def derive(self, transforms: List[Rolling]) -> Dict[str, Dict[str, list]]:
+        """Run rolling transforms (see ``derived``) inside the workers; ``{name: {"TimeUS": [...], name: [...]}}``."""
+        check_transforms(transforms)
+        self.scan_file_and_prepare_chunks()
+        specs = tuple(transform.args() for transform in transforms)
+        parts = [part for _, part in self._map(process_chunk_derived, specs)]
+        return merge_derived(parts, transforms)
+
+    def export(
+        self,
+        output: str,
+        fmt: str = "csv",
+        columns: Optional[List[str]] = None,
+        by_type: bool = True,
+        rounding: bool = True,
+    ) -> Dict[str, str]:
+        """Write the messages as CSV, TSV or JSON Lines; ``{type_name: path}`` of the files written.
+
+        ``output`` is a directory for one file per type, or with ``by_type=False`` one file
+        for all messages in file order. Workers format their chunks into part files and only
+        the paths come back (see ``exporters``); a run stopped by a limit exports what it decoded.
+        """
+        check_format(fmt)
+        self.scan_file_and_prepare_chunks()
+        directory = output if by_type else os.path.dirname(os.path.abspath(output))
+        os.makedirs(directory, exist_ok=True)
+        # parts next to the output, so copy_file_range stays within one file system
+        with tempfile.TemporaryDirectory(prefix=".export-", dir=directory) as parts_dir:
+            extra = (fmt, columns, by_type, parts_dir, rounding)
+            parts = [part for _, part in self._map(export_chunk, *extra, retain=False)]
+            outputs = write_exports(parts, output, fmt, by_type)
+        if not by_type and not outputs:
+            with open(output, "wb") as f:
+                f.write(header_line(fmt, ["mavpackettype", *columns] if columns else None))
+        return outputs
+
+    def iter_messages(self, rounding: bool = True) -> Iterator[Dict[str, Any]]:
+        """Yield messages in file order, one finished chunk at a time."""
+        self.scan_file_and_prepare_chunks()
+        for _, msgs in self._map(self._process_chunk, rounding, retain=False):
+            yield from msgs
+
+    def summarize(self) -> Dict[str, Any]:
+        """Per-type counts, bytes and TimeUS span plus the FMT table, without decoding any message."""
+        self.scan_file_and_prepare_chunks()
+        parts = [summary for _, summary in self._map(summarize_chunk)]
+        return merge_summaries(parts, self.fmts, sum(end - start for start, end in self.chunks))
+
+    def run(self, rounding: bool = True) -> None:
+        """Parse every chunk into ``messages``; partial if a limit stopped the run (see ``stopped``)."""
+        self.scan_file_and_prepare_chunks()
+        results = list(self._map(self._process_chunk, rounding))
+
+        self.messages = [msg for _, msgs in results for msg in msgs]
+        self.message_count = len(self.messages)
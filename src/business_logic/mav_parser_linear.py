@@ -1,23 +1,54 @@
-from typing import List, Dict, Any, Optional
-import struct
+from typing import List, Dict, Any, Optional, Iterator, Tuple, Union
 import mmap
-from src.utils.config import (
-    HEADER,
-    FMT_TYPE,
-    FMT_LENGTH,
-    FORMAT_TO_STRUCT,
-    STRING_FORMATS,
-    FIELD_SCALERS,
-    FORMAT_SCALERS,
-    FILE_PATH,
-    ROUNDING,
+import os
+from contextlib import ExitStack, contextmanager
+from src.business_logic.bulk_decode import decode_offsets_bulk
+from src.business_logic.columnar import scan_offsets, decode_columns, decode_buffers, pack_records
+from src.business_logic.compact import CompactColumns, compact_buffers
+from src.business_logic.derived import Rolling, check_transforms, derive_tables, merge_derived
+from src.business_logic.mav_core import (
+    FMT_STRUCT,
+    build_processors,
+    compile_fmt,
+    iter_records,
+    parse_message,
+    scan_fmts,
 )
+from src.business_logic.message_index import MessageIndex, MessageSequence
+from src.business_logic.profiling import new_run_id, profile_session, write_report
+from src.business_logic.progress import REPORT_EVERY, ProgressCallback, ProgressTracker
+from src.business_logic.segments import Segments, check_segments, segment_ranges
+from src.business_logic.sources import (
+    DEFAULT_IO,
+    PrefetchReader,
+    advise,
+    check_io,
+    detect_compression,
+    open_log,
+    open_stream,
+)
+from src.business_logic.units import CONFIG_SCALING, LOG_SCALING, apply_units, check_scaling, scan_units, units_table
+from src.utils.config import HEADER, FMT_TYPE, FMT_LENGTH, ROUNDING
+
+# bytes the message walk passes between two DONTNEED calls with io="madvise"
+RELEASE_STEP = 16 << 20
 
 
 class MAVParserLinear:
     """Ultra-fast MAVLink log parser using memoryview and mmap."""
 
-    def __init__(self, file_path: str, type_filter: Optional[List[str]] = None, rounding: bool = True):
+    def __init__(
+        self,
+        file_path: str,
+        type_filter: Optional[List[str]] = None,
+        rounding: bool = True,
+        profile: Optional[str] = None,
+        profiler: str = "sample",
+        progress: Optional[ProgressCallback] = None,
+        scaling: str = CONFIG_SCALING,
+        segments: Segments = None,
+        io: str = DEFAULT_IO,
+    ):
         self.file_path = file_path
         self.formats: Dict[int, Dict[str, Any]] = {}
         self.message_count = 0
@@ -26,12 +57,48 @@ class MAVParserLinear:
         self.offset = 0
         self.header_bytes = HEADER
         self.columns_to_round = ROUNDING
-
-        # Open file and map to memory
-        self._file = open(file_path, "rb")
+        # opt-in profiling: artifact directory and "sample" / "cprofile" (see ``profiling``)
+        self.profile = profile
+        self.profiler = profiler
+        self.profile_report: Optional[Dict[str, Any]] = None
+        # called with a progress event dict a few times per second (see ``progress``)
+        self.progress = progress
+        # "config": FIELD_SCALERS / FORMAT_SCALERS; "log": the log's FMTU/MULT multipliers (see ``units``)
+        self.scaling = check_scaling(scaling)
+        self._head: Optional[Tuple[Dict[int, Dict[str, Any]], Dict[str, Any]]] = None
+        # "flight", "armed" or (start, end) offsets: decode only those ranges (see ``segments``)
+        self.segments = check_segments(segments)
+        self._segments: Optional[Tuple[List[Dict[str, Any]], List[Tuple[int, int]]]] = None
+        # how a plain log is read (see ``sources``): "pread" streams it through two prefetched windows,
+        # "madvise" drops the pages behind the walk; "range" is "mmap" for a single pass
+        self.io = check_io(io)
+        self._released = 0
+        # offset at which the message walk next drops the pages behind it (never unless "madvise")
+        self._release_at = RELEASE_STEP if self.io == "madvise" else float("inf")
+
+        self.compression = detect_compression(file_path)
+        self._stream = None
+        self._records: Optional[Iterator[Tuple[int, int, bytes, int]]] = None
+        self._index: Optional[MessageIndex] = None
+
+        if self.compression or self.io == "pread":
+            # .gz/.zst: decompress while walking; "pread": read ahead on a background thread while
+            # walking; random access only on demand (_materialize)
+            self._stream = open_stream(file_path) if self.compression else PrefetchReader(file_path)
+            self._records = iter_records(self._stream, self.formats)
+            self._view = memoryview(b"")
+            self.size = 0 if self.compression else os.path.getsize(file_path)
+        else:
+            self._map_file()
+
+    def _map_file(self) -> None:
+        """Open the file and map it to memory."""
+        self._file = open(self.file_path, "rb")
         self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
         self._view = memoryview(self._mmap)
         self.size = len(self._view)
+        if self.io == "madvise":
+            advise(self._mmap, self._file.fileno(), 0, self.size, "SEQUENTIAL")
 
     def __enter__(self) -> "MAVParser":
         return self
@@ -48,88 +115,104 @@ class MAVParserLinear:
                 self._mmap.close()
             if hasattr(self, "_file"):
                 self._file.close()
+            if getattr(self, "_stream", None) is not None:
+                self._stream.close()
         except Exception as e:
             print(f"Error closing: {e}")
 
-    def _build_processors(self, columns: List[str], format_str: str):
-        """Build simple processors: type, column, scale."""
-        processors = []
-        for col, fmt_char in zip(columns, format_str):
-            if fmt_char == "a":
-                processors.append(("array", col, 32))
-            elif fmt_char in STRING_FORMATS:
-                processors.append(("string", col, 0))
-            else:
-                scale = FIELD_SCALERS.get(col) or FORMAT_SCALERS.get(fmt_char) or 1.0
-                processors.append(("numeric", col, scale))
-        return processors
+    def _build_processors(self, columns: List[str], format_str: str, name: str = ""):
+        """Build simple processors: type, column, extra (see ``mav_core.build_processors``)."""
+        return build_processors(columns, format_str, name)
 
-    def _parse_fmt(self, offset: int) -> Dict[str, Any]:
+    def _parse_fmt(self, offset: int, view: Optional[Union[bytes, memoryview]] = None) -> Dict[str, Any]:
         """Parse FMT message that defines message format."""
-        fmt_type, fmt_length, name_b, format_b, cols_b = struct.unpack_from(
-            "<BB4s16s64s", self._view, offset + 3
-        )
-
-        name = name_b.rstrip(b"\x00").decode("ascii", errors="ignore")
-        format_str = format_b.rstrip(b"\x00").decode("ascii", errors="ignore")
-        columns_raw = cols_b.rstrip(b"\x00").decode("ascii", errors="ignore")
-        columns = [c.strip() for c in columns_raw.split(",") if c.strip()]
-
-        struct_fmt = "<" + "".join(FORMAT_TO_STRUCT.get(c, "") for c in format_str if c in FORMAT_TO_STRUCT)
-        compiled_struct = struct.Struct(struct_fmt)
-        processors = self._build_processors(columns, format_str)
-
-        self.formats[fmt_type] = {
-            "Name": name,
-            "Length": fmt_length,
-            "CompiledStruct": compiled_struct,
-            "Processors": processors,
-        }
+        view = self._view if view is None else view
+        compiled = compile_fmt(view, offset)
+        if compiled:
+            self.formats[compiled[0]] = compiled[1]
+            if self.scaling == LOG_SCALING:
+                apply_units({compiled[0]: compiled[1]}, self._head_units()[1])
 
         self.message_count += 1
+        return self._fmt_message(view, offset)
+
+    @staticmethod
+    def _fmt_message(view: Union[bytes, memoryview], offset: int) -> Dict[str, Any]:
+        """FMT record at ``offset`` as a message dict."""
+        fmt_type, fmt_length, name_b, format_b, cols_b = FMT_STRUCT.unpack_from(view, offset + 3)
         return {
             "mavpackettype": "FMT",
             "Type": fmt_type,
             "Length": fmt_length,
-            "Name": name,
-            "Format": format_str,
-            "Columns": ",".join(columns),
+            "Name": name_b.rstrip(b"\x00").decode("ascii", errors="ignore"),
+            "Format": format_b.rstrip(b"\x00").decode("ascii", errors="ignore"),
+            "Columns": ",".join(
+                c.strip() for c in cols_b.rstrip(b"\x00").decode("ascii", errors="ignore").split(",") if c.strip()
+            ),
         }
 
-    def _parse_message(self, fmt_type: int, offset: int) -> Optional[Dict[str, Any]]:
+    def _parse_message(
+        self, fmt_type: int, offset: int, view: Optional[Union[bytes, memoryview]] = None
+    ) -> Optional[Dict[str, Any]]:
         """Parse regular data message."""
         fmt_info = self.formats.get(fmt_type)
         if not fmt_info:
             return None
 
-        try:
-            values = fmt_info["CompiledStruct"].unpack_from(self._view, offset)
-        except Exception:
-            return None
-
-        msg = {"mavpackettype": fmt_info["Name"]}
-        value_idx = 0
-
-        for kind, col, scale in fmt_info["Processors"]:
-            val = values[value_idx]
-            value_idx += 1
-
-            if kind == "array":
-                msg[col] = list(values[value_idx - 1 : value_idx - 1 + scale])
-                value_idx += scale - 1
-            elif kind == "string":
-                msg[col] = val.decode("ascii", errors="ignore") if isinstance(val, (bytes, bytearray)) else val
-            else:  # numeric
-                if scale != 1.0:
-                    val *= scale
-                if self.rounding and isinstance(val, float):
-                    if col in self.columns_to_round or (fmt_info["Name"] == "GPS" and col == "Alt"):
-                        val = round(val, 7)
-                msg[col] = val
-
-        self.message_count += 1
+        msg = parse_message(fmt_info, self._view if view is None else view, offset, self.rounding)
+        if msg is not None:
+            self.message_count += 1
         return msg
 
+    def _head_units(self) -> Tuple[Dict[int, Dict[str, Any]], Dict[str, Any]]:
+        """FMT definitions and FMTU/UNIT/MULT tables from the head of the file, read once."""
+        if self._head is None:
+            with ExitStack() as stack:
+                # a compressed stream is read from the start again, through the block reader
+                mm = self._view.obj if self._records is None else stack.enter_context(open_log(self.file_path))
+                fmts = scan_fmts(mm)
+                log_units = scan_units(mm, fmts)
+            if self.scaling == LOG_SCALING:
+                apply_units(fmts, log_units)
+            self._head = fmts, log_units
+        return self._head
+
+    @property
+    def units(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """``{type: {column: {"unit", "mult"}}}`` from the log's FMTU messages."""
+        return units_table(*self._head_units())
+
+    def _segment_ranges(self) -> Optional[List[Tuple[int, int]]]:
+        """Byte ranges to decode, or None for the whole file, found once.
+
+        Decoding skips the FMT records outside the ranges, so the definitions from the head
+        of the file are loaded up front.
+        """
+        if self.segments is None:
+            return None
+        if self._segments is None:
+            fmts = self._head_units()[0]
+            with ExitStack() as stack:
+                mm = self._view.obj if self._records is None else stack.enter_context(open_log(self.file_path))
+                self._segments = segment_ranges(mm, fmts, self.segments)
+            for msg_type, fmt_info in fmts.items():
+                self.formats.setdefault(msg_type, fmt_info)
+        return self._segments[1]
+
+    @property
+    def segment_table(self) -> List[Dict[str, Any]]:
+        """Detected armed or in-flight segments (see ``segments.detect_segments``); empty without ``segments``."""
+        return self._segments[0] if self._segment_ranges() is not None else []
+
+    def _enter_segment(self, ranges: List[Tuple[int, int]]) -> Optional[int]:
+        """Move ``offset`` into the current or next range and return that range's end; None past the last one."""
+        for start, end in ranges:
+            if self.offset < end:
+                self.offset = max(self.offset, start)
+                return end
+        self.offset = self.size
+        return None
+
     def _find_next_header(self) -> Optional[int]:
         """Find next message header in file."""
         h0, h1 = self.header_bytes
@@ -140,15 +223,59 @@ class MAVParserLinear:
             self.offset += 1
         return None
 
+    def _stream_next(self) -> Optional[Dict[str, Any]]:
+        """``parse_next`` for compressed input: walk the decompressed stream."""
+        ranges = self._segment_ranges()
+        for offset, msg_type, buf, pos in self._records:
+            inside = ranges is None or any(start <= offset < end for start, end in ranges)
+            if msg_type == FMT_TYPE:
+                fmt_msg = self._parse_fmt(pos, buf)
+                self.offset = offset + FMT_LENGTH
+                if inside and (self.type_filter is None or "FMT" in self.type_filter):
+                    return fmt_msg
+                continue
+
+            fmt_info = self.formats[msg_type]
+            self.offset = offset + fmt_info["Length"]
+            if inside and (self.type_filter is None or fmt_info["Name"] in self.type_filter):
+                msg = self._parse_message(msg_type, pos + 3, buf)
+                if msg is not None:
+                    return msg
+        return None
+
+    def _materialize(self) -> None:
+        """Give streamed input random access: load a compressed log into memory, map a "pread" one."""
+        if self._records is None:
+            return
+        self._stream.close()
+        if self.compression:
+            with open_stream(self.file_path) as stream:
+                self._view = memoryview(stream.read())
+            self.size = len(self._view)
+        else:
+            self._map_file()
+        self._stream = self._records = None
+
     def parse_next(self) -> Optional[Dict[str, Any]]:
         """Return next message from file."""
+        if self._records is not None:
+            return self._stream_next()
+        if self.offset >= self._release_at:
+            self._release_behind()
+
+        ranges = self._segment_ranges()
         while self.offset < self.size - 3:
+            segment_end = self.size if ranges is None else self._enter_segment(ranges)
+            if segment_end is None:
+                return None
             header_pos = self._find_next_header()
             if header_pos is None:
                 self.offset = self.size
                 return None
 
             self.offset = header_pos
+            if header_pos >= segment_end:
+                continue
             msg_type = self._view[self.offset + 2]
 
             if msg_type == FMT_TYPE:
@@ -170,7 +297,9 @@ class MAVParserLinear:
                 if self.type_filter is None or fmt_info["Name"] in self.type_filter:
                     msg = self._parse_message(msg_type, self.offset + 3)
                     self.offset += length
-                    return msg
+                    if msg is not None:
+                        return msg
+                    continue
                 self.offset += length
                 continue
 
@@ -179,11 +308,205 @@ class MAVParserLinear:
         self.offset = self.size
         return None
 
-    def parse_all(self) -> List[Dict[str, Any]]:
-        messages = []
+    @contextmanager
+    def _profiled(self) -> Iterator[None]:
+        """Profile the enclosed work when the parser was created with ``profile``."""
+        if not self.profile:
+            yield
+            return
+        run = new_run_id()
+        try:
+            with profile_session(self.profile, run, "linear", self.profiler):
+                yield
+        finally:
+            self.profile_report = write_report(self.profile, run)
+
+    def _release_behind(self) -> None:
+        """With io="madvise", drop the pages (and page cache) the walk has passed.
+
+        The message walks (``parse_next`` and everything built on it, ``iter_index``) release
+        every ``RELEASE_STEP`` bytes as they go. The columnar paths read each page twice (scan,
+        then per-type decode), so they release the whole range once decoding is done. The
+        random-access index keeps its pages, which ``parser[i]`` reads again.
+        """
+        if self.io == "madvise" and hasattr(self, "_mmap") and self.offset > self._released:
+            advise(self._mmap, self._file.fileno(), self._released, self.offset, "DONTNEED")
+            self._released = self.offset - self.offset % mmap.PAGESIZE
+        self._release_at = self._released + RELEASE_STEP if self.io == "madvise" else float("inf")
+
+    def _next_messages(self) -> Iterator[Dict[str, Any]]:
+        """``parse_next`` until the end, reporting progress when a callback is set."""
+        if not self.progress:
+            while msg := self.parse_next():
+                yield msg
+            self._release_behind()
+            return
+        # the decompressed size of a .gz/.zst log is not known until the end
+        tracker = ProgressTracker(self.progress, None if self.compression else self.size)
+        start = self.offset
+        count = 0
         while msg := self.parse_next():
-            messages.append(msg)
-        return messages
+            yield msg
+            count += 1
+            if count % REPORT_EVERY == 0:
+                tracker.update(0, self.offset - start, count)
+                tracker.maybe_emit()
+        self._release_behind()
+        tracker.update(0, self.offset - start, count)
+        tracker.finish()
+
+    def parse_all(self) -> List[Dict[str, Any]]:
+        with self._profiled():
+            return list(self._next_messages())
+
+    def iter_messages(self) -> Iterator[Dict[str, Any]]:
+        """Yield the remaining messages one by one."""
+        with self._profiled():
+            yield from self._next_messages()
+
+    def iter_index(self) -> Iterator[Tuple[int, str, int]]:
+        """Yield ``(offset, type_name, length)`` for the remaining messages without decoding them."""
+        if self._records is not None:
+            for offset, msg_type, buf, pos in self._records:
+                if msg_type == FMT_TYPE:
+                    self._parse_fmt(pos, buf)
+                fmt_info = self.formats.get(msg_type)
+                name, length = (fmt_info["Name"], fmt_info["Length"]) if fmt_info else ("FMT", FMT_LENGTH)
+                self.offset = offset + length
+                if self.type_filter is None or name in self.type_filter:
+                    yield offset, name, length
+            return
+
+        while self.offset < self.size - 3:
+            if self.offset >= self._release_at:
+                self._release_behind()
+            header_pos = self._find_next_header()
+            if header_pos is None:
+                break
+
+            msg_type = self._view[header_pos + 2]
+            if msg_type == FMT_TYPE:
+                if header_pos + FMT_LENGTH > self.size:
+                    break
+                self._parse_fmt(header_pos)
+
+            fmt_info = self.formats.get(msg_type)
+            if fmt_info:
+                name, length = fmt_info["Name"], fmt_info["Length"]
+            elif msg_type == FMT_TYPE:
+                name, length = "FMT", FMT_LENGTH
+            else:
+                self.offset += 1
+                continue
+
+            if header_pos + length > self.size:
+                break
+            self.offset += length
+            if self.type_filter is None or name in self.type_filter:
+                yield header_pos, name, length
+
+        self.offset = self.size
+        self._release_behind()
+
+    def _scan_remaining_offsets(self) -> Tuple[Union[memoryview, bytearray], Dict[int, List[int]]]:
+        """Locate the remaining messages per type, learning FMT definitions on the way.
+
+        Returns the buffer the offsets point into: the log itself, or with io="pread" the wanted
+        records, copied out of the prefetch windows as they stream past (see ``pack_records``).
+        """
+        if self._records is not None and not self.compression:
+            view, offsets = pack_records(
+                self._records, self.formats, self.type_filter, self._parse_fmt, self._segment_ranges()
+            )
+        else:
+            self._materialize()
+            view = self._view
+            ranges = self._segment_ranges() or [(0, self.size)]
+            offsets = {}
+            for start, end in ranges:
+                if end <= self.offset:
+                    continue
+                start = max(start, self.offset)
+                found = scan_offsets(self._view, start, end, self.formats, self.type_filter, self._parse_fmt)
+                for msg_type, type_offsets in found.items():
+                    offsets.setdefault(msg_type, []).extend(type_offsets)
+        self.offset = self.size
+        self.message_count += sum(len(found) for msg_type, found in offsets.items() if msg_type != FMT_TYPE)
+        return view, offsets
+
+    def parse_columns(self) -> Dict[str, Dict[str, list]]:
+        """Decode the rest of the file into ``{type_name: {column: values}}``.
+
+        Messages are only located during the walk and are unpacked per type in bulk
+        afterwards, so no per-message dict is ever built.
+        """
+        with self._profiled():
+            view, offsets = self._scan_remaining_offsets()
+            columns = decode_columns(view, offsets, self.formats, self.rounding)
+            self._release_behind()
+            return columns
+
+    def to_dataframes(self) -> Dict[str, Any]:
+        """Decode the rest of the file into ``{type_name: pandas.DataFrame}``."""
+        import numpy as np
+        from src.business_logic.dataframes import build_dataframes
+
+        with self._profiled():
+            view, offsets = self._scan_remaining_offsets()
+            # one structured gather per type (see ``bulk_decode``) instead of a struct unpack per message
+            data = np.frombuffer(view, dtype=np.uint8)
+            buffers = decode_offsets_bulk(data, offsets, self.formats)
+            del data
+            self._release_behind()
+            return build_dataframes(buffers, self.formats, self.rounding, self.units)
+
+    def to_arrays(self) -> CompactColumns:
+        """Decode the rest of the file into ``array.array`` columns (see ``compact``); needs no NumPy."""
+        with self._profiled():
+            view, offsets = self._scan_remaining_offsets()
+            buffers = decode_buffers(view, offsets, self.formats)
+            self._release_behind()
+            return CompactColumns(*compact_buffers(buffers, self.formats), self.formats, self.rounding, self.units)
+
+    def derive(self, transforms: List[Rolling]) -> Dict[str, Dict[str, list]]:
+        """Run rolling transforms (see ``derived``) over the rest of the file; one table per series."""
+        check_transforms(transforms)
+        wanted = {transform.msg_type for transform in transforms}
+        with self._profiled():
+            view, offsets = self._scan_remaining_offsets()
+            offsets = {t: found for t, found in offsets.items() if self.formats[t]["Name"] in wanted}
+            tables = decode_columns(view, offsets, self.formats, rounding=False)
+            self._release_behind()
+        parts = derive_tables(tables, [transform.args() for transform in transforms])
+        return merge_derived([parts], transforms)
+
+    # -------------------------
+    # Random access
+    # -------------------------
+    def message_index(self) -> MessageIndex:
+        """Offset index over the file (or its ``segments``), built on first use; ``parse_next`` is not affected."""
+        if self._index is None:
+            self._materialize()
+            self._index = MessageIndex.build(self._view.obj, self.type_filter, ranges=self._segment_ranges())
+            if self.scaling == LOG_SCALING:
+                apply_units(self._index.fmts, self._head_units()[1])
+        return self._index
+
+    def _message_at(self, offset: int, msg_type: int) -> Optional[Dict[str, Any]]:
+        if msg_type == FMT_TYPE:
+            return self._fmt_message(self._view, offset)
+        return parse_message(self._index.fmts[msg_type], self._view, offset + 3, self.rounding)
+
+    def __len__(self) -> int:
+        """Number of messages ``parse_all`` returns for a fresh parser (respects ``type_filter`` and ``segments``)."""
+        return len(self.message_index())
+
+    def __getitem__(self, key: Union[int, slice, str]) -> Union[Dict[str, Any], List[Dict[str, Any]], MessageSequence]:
+        """``parser[i]`` / ``parser[i:j]`` by message number; ``parser["GPS"]`` for one type's messages."""
+        index = self.message_index()
+        if isinstance(key, str):
+            return index.sequence(self._message_at, key)
+        return index.sequence(self._message_at)[key]
 
     def print_summary(self) -> None:
         print(f"\n{self.message_count:,} messages parsed.")
@@ -191,6 +514,7 @@ class MAVParserLinear:
 
 if __name__ == "__main__":
     import time
+    from src.utils.config import FILE_PATH
     from pymavlink import mavutil
 
     with MAVParserLinear(FILE_PATH, type_filter=["GPS"]) as parser:
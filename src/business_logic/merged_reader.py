@@ -0,0 +1,145 @@
+"""Read several logs as one stream in global TimeUS order (k-way heap merge).
+
+Every log is streamed by its own parser; the merge holds one pending message per log (plus
+``window`` messages per log when local reordering is enabled), so memory does not grow
+with the number or the size of the logs.
+"""
+
+import heapq
+import os
+from contextlib import ExitStack
+from itertools import count
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Tuple, Union, Mapping
+
+from src.business_logic.mav_parser_linear import MAVParserLinear
+
+SOURCE_KEY = "source"
+
+
+def _timed(messages: Iterable[Dict[str, Any]], offset: int, on: str) -> Iterator[Tuple[float, Dict[str, Any]]]:
+    """``(time, message)`` with ``offset`` applied to ``on``.
+
+    Messages without a timestamp (FMT, PARM, ...) take the time of the message before them,
+    so they stay where they were in their log.
+    """
+    last = float("-inf")
+    for msg in messages:
+        t = msg.get(on)
+        if t is None:
+            yield last, msg
+            continue
+        if offset:
+            t = msg[on] = t + offset
+        last = t
+        yield t, msg
+
+
+def _reordered(timed: Iterator[Tuple[float, Dict[str, Any]]], window: int) -> Iterator[Tuple[float, Dict[str, Any]]]:
+    """Sort a nearly sorted stream, allowing each message to move back by up to ``window`` places."""
+    heap: List[Tuple[float, int, Dict[str, Any]]] = []
+    for seq, (t, msg) in enumerate(timed):
+        heapq.heappush(heap, (t, seq, msg))
+        if len(heap) > window:
+            t, _, msg = heapq.heappop(heap)
+            yield t, msg
+    while heap:
+        t, _, msg = heapq.heappop(heap)
+        yield t, msg
+
+
+def merge_messages(
+    streams: Mapping[str, Iterable[Dict[str, Any]]],
+    offsets: Optional[Mapping[str, int]] = None,
+    window: int = 0,
+    on: str = "TimeUS",
+    source_key: str = SOURCE_KEY,
+) -> Iterator[Dict[str, Any]]:
+    """Merge per-log message streams into one stream ordered by ``on``.
+
+    Each stream must be (nearly, see ``window``) sorted by ``on``. ``offsets`` adds a clock
+    offset in ``on`` units per source, so logs recorded with different clocks line up; the
+    shifted time is written back into the message. Every message is tagged with its source
+    name under ``source_key``. Ties keep the order of ``streams``.
+    """
+    offsets = offsets or {}
+    unknown = set(offsets) - set(streams)
+    if unknown:
+        raise ValueError(f"Clock offsets for unknown sources: {sorted(unknown)}")
+
+    heads: List[Tuple[float, int, int, Dict[str, Any]]] = []
+    iterators: List[Iterator[Tuple[float, Dict[str, Any]]]] = []
+    names: List[str] = []
+    seq = count()
+    for rank, (name, messages) in enumerate(streams.items()):
+        timed = _timed(messages, offsets.get(name, 0), on)
+        iterators.append(_reordered(timed, window) if window > 0 else timed)
+        names.append(name)
+        for t, msg in iterators[rank]:
+            heads.append((t, rank, next(seq), msg))
+            break
+    heapq.heapify(heads)
+
+    while heads:
+        _, rank, _, msg = heads[0]
+        msg[source_key] = names[rank]
+        for t, following in iterators[rank]:
+            heapq.heapreplace(heads, (t, rank, next(seq), following))
+            break
+        else:
+            heapq.heappop(heads)
+        yield msg
+
+
+def source_names(paths: List[str]) -> List[str]:
+    """Short source names for ``paths``: file names, or full paths when file names repeat."""
+    names = [os.path.basename(path) for path in paths]
+    return names if len(set(names)) == len(names) else list(paths)
+
+
+class MergedReader:
+    """Stream the messages of several logs on one timeline.
+
+    ``sources`` is a list of paths, or a mapping of source name to a path or to any parser
+    with ``iter_messages()`` (linear or parallel). Paths are opened with ``MAVParserLinear``.
+
+        with MergedReader({"copter": "a.bin", "rover": "b.bin"}, offsets={"rover": -1_500}) as reader:
+            for msg in reader:
+                msg["source"], msg["TimeUS"]
+    """
+
+    def __init__(
+        self,
+        sources: Union[List[str], Mapping[str, Any]],
+        type_filter: Optional[List[str]] = None,
+        offsets: Optional[Mapping[str, int]] = None,
+        window: int = 0,
+        on: str = "TimeUS",
+        source_key: str = SOURCE_KEY,
+    ):
+        if not isinstance(sources, Mapping):
+            sources = dict(zip(source_names(list(sources)), sources))
+        self.type_filter = type_filter
+        self.offsets = dict(offsets or {})
+        self.window = window
+        self.on = on
+        self.source_key = source_key
+        self._stack = ExitStack()
+        self.parsers: Dict[str, Any] = {}
+        for name, source in sources.items():
+            if isinstance(source, (str, os.PathLike)):
+                source = self._stack.enter_context(MAVParserLinear(os.fspath(source), type_filter=type_filter))
+            self.parsers[name] = source
+
+    def __enter__(self) -> "MergedReader":
+        return self
+
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the parsers opened from paths."""
+        self._stack.close()
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        streams = {name: parser.iter_messages() for name, parser in self.parsers.items()}
+        return merge_messages(streams, self.offsets, self.window, self.on, self.source_key)
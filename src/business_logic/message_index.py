@@ -0,0 +1,144 @@
+"""Offset index over a log: random access to messages by number, globally or per type.
+
+Building the index walks headers once (vectorised with NumPy when available); after that
+``len`` and ``[i]`` are O(1) and only the requested messages are decoded.
+"""
+
+from array import array
+from collections.abc import Sequence
+from typing import List, Dict, Any, Optional, Set, Tuple, Union, Callable
+
+from src.business_logic.columnar import scan_offsets
+from src.business_logic.mav_core import scan_fmts, walkable_fmts
+
+# decode(offset, msg_type) -> message dict
+Decoder = Callable[[int, int], Optional[Dict[str, Any]]]
+
+
+def _locate(
+    buf: Any,
+    fmts: Dict[int, Dict[str, Any]],
+    type_filter: Optional[Set[str]],
+    ranges: Optional[List[Tuple[int, int]]] = None,
+) -> Tuple[array, bytes]:
+    """Offsets (``array('q')``) and types of the messages in ``buf``, in file order.
+
+    With ``ranges`` (sorted, non-overlapping) only messages whose header starts inside one are kept.
+    """
+    wanted = {t for t, info in fmts.items() if type_filter is None or info["Name"] in type_filter}
+    try:
+        import numpy as np
+        from src.business_logic.bulk_decode import locate_messages
+    except ImportError:
+        found = scan_offsets(memoryview(buf), 0, len(buf), fmts)
+        pairs = sorted((offset, t) for t in found if t in wanted for offset in found[t])
+        if ranges is not None:
+            pairs = [(offset, t) for offset, t in pairs if any(start <= offset < end for start, end in ranges)]
+        return array("q", [offset for offset, _ in pairs]), bytes(t for _, t in pairs)
+
+    data = np.frombuffer(buf, dtype=np.uint8)
+    offsets, types = locate_messages(data, 0, len(buf), fmts)
+    del data
+    if len(wanted) < len(fmts):
+        keep = np.isin(types, np.array(sorted(wanted), dtype=np.uint8))
+        offsets, types = offsets[keep], types[keep]
+    if ranges is not None:
+        starts = np.array([start for start, _ in ranges], dtype=np.int64)
+        ends = np.array([end for _, end in ranges], dtype=np.int64)
+        # the range a header falls in is the last one starting at or before it
+        which = np.searchsorted(starts, offsets, side="right") - 1
+        keep = which >= 0
+        keep[keep] = offsets[keep] < ends[which[keep]]
+        offsets, types = offsets[keep], types[keep]
+    return array("q", offsets.astype(np.int64).tobytes()), types.tobytes()
+
+
+class MessageIndex:
+    """Offsets and types of the messages of a log, in file order; per-type offsets on demand."""
+
+    def __init__(self, offsets: array, types: bytes, fmts: Dict[int, Dict[str, Any]]):
+        self.offsets = offsets
+        self.types = types
+        self.fmts = fmts
+        self._per_type: Dict[int, array] = {}
+        present = set(types)
+        self._names = {info["Name"]: msg_type for msg_type, info in fmts.items() if msg_type in present}
+
+    @classmethod
+    def build(
+        cls,
+        buf: Any,
+        type_filter: Optional[Set[str]] = None,
+        fmts: Optional[Dict[int, Dict[str, Any]]] = None,
+        ranges: Optional[List[Tuple[int, int]]] = None,
+    ) -> "MessageIndex":
+        """Index ``buf`` (mmap, bytes, ...) using its FMT definitions unless ``fmts`` is given.
+
+        ``ranges`` limits the index to the messages inside those byte ranges (see ``segments``).
+        """
+        fmts = walkable_fmts(scan_fmts(buf, len(buf)) if fmts is None else fmts)
+        return cls(*_locate(buf, fmts, type_filter, ranges), fmts)
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    @property
+    def names(self) -> List[str]:
+        return sorted(self._names)
+
+    def offsets_of(self, name: str) -> array:
+        """File offsets of the messages of type ``name``; KeyError if the index holds none."""
+        if name not in self._names:
+            raise KeyError(name)
+        msg_type = self._names[name]
+        found = self._per_type.get(msg_type)
+        if found is None:
+            try:
+                import numpy as np
+            except ImportError:
+                found = array("q", [o for o, t in zip(self.offsets, self.types) if t == msg_type])
+            else:
+                mask = np.frombuffer(self.types, dtype=np.uint8) == msg_type
+                found = array("q", np.frombuffer(self.offsets, dtype=np.int64)[mask].tobytes())
+            self._per_type[msg_type] = found
+        return found
+
+    def sequence(self, decode: Decoder, name: Optional[str] = None) -> "MessageSequence":
+        """All indexed messages, or those of type ``name``, as a lazily decoded sequence."""
+        if name is None:
+            return MessageSequence(self.offsets, self.types, decode)
+        return MessageSequence(self.offsets_of(name), self._names[name], decode)
+
+
+class MessageSequence(Sequence):
+    """Read-only list of indexed messages; an item is decoded only when it is accessed.
+
+    Integer keys return one message, slices return a list of messages.
+    """
+
+    def __init__(self, offsets: array, types: Union[bytes, int], decode: Decoder):
+        self._offsets = offsets
+        self._types = types
+        self._decode = decode
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def _type_at(self, i: int) -> int:
+        return self._types if isinstance(self._types, int) else self._types[i]
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+        if isinstance(key, slice):
+            return [self._decode(self._offsets[i], self._type_at(i)) for i in range(*key.indices(len(self)))]
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError("message index out of range")
+        return self._decode(self._offsets[key], self._type_at(key))
+
+    def offset(self, i: int) -> int:
+        """File offset of message ``i``."""
+        return self._offsets[i]
+
+    def __repr__(self) -> str:
+        return f"<MessageSequence of {len(self)} messages>"
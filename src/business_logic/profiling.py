@@ -0,0 +1,271 @@
+"""Opt-in profiling of parser runs: a stack sampler with per-message-type attribution, or cProfile.
+
+Every profiled unit of work (a whole linear run, or one chunk in the parallel modes)
+writes its own artifact into the profile directory:
+
+* ``<run>-<label>-<worker>.json``: stack samples, folded stacks and samples per message type
+* ``<run>-<label>-<worker>.prof``: ``pstats`` data, when the "cprofile" profiler is selected
+
+The sampler reads the profiled thread's stack from a background thread. The message type
+of a sample comes from the ``fmt_info`` local of the innermost decoder frame that has one,
+so time is attributed to types without touching the decode loops. ``merge_profiles``
+combines the artifacts of one run into ``report.json``.
+"""
+
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from importlib import import_module
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+
+PROFILERS = ("sample", "cprofile")
+DEFAULT_INTERVAL = 0.001
+NO_TYPE = "(none)"
+MAX_DEPTH = 64
+
+_switch_lock = threading.Lock()
+_switch_users = 0
+_saved_switch_interval = sys.getswitchinterval()
+
+
+def new_run_id() -> str:
+    """Tag shared by the artifacts of one parser run; a random suffix keeps runs in the same second apart."""
+    return time.strftime("%Y%m%d-%H%M%S-") + f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+
+def worker_id() -> str:
+    """``<pid>-<thread id>``: unique per process, thread and sub-interpreter worker."""
+    return f"{os.getpid()}-{threading.get_ident()}"
+
+
+def _set_fast_switching(interval: float) -> None:
+    # the sampler only runs when the profiled thread releases the GIL, so release it often
+    global _switch_users, _saved_switch_interval
+    with _switch_lock:
+        if _switch_users == 0:
+            _saved_switch_interval = sys.getswitchinterval()
+            sys.setswitchinterval(min(interval, _saved_switch_interval))
+        _switch_users += 1
+
+
+def _restore_switching() -> None:
+    global _switch_users
+    with _switch_lock:
+        _switch_users -= 1
+        if _switch_users == 0:
+            sys.setswitchinterval(_saved_switch_interval)
+
+
+def _in_subinterpreter() -> bool:
+    try:
+        import _interpreters
+    except ImportError:
+        return False
+    return _interpreters.get_current() != _interpreters.get_main()
+
+
+def _frame_type(frame: Any) -> Optional[str]:
+    # f_locals snapshots a frame's locals (before 3.13), which would keep buffers of a running
+    # worker alive past its ``with open_range`` block, so only touch frames that decode a type
+    if "fmt_info" not in frame.f_code.co_varnames:
+        return None
+    try:
+        fmt_info = frame.f_locals.get("fmt_info")
+    except Exception:
+        return None
+    if isinstance(fmt_info, dict) and "Name" in fmt_info:
+        return fmt_info["Name"]
+    return None
+
+
+class StackSampler:
+    """Sample one thread's stack every ``interval`` seconds from a background thread.
+
+    ``sys._current_frames`` is not safe in sub-interpreters (it crashes 3.13), so there the
+    profiled thread samples itself from a ``sys.settrace`` call hook instead: a sample is
+    taken at the first Python call after each interval.
+    """
+
+    def __init__(self, thread_id: Optional[int] = None, interval: float = DEFAULT_INTERVAL):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.samples = 0
+        self.types: Counter = Counter()
+        self.functions: Counter = Counter()
+        self.stacks: Counter = Counter()
+        self.elapsed = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started = 0.0
+        self._next_sample = 0.0
+
+    def start(self) -> "StackSampler":
+        self._started = time.perf_counter()
+        if _in_subinterpreter():
+            self._next_sample = self._started + self.interval
+            sys.settrace(self._trace)
+            return self
+        _set_fast_switching(self.interval)
+        self._thread = threading.Thread(target=self._run, name="stack-sampler")
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._thread is None:
+            sys.settrace(None)
+        else:
+            self._stop.set()
+            self._thread.join()
+            _restore_switching()
+        self.elapsed = time.perf_counter() - self._started
+
+    def __enter__(self) -> "StackSampler":
+        return self.start()
+
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        self.stop()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self._record(frame)
+            # holding on to a frame keeps its locals (and any mmap views) alive
+            del frame
+
+    def _trace(self, frame: Any, event: str, arg: Any) -> None:
+        now = time.perf_counter()
+        if now >= self._next_sample:
+            self._record(frame)
+            self._next_sample = now + self.interval
+        return None
+
+    def _record(self, frame: Any) -> None:
+        names: List[str] = []
+        msg_type = None
+        depth = 0
+        while frame is not None and depth < MAX_DEPTH:
+            code = frame.f_code
+            names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+            if msg_type is None:
+                msg_type = _frame_type(frame)
+            frame = frame.f_back
+            depth += 1
+        self.samples += 1
+        self.types[msg_type or NO_TYPE] += 1
+        self.functions[names[0]] += 1
+        self.stacks[";".join(reversed(names))] += 1
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "samples": self.samples,
+            "interval": self.interval,
+            "elapsed": self.elapsed,
+            "types": dict(self.types.most_common()),
+            "functions": dict(self.functions.most_common()),
+            "stacks": dict(self.stacks),
+        }
+
+
+@contextmanager
+def profile_session(
+    out_dir: str,
+    run: str,
+    label: str = "main",
+    profiler: str = "sample",
+    interval: float = DEFAULT_INTERVAL,
+) -> Iterator[StackSampler]:
+    """Profile the calling thread for the duration of the block and write its artifacts.
+
+    The sampler always runs, so per-type attribution is available with either profiler;
+    "cprofile" additionally records exact call counts and times into a ``.prof`` file.
+    """
+    if profiler not in PROFILERS:
+        raise ValueError(f"Unknown profiler {profiler!r}, expected one of {PROFILERS}")
+    os.makedirs(out_dir, exist_ok=True)
+    stem = os.path.join(out_dir, f"{run}-{label}-{worker_id()}")
+    profile = cProfile.Profile() if profiler == "cprofile" else None
+
+    sampler = StackSampler(interval=interval).start()
+    if profile is not None:
+        profile.enable()
+    try:
+        yield sampler
+    finally:
+        if profile is not None:
+            profile.disable()
+        sampler.stop()
+        artifact = {"run": run, "label": label, "worker": worker_id(), "profiler": profiler, **sampler.report()}
+        with open(stem + ".json", "w", encoding="utf-8") as f:
+            json.dump(artifact, f)
+        if profile is not None:
+            profile.dump_stats(stem + ".prof")
+
+
+def profiled_chunk(args: Tuple[str, str, Dict[str, Any], Any]) -> Any:
+    """Worker entry point: run the named chunk worker inside a ``profile_session``.
+
+    A module-level function, so it works on every backend (including sub-interpreters).
+    """
+    module_name, func_name, settings, inner_args = args
+    func = getattr(import_module(module_name), func_name)
+    label = f"chunk{inner_args[0]}"
+    with profile_session(settings["dir"], settings["run"], label, settings["profiler"], settings["interval"]):
+        return func(inner_args)
+
+
+def merge_profiles(out_dir: str, run: Optional[str] = None) -> Dict[str, Any]:
+    """Combine the ``.json`` artifacts of ``run`` (default: all) into one report with per-type shares."""
+    types: Counter = Counter()
+    functions: Counter = Counter()
+    workers: Counter = Counter()
+    samples = 0
+    artifacts = 0
+    for name in sorted(os.listdir(out_dir)):
+        if not name.endswith(".json") or name == "report.json":
+            continue
+        with open(os.path.join(out_dir, name), encoding="utf-8") as f:
+            artifact = json.load(f)
+        if "samples" not in artifact or (run is not None and artifact.get("run") != run):
+            continue
+        artifacts += 1
+        samples += artifact["samples"]
+        types.update(artifact["types"])
+        functions.update(artifact["functions"])
+        workers[artifact["worker"]] += artifact["samples"]
+
+    def shares(counts: Counter) -> Dict[str, float]:
+        return {key: round(count / samples, 4) for key, count in counts.most_common()} if samples else {}
+
+    return {
+        "run": run,
+        "artifacts": artifacts,
+        "samples": samples,
+        "types": shares(types),
+        "functions": shares(functions),
+        "workers": dict(workers.most_common()),
+    }
+
+
+def write_report(out_dir: str, run: Optional[str] = None) -> Dict[str, Any]:
+    """Merge the artifacts of a run and store the result as ``report.json``."""
+    report = merge_profiles(out_dir, run)
+    with open(os.path.join(out_dir, "report.json"), "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def format_report(report: Dict[str, Any], top: int = 10) -> str:
+    """Human readable top message types and functions of a merged report."""
+    lines = [f"{report['samples']} samples from {report['artifacts']} profiles ({len(report['workers'])} workers)"]
+    lines.append("decode time by message type:")
+    lines += [f"  {name:<16} {share:6.1%}" for name, share in list(report["types"].items())[:top]]
+    lines.append("hottest functions (self time):")
+    lines += [f"  {name:<40} {share:6.1%}" for name, share in list(report["functions"].items())[:top]]
+    return "\n".join(lines)
@@ -0,0 +1,248 @@
+"""Progress events for long parses: bytes processed, messages decoded, MB/s and ETA.
+
+The callback receives a dict (see ``ProgressTracker.event``) at most every ``interval``
+seconds, plus a final event when the run ends. Workers in the threads and process
+modes report from inside their chunk through a queue; each worker also throttles its
+own reports, so the decode loops only pay for an occasional clock read. The same
+checkpoints enforce the run's limits (``limits``).
+"""
+
+import os
+import queue
+import threading
+import time
+from importlib import import_module
+from typing import Dict, Any, Optional, Callable, List, Tuple
+
+from src.business_logic.limits import ChunkLimits
+
+ProgressCallback = Callable[[Dict[str, Any]], None]
+# checkpoint(offset, messages, nbytes) -> True to stop decoding
+Checkpoint = Callable[[int, int, int], bool]
+
+PROGRESS_INTERVAL = 0.25
+# decoders look at the clock once per this many messages
+REPORT_EVERY = 4096
+
+_local = threading.local()
+
+
+# -------------------------
+# Worker side
+# -------------------------
+class ChunkCheckpoint:
+    """Called by a chunk decoder as it goes: reports progress and checks the run's limits.
+
+    ``checkpoint(offset, messages, nbytes)`` sends ``(worker, index, bytes_done, messages)``
+    to ``channel`` (if any) and returns True when the decoder should stop early (see
+    ``limits``); both happen at most every ``interval`` seconds unless ``force`` is set.
+    """
+
+    def __init__(
+        self,
+        channel: Any,
+        index: int,
+        start: int,
+        interval: float = PROGRESS_INTERVAL,
+        limits: Optional[ChunkLimits] = None,
+    ):
+        self.channel = channel
+        self.index = index
+        self.start = start
+        self.interval = interval
+        self.limits = limits
+        self.worker = f"{os.getpid()}-{threading.get_ident()}"
+        self.messages = 0
+        self.nbytes = 0
+        self.stopped = False
+        self._last = 0.0
+
+    def __call__(self, offset: int, messages: int, nbytes: int = 0, force: bool = False) -> bool:
+        self.messages = messages
+        self.nbytes = nbytes
+        now = time.monotonic()
+        if force or now - self._last >= self.interval:
+            self._last = now
+            if self.channel is not None:
+                self.channel.put((self.worker, self.index, offset - self.start, messages))
+            if self.limits is not None and not self.stopped:
+                self.stopped = self.limits.check(nbytes) is not None
+        return self.stopped
+
+
+def current_checkpoint() -> Optional[ChunkCheckpoint]:
+    """Checkpoint of the chunk running in this thread, or None when the run is not tracked."""
+    return getattr(_local, "checkpoint", None)
+
+
+def tracked_chunk(args: Tuple[str, str, Any, float, Optional[tuple], int, Tuple[int, int], Any]) -> Any:
+    """Worker entry point: run the named chunk worker with a ``ChunkCheckpoint`` installed.
+
+    ``limits`` holds the ``ChunkLimits`` arguments after the chunk index, or None.
+    """
+    module_name, func_name, channel, interval, limits, index, chunk, inner_args = args
+    func = getattr(import_module(module_name), func_name)
+    checkpoint = ChunkCheckpoint(channel, index, chunk[0], interval, ChunkLimits(index, *limits) if limits else None)
+    _local.checkpoint = checkpoint
+    try:
+        return func(inner_args)
+    finally:
+        _local.checkpoint = None
+        checkpoint(chunk[1], checkpoint.messages, checkpoint.nbytes, force=True)
+
+
+# -------------------------
+# Parent side
+# -------------------------
+class ProgressTracker:
+    """Aggregate per-chunk progress and hand throttled events to ``callback``."""
+
+    def __init__(
+        self,
+        callback: ProgressCallback,
+        total_bytes: Optional[int],
+        chunks: int = 1,
+        interval: float = PROGRESS_INTERVAL,
+    ):
+        self.callback = callback
+        self.total_bytes = total_bytes
+        self.chunks = chunks
+        self.interval = interval
+        self.started = time.monotonic()
+        self._bytes: Dict[int, int] = {}
+        self._messages: Dict[int, int] = {}
+        self._done: set = set()
+        self._counted: set = set()
+        self._workers: Dict[str, float] = {}
+        self._last_emit = 0.0
+        self._lock = threading.Lock()
+        # the monitor thread and the parent both emit; the callback never runs twice at once
+        self._emit_lock = threading.Lock()
+
+    def update(self, index: int, bytes_done: int, messages: int, worker: str = "main") -> None:
+        with self._lock:
+            self._workers[worker] = time.monotonic()
+            if index in self._counted:
+                # a late report from the worker must not undo the exact count of a finished chunk
+                return
+            if index not in self._done:
+                self._bytes[index] = bytes_done
+            self._messages[index] = messages
+
+    def chunk_done(self, index: int, size: int, messages: Optional[int] = None) -> None:
+        with self._lock:
+            self._done.add(index)
+            self._bytes[index] = size
+            if messages is not None:
+                self._messages[index] = messages
+                self._counted.add(index)
+        self.maybe_emit()
+
+    def event(self, finished: bool = False) -> Dict[str, Any]:
+        """Snapshot of the run.
+
+        Keys: bytes, total_bytes, fraction, messages, elapsed_s, mb_per_s, eta_s, chunks_done,
+        chunks, finished, and ``workers``: seconds since each worker last reported (to spot
+        stalls). total_bytes, fraction and eta_s are None when the size is not known up front
+        (linear parser on a compressed stream).
+        """
+        now = time.monotonic()
+        with self._lock:
+            done_bytes = sum(self._bytes.values())
+            messages = sum(self._messages.values())
+            workers = {worker: round(now - seen, 3) for worker, seen in self._workers.items()}
+            chunks_done = len(self._done)
+        elapsed = now - self.started
+        rate = done_bytes / elapsed if elapsed > 0 else 0.0
+        known = self.total_bytes is not None
+        remaining = max(0, self.total_bytes - done_bytes) if known else None
+        return {
+            "bytes": done_bytes,
+            "total_bytes": self.total_bytes,
+            "fraction": (done_bytes / self.total_bytes if self.total_bytes else 1.0) if known else None,
+            "messages": messages,
+            "elapsed_s": elapsed,
+            "mb_per_s": rate / (1 << 20),
+            "eta_s": remaining / rate if known and rate > 0 else None,
+            "chunks_done": chunks_done,
+            "chunks": self.chunks,
+            "workers": workers,
+            "finished": finished,
+        }
+
+    def maybe_emit(self) -> None:
+        with self._emit_lock:
+            now = time.monotonic()
+            if now - self._last_emit >= self.interval:
+                self._last_emit = now
+                self.callback(self.event())
+
+    def finish(self) -> None:
+        with self._emit_lock:
+            self.callback(self.event(finished=True))
+
+
+class ProgressMonitor:
+    """Drain worker reports from a channel into a tracker on a background thread.
+
+    Also emits on a timer when no report arrives, so a stalled worker's age keeps growing.
+    """
+
+    def __init__(self, tracker: ProgressTracker, channel: Any):
+        self.tracker = tracker
+        self.channel = channel
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="progress-monitor", daemon=True)
+
+    def __enter__(self) -> "ProgressMonitor":
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        self._stop.set()
+        self._thread.join()
+        self._drain()
+
+    def _drain(self) -> None:
+        while True:
+            try:
+                worker, index, bytes_done, messages = self.channel.get_nowait()
+            except (queue.Empty, EOFError, OSError):
+                return
+            self.tracker.update(index, bytes_done, messages, worker)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                worker, index, bytes_done, messages = self.channel.get(timeout=self.tracker.interval)
+            except queue.Empty:
+                pass
+            except (EOFError, OSError):
+                return
+            else:
+                self.tracker.update(index, bytes_done, messages, worker)
+            self.tracker.maybe_emit()
+
+
+def chunk_tasks(
+    func: Callable,
+    args_list: List[tuple],
+    chunks: List[Tuple[int, int]],
+    channel: Any,
+    interval: float,
+    limits: Optional[tuple] = None,
+) -> List[tuple]:
+    """Wrap chunk-worker arguments (one per chunk, in chunk order) for ``tracked_chunk``."""
+    return [
+        (func.__module__, func.__name__, channel, interval, limits, i, chunks[i], args)
+        for i, args in enumerate(args_list)
+    ]
+
+
+def format_event(event: Dict[str, Any]) -> str:
+    """One-line status, e.g. for a terminal: percent, MB/s, messages and ETA."""
+    eta = "" if event["eta_s"] is None or event["finished"] else f" ETA {event['eta_s']:.0f}s"
+    done = f"{event['bytes'] / (1 << 20):,.1f}"
+    if event["total_bytes"] is not None:
+        done = f"{event['fraction']:6.1%} {done}/{event['total_bytes'] / (1 << 20):,.1f}"
+    return f"{done} MB {event['mb_per_s']:,.1f} MB/s {event['messages']:,} msgs{eta}"
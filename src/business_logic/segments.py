@@ -0,0 +1,141 @@
+"""Armed and in-flight segments of a log, found from its low-rate EV, ARM and MODE messages.
+
+These types are rare, so they are located with ``find`` (``mav_core.find_records``)
+without walking the high-rate messages around them; the segment table costs a small
+fraction of a full parse. A segment is a byte range of the log: it starts at the record
+that opened it (arming, or the takeoff event) and ends after the record that closed it
+(disarming, or the landing event), or at the end of the log. Parsers created with
+``segments="flight"`` (or "armed", or explicit ``(start, end)`` ranges) decode only
+these ranges.
+"""
+
+import mmap
+from typing import List, Dict, Any, Optional, Sequence, Tuple, Union
+
+from src.business_logic.mav_core import find_records, plan_chunks, scan_fmts
+from src.business_logic.sources import BlockReader, open_log
+
+# ArduPilot EV ids: ARMED, DISARMED, AUTO_ARMED, LAND_COMPLETE, NOT_LANDED
+EVENTS = {10: "arm", 11: "disarm", 15: "arm", 18: "land", 28: "takeoff"}
+SEGMENT_KINDS = ("flight", "armed")
+# the kind of the single row returned for logs without any arming record
+WHOLE_LOG = "log"
+
+Segments = Union[None, str, Sequence[Tuple[int, int]]]
+
+
+def check_segments(segments: Segments) -> Segments:
+    if isinstance(segments, str) and segments not in SEGMENT_KINDS:
+        raise ValueError(f"segments must be one of {SEGMENT_KINDS} or a list of (start, end) offsets, got {segments!r}")
+    return segments
+
+
+def _events(mm: Union[bytes, mmap.mmap, BlockReader], fmts: Dict[int, Dict[str, Any]]) -> List[tuple]:
+    """``(offset, end, message, event)`` for every arming and landing record, in file order."""
+    lengths = {info["Name"]: info["Length"] for info in fmts.values()}
+    events = []
+    for offset, msg in find_records(mm, fmts, "ARM"):
+        if "ArmState" in msg:
+            events.append((offset, offset + lengths["ARM"], msg, "arm" if msg["ArmState"] else "disarm"))
+    for offset, msg in find_records(mm, fmts, "EV"):
+        event = EVENTS.get(msg.get("Id"))
+        if event is not None:
+            events.append((offset, offset + lengths["EV"], msg, event))
+    events.sort(key=lambda event: event[0])
+    return events
+
+
+def _segment(kind: str, start: int, end: int, opened: Optional[dict], closed: Optional[dict], modes: list) -> dict:
+    # MODE numbers in effect during the segment, in order (the vehicle type names them)
+    before = [mode for offset, mode in modes if offset <= start][-1:]
+    return {
+        "kind": kind,
+        "start": start,
+        "end": end,
+        "bytes": end - start,
+        "start_TimeUS": opened.get("TimeUS") if opened else None,
+        "end_TimeUS": closed.get("TimeUS") if closed else None,
+        "modes": before + [mode for offset, mode in modes if start < offset < end],
+    }
+
+
+def detect_segments(
+    mm: Union[bytes, mmap.mmap, BlockReader], fmts: Dict[int, Dict[str, Any]], kind: str = "flight"
+) -> List[Dict[str, Any]]:
+    """Segment table of the log: one dict per armed (``kind="armed"``) or in-flight segment.
+
+    Rows hold ``start``/``end`` byte offsets, ``bytes``, ``start_TimeUS``/``end_TimeUS``
+    (None at the end of the log) and the MODE numbers in effect. In-flight means armed and
+    not landed (EV NOT_LANDED .. LAND_COMPLETE); logs without landing events fall back to
+    the armed segments. A log without any arming record has no information to go on and
+    gets one ``"log"`` row covering the whole file.
+    """
+    check_segments(kind)
+    size = len(mm)
+    events = _events(mm, fmts)
+    modes = [(offset, msg.get("Mode")) for offset, msg in find_records(mm, fmts, "MODE")]
+    if not any(event in ("arm", "disarm") for *_, event in events):
+        return [_segment(WHOLE_LOG, 0, size, None, None, modes)]
+
+    use_landing = kind == "flight" and any(event in ("land", "takeoff") for *_, event in events)
+    armed = airborne = False
+    opened: Optional[Tuple[int, dict]] = None
+    segments = []
+    for offset, end, msg, event in events:
+        if event in ("arm", "disarm"):
+            armed = event == "arm"
+            airborne = airborne and armed
+        else:
+            airborne = event == "takeoff"
+        active = armed and (airborne or not use_landing)
+        if active and opened is None:
+            opened = offset, msg
+        elif not active and opened is not None:
+            segments.append(_segment(kind, opened[0], end, opened[1], msg, modes))
+            opened = None
+    if opened is not None:
+        segments.append(_segment(kind, opened[0], size, opened[1], None, modes))
+    return segments
+
+
+def log_segments(file_path: str, kind: str = "flight") -> List[Dict[str, Any]]:
+    """Segment table of the log at ``file_path`` (see ``detect_segments``), without a parser."""
+    with open_log(file_path) as mm:
+        return detect_segments(mm, scan_fmts(mm), kind)
+
+
+def segment_ranges(
+    mm: Union[bytes, mmap.mmap, BlockReader], fmts: Dict[int, Dict[str, Any]], segments: Segments
+) -> Tuple[List[Dict[str, Any]], List[Tuple[int, int]]]:
+    """``(table, ranges)`` for a parser's ``segments`` option: sorted, non-overlapping byte ranges.
+
+    ``table`` is the detected segment table, or empty for explicit ``(start, end)`` ranges.
+    """
+    check_segments(segments)
+    table = detect_segments(mm, fmts, segments) if isinstance(segments, str) else []
+    spans = sorted((row["start"], row["end"]) for row in table) if isinstance(segments, str) else sorted(segments)
+    ranges: List[Tuple[int, int]] = []
+    for start, end in spans:
+        start, end = max(0, start), min(end, len(mm))
+        if start >= end:
+            continue
+        if ranges and start <= ranges[-1][1]:
+            ranges[-1] = ranges[-1][0], max(ranges[-1][1], end)
+        else:
+            ranges.append((start, end))
+    return table, ranges
+
+
+def plan_segments(
+    mm: Union[bytes, mmap.mmap, BlockReader],
+    fmts: Dict[int, Dict[str, Any]],
+    ranges: List[Tuple[int, int]],
+    num_chunks: int,
+) -> List[Tuple[int, int]]:
+    """Chunks that cover only ``ranges``: ``num_chunks`` shared out by range size, at least one per range."""
+    total = sum(end - start for start, end in ranges) or 1
+    chunks: List[Tuple[int, int]] = []
+    for start, end in ranges:
+        share = max(1, round(num_chunks * (end - start) / total))
+        chunks.extend(plan_chunks(mm, fmts, share, start, end))
+    return chunks
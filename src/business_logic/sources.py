@@ -0,0 +1,603 @@
+"""Byte sources for log files: plain files through mmap, ``.gz``/``.zst`` through a block index.
+
+Plain logs are read with one of the ``IO_STRATEGIES`` (chosen per run with ``io=``):
+
+- "mmap": the whole file mapped read-only (the default).
+- "madvise": the same mapping, with MADV_SEQUENTIAL/WILLNEED ahead of a chunk and its pages
+  (and page cache) dropped with DONTNEED behind it, so a scan does not crowd out other jobs.
+- "pread": no mapping; the log is read with large page-aligned ``preadv`` calls into two
+  bounded window buffers by a ``PrefetchReader``: a background thread fills the next window
+  while the decoder walks the current one, so I/O overlaps decoding and memory stays at two
+  windows whatever the log size. The linear parser and the decoding chunk workers stream
+  through it; header-only work (``summary``) reads a chunk into one buffer with
+  ``pread_range``, and chunks are capped at ``PREAD_CHUNK`` bytes. Suits NFS and FUSE
+  mounts, where page faults on a mapping are slow.
+- "range": each chunk maps only its own byte range instead of the whole file.
+
+Compressed logs are read as a sequence of independent blocks (gzip members or zstd frames).
+The block index maps every block to its compressed and raw byte ranges, so any raw range
+can be decompressed on its own and different chunks can be decoded on different cores.
+Logs written by ``compress_log`` use fixed-size blocks; other archives are indexed once by
+walking their members/frames and get as many blocks as they were written with (a single
+gzip member means a single block). The index is cached in ``$BIN_READER_CACHE_DIR`` (by
+default ``~/.cache/bin_reader``, or the temp directory when that is not writable), never
+next to the log, and is only reused while the log's size and mtime are unchanged.
+"""
+
+import gzip
+import hashlib
+import json
+import mmap
+import os
+import queue
+import tempfile
+import threading
+import zlib
+from bisect import bisect_right
+from collections import OrderedDict
+from contextlib import contextmanager
+from importlib import import_module
+from typing import List, Any, Tuple, Optional, Iterator, Union, BinaryIO
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+INDEX_SUFFIX = ".blocks.json"
+INDEX_VERSION = 2
+INDEX_DIR_ENV_VAR = "BIN_READER_CACHE_DIR"
+DEFAULT_BLOCK_SIZE = 4 << 20
+READ_SIZE = 1 << 20
+IO_STRATEGIES = ("mmap", "madvise", "pread", "range")
+DEFAULT_IO = "mmap"
+PREAD_BLOCK = 8 << 20
+# bytes per prefetch window (a ``PrefetchReader`` holds two) and the largest chunk read in one piece
+PREAD_WINDOW = 8 << 20
+PREAD_CHUNK = 64 << 20
+# how often an idle prefetch thread checks whether its reader was abandoned
+PREFETCH_POLL = 0.5
+
+# (compressed offset, compressed size, raw offset, raw size)
+Block = Tuple[int, int, int, int]
+
+_local = threading.local()
+
+
+def detect_compression(file_path: str) -> Optional[str]:
+    """Return "gzip", "zstd" or None (plain DataFlash log), judged by the magic bytes."""
+    with open(file_path, "rb") as f:
+        magic = f.read(4)
+    if magic.startswith(GZIP_MAGIC):
+        return "gzip"
+    if magic == ZSTD_MAGIC:
+        return "zstd"
+    return None
+
+
+def _zstd() -> Any:
+    """zstd support: ``compression.zstd`` on Python 3.14+, otherwise the ``zstandard`` package."""
+    try:
+        from compression import zstd
+
+        return zstd
+    except ImportError:
+        pass
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("Reading .zst logs needs Python 3.14+ or the 'zstandard' package") from None
+    return zstandard
+
+
+def _decompressor(compression: str) -> Any:
+    """Incremental decompressor for one gzip member / zstd frame (exposes eof and unused_data)."""
+    if compression == "gzip":
+        return zlib.decompressobj(31)
+    zstd = _zstd()
+    if zstd.__name__ == "zstandard":
+        return zstd.ZstdDecompressor().decompressobj()
+    return zstd.ZstdDecompressor()
+
+
+def _compress(data: bytes, compression: str, level: Optional[int]) -> bytes:
+    if compression == "gzip":
+        return gzip.compress(data, compresslevel=6 if level is None else level, mtime=0)
+    zstd = _zstd()
+    if zstd.__name__ == "zstandard":
+        return zstd.ZstdCompressor(level=3 if level is None else level).compress(data)
+    return zstd.compress(data, level=level)
+
+
+def open_stream(file_path: str) -> BinaryIO:
+    """Sequential reader returning raw (decompressed) log bytes."""
+    compression = detect_compression(file_path)
+    if compression is None:
+        return open(file_path, "rb")
+    if compression == "gzip":
+        return gzip.open(file_path, "rb")
+    zstd = _zstd()
+    if zstd.__name__ == "zstandard":
+        return zstd.ZstdDecompressor().stream_reader(open(file_path, "rb"), read_across_frames=True, closefd=True)
+    return zstd.open(file_path, "rb")
+
+
+def scan_blocks(file_path: str, compression: str) -> List[Block]:
+    """Index a compressed log by walking its gzip members / zstd frames (one decompression pass)."""
+    blocks: List[Block] = []
+    comp_pos = comp_start = raw_pos = raw_size = 0
+    decoder = _decompressor(compression)
+
+    with open(file_path, "rb") as f:
+        while data := f.read(READ_SIZE):
+            while data:
+                raw_size += len(decoder.decompress(data))
+                if not decoder.eof:
+                    comp_pos += len(data)
+                    break
+                unused = decoder.unused_data
+                comp_pos += len(data) - len(unused)
+                if raw_size:
+                    blocks.append((comp_start, comp_pos - comp_start, raw_pos, raw_size))
+                raw_pos, raw_size, comp_start = raw_pos + raw_size, 0, comp_pos
+                decoder = _decompressor(compression)
+                data = unused if unused.strip(b"\x00") else b""
+
+    if raw_size:
+        # truncated last member/frame: keep what can be decoded
+        blocks.append((comp_start, comp_pos - comp_start, raw_pos, raw_size))
+    return blocks
+
+
+def index_dir() -> str:
+    """Directory of the cached block indexes: ``$BIN_READER_CACHE_DIR`` or the user cache directory."""
+    path = os.environ.get(INDEX_DIR_ENV_VAR)
+    if not path:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+        path = os.path.join(base, "bin_reader")
+    return path
+
+
+def _index_paths(file_path: str) -> List[str]:
+    name = hashlib.sha1(os.path.abspath(file_path).encode()).hexdigest()[:16] + INDEX_SUFFIX
+    return [os.path.join(index_dir(), name), os.path.join(tempfile.gettempdir(), f"bin_reader-{name}")]
+
+
+def _index_key(file_path: str) -> Tuple[int, int]:
+    """What a cached index must match: the log's size and modification time."""
+    stat = os.stat(file_path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def write_block_index(file_path: str, compression: str, blocks: List[Block]) -> Optional[str]:
+    """Store the index in the cache directory (or the temp dir); returns the path written, if any."""
+    size, mtime_ns = _index_key(file_path)
+    payload = {
+        "version": INDEX_VERSION,
+        "compression": compression,
+        "compressed_size": size,
+        "mtime_ns": mtime_ns,
+        "blocks": blocks,
+    }
+    for path in _index_paths(file_path):
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(payload, f)
+            return path
+        except OSError:
+            continue
+    return None
+
+
+def load_block_index(file_path: str) -> Tuple[str, List[Block]]:
+    """Return ``(compression, blocks)``, reading the cached index or building (and caching) it."""
+    compression = detect_compression(file_path)
+    if compression is None:
+        raise ValueError(f"{file_path} is not a compressed log")
+
+    size, mtime_ns = _index_key(file_path)
+    for path in _index_paths(file_path):
+        try:
+            with open(path, encoding="utf-8") as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if (
+            payload.get("version") == INDEX_VERSION
+            and payload.get("compressed_size") == size
+            and payload.get("mtime_ns") == mtime_ns
+        ):
+            return compression, [tuple(block) for block in payload["blocks"]]
+
+    blocks = scan_blocks(file_path, compression)
+    write_block_index(file_path, compression, blocks)
+    return compression, blocks
+
+
+class BlockReader:
+    """Read-only, random-access view of the raw bytes of a compressed log.
+
+    Supports what the chunk planner and FMT scan use on an mmap: ``len``, integer and
+    slice indexing and ``find``. A few decompressed blocks are kept in an LRU cache.
+    """
+
+    def __init__(self, file_path: str, cache_blocks: int = 4):
+        self.file_path = file_path
+        self.compression, self.blocks = load_block_index(file_path)
+        self._starts = [block[2] for block in self.blocks]
+        self.size = self.blocks[-1][2] + self.blocks[-1][3] if self.blocks else 0
+        self._file = open(file_path, "rb")
+        self._cache: "OrderedDict[int, bytes]" = OrderedDict()
+        self._cache_blocks = cache_blocks
+
+    def __enter__(self) -> "BlockReader":
+        return self
+
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._file.close()
+        self._cache.clear()
+
+    def __len__(self) -> int:
+        return self.size
+
+    def block_at(self, offset: int) -> int:
+        """Index of the block holding raw ``offset``."""
+        return max(0, bisect_right(self._starts, offset) - 1)
+
+    def block(self, i: int) -> bytes:
+        data = self._cache.get(i)
+        if data is not None:
+            self._cache.move_to_end(i)
+            return data
+        comp_offset, comp_size, _, raw_size = self.blocks[i]
+        self._file.seek(comp_offset)
+        data = _decompressor(self.compression).decompress(self._file.read(comp_size))[:raw_size]
+        self._cache[i] = data
+        if len(self._cache) > self._cache_blocks:
+            self._cache.popitem(last=False)
+        return data
+
+    def read_blocks(self, start: int, end: int) -> Tuple[int, bytes]:
+        """Decompress the whole blocks covering [start, end); returns ``(raw offset, data)``."""
+        if start >= end or not self.blocks:
+            return start, b""
+        first, last = self.block_at(start), self.block_at(end - 1)
+        return self.blocks[first][2], b"".join(self.block(i) for i in range(first, last + 1))
+
+    def read(self, start: int, end: int) -> bytes:
+        start, end = max(0, start), min(end, self.size)
+        base, data = self.read_blocks(start, end)
+        return data[start - base : end - base]
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[int, bytes]:
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self.size)
+            data = self.read(start, stop)
+            return data if step == 1 else data[::step]
+        if key < 0:
+            key += self.size
+        if not 0 <= key < self.size:
+            raise IndexError("BlockReader index out of range")
+        i = self.block_at(key)
+        return self.block(i)[key - self.blocks[i][2]]
+
+    def find(self, sub: bytes, start: int = 0, end: Optional[int] = None) -> int:
+        end = self.size if end is None else min(end, self.size)
+        pos = max(0, start)
+        while pos < end:
+            i = self.block_at(pos)
+            base = self.blocks[i][2]
+            data = self.block(i)
+            found = data.find(sub, pos - base, end - base)
+            if found != -1:
+                return base + found
+            block_end = base + len(data)
+            if i + 1 < len(self.blocks) and len(sub) > 1 and block_end < end:
+                tail = max(pos, block_end - len(sub) + 1)
+                joined = self.read(tail, min(end, block_end + len(sub) - 1))
+                found = joined.find(sub)
+                if found != -1:
+                    return tail + found
+            pos = block_end
+        return -1
+
+
+# -------------------------
+# I/O strategies
+# -------------------------
+def check_io(io: str) -> str:
+    if io not in IO_STRATEGIES:
+        raise ValueError(f"io must be one of {IO_STRATEGIES}, got {io!r}")
+    return io
+
+
+def current_io() -> str:
+    """Strategy ``open_range`` uses in this thread when none is given (see ``io_chunk``)."""
+    return getattr(_local, "io", None) or DEFAULT_IO
+
+
+def io_chunk(args: Tuple[str, str, str, Any]) -> Any:
+    """Worker entry point: run the named chunk worker with ``io`` as the strategy of its ``open_range`` calls."""
+    module_name, func_name, io, inner_args = args
+    func = getattr(import_module(module_name), func_name)
+    _local.io = io
+    try:
+        return func(inner_args)
+    finally:
+        _local.io = None
+
+
+def advise(mm: Optional[mmap.mmap], fd: Optional[int], start: int, end: int, advice: str) -> None:
+    """Pass ``advice`` ("SEQUENTIAL", "WILLNEED" or "DONTNEED") for file bytes [start, end) to madvise
+    (for ``mm``, a mapping of the whole file) and posix_fadvise (for ``fd``), where the platform has them.
+    """
+    base = start - start % mmap.PAGESIZE
+    if mm is not None:
+        end = min(end, len(mm))
+    if end <= base:
+        return
+    try:
+        flag = getattr(mmap, "MADV_" + advice, None)
+        if mm is not None and flag is not None:
+            mm.madvise(flag, base, end - base)
+        flag = getattr(os, "POSIX_FADV_" + advice, None)
+        if fd is not None and flag is not None:
+            os.posix_fadvise(fd, base, end - base, flag)
+    except OSError:
+        # hints only: some file systems reject them
+        pass
+
+
+def _pread_into(fd: int, view: memoryview, offset: int) -> int:
+    """Fill ``view`` from file ``offset`` with ``PREAD_BLOCK`` reads; returns the bytes read (fewer at end of file)."""
+    pos = 0
+    while pos < len(view):
+        block = view[pos : pos + PREAD_BLOCK]
+        if hasattr(os, "preadv"):
+            read = os.preadv(fd, [block], offset + pos)
+        else:
+            data = os.pread(fd, len(block), offset + pos)
+            block[: len(data)] = data
+            read = len(data)
+        if not read:
+            break
+        pos += read
+    return pos
+
+
+def pread_range(fd: int, start: int, end: int) -> Tuple[bytearray, int]:
+    """``(buffer, base)``: file bytes [base, end) read with page-aligned ``pread`` calls, base = start rounded down."""
+    base = start - start % mmap.PAGESIZE
+    advise(None, fd, base, end, "SEQUENTIAL")
+    buf = bytearray(max(0, end - base))
+    view = memoryview(buf)
+    read = _pread_into(fd, view, base)
+    view.release()
+    del buf[read:]
+    return buf, base
+
+
+def _next_free(free: "queue.Queue[Optional[bytearray]]", stop: threading.Event) -> Optional[bytearray]:
+    """A buffer the reader handed back, or None once it is closed (or abandoned at interpreter exit)."""
+    while not stop.is_set() and threading.main_thread().is_alive():
+        try:
+            return free.get(timeout=PREFETCH_POLL)
+        except queue.Empty:
+            continue
+    return None
+
+
+def _prefetch(
+    fd: int,
+    pos: int,
+    end: int,
+    free: "queue.Queue[Optional[bytearray]]",
+    filled: "queue.Queue[Any]",
+    stop: threading.Event,
+) -> None:
+    """Prefetch thread of ``PrefetchReader``: read the windows of [pos, end) in order into free buffers."""
+    try:
+        while pos < end:
+            buf = _next_free(free, stop)
+            if buf is None:
+                return
+            view = memoryview(buf)[: end - pos]
+            read = _pread_into(fd, view, pos)
+            view.release()
+            if not read:
+                break
+            filled.put((buf, read))
+            pos += read
+    except OSError as exc:
+        filled.put(exc)
+        return
+    filled.put(None)
+
+
+class PrefetchReader:
+    """Sequential binary stream over file bytes [start, end) that reads ahead on a background thread.
+
+    The file is read in page-aligned windows of ``window`` bytes into two buffers: while the
+    caller consumes one, the thread fills the other. Memory stays at two windows however long
+    the range is, and the next window is usually in memory before it is needed. ``readinto``
+    makes it a source for ``mav_core.iter_records``.
+    """
+
+    def __init__(self, file_path: str, start: int = 0, end: Optional[int] = None, window: Optional[int] = None):
+        self._thread: Optional[threading.Thread] = None
+        self._fd = os.open(file_path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+        size = os.fstat(self._fd).st_size
+        end = size if end is None else min(end, size)
+        base = start - start % mmap.PAGESIZE
+        window = window or PREAD_WINDOW
+        window = max(mmap.PAGESIZE, window - window % mmap.PAGESIZE)
+        advise(None, self._fd, base, end, "SEQUENTIAL")
+
+        self._free: "queue.Queue[Optional[bytearray]]" = queue.Queue()
+        self._filled: "queue.Queue[Any]" = queue.Queue()
+        for _ in range(2):
+            self._free.put(bytearray(min(window, max(0, end - base))))
+        self._stop = threading.Event()
+        # the first window starts on the page boundary below ``start``
+        self._skip = start - base
+        self._buffer: Optional[bytearray] = None
+        self._current = memoryview(b"")
+        self._done = False
+        # not a daemon thread: sub-interpreters refuse those; ``_next_free`` ends it if the reader is dropped
+        self._thread = threading.Thread(
+            target=_prefetch, args=(self._fd, base, end, self._free, self._filled, self._stop), name="pread-prefetch"
+        )
+        self._thread.start()
+
+    def __enter__(self) -> "PrefetchReader":
+        return self
+
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        self.close()
+
+    def __del__(self) -> None:
+        self.close()
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, view: Any) -> int:
+        """Copy the next bytes into ``view``; 0 at the end of the range."""
+        while not self._current:
+            if self._done:
+                return 0
+            if self._buffer is not None:
+                # consumed: the thread may fill it with the window after the next one
+                self._free.put(self._buffer)
+                self._buffer = None
+            item = self._filled.get()
+            if item is None or isinstance(item, OSError):
+                self._done = True
+                if item is None:
+                    return 0
+                raise item
+            self._buffer, read = item
+            self._current = memoryview(self._buffer)[self._skip : read]
+            self._skip = 0
+        count = min(len(view), len(self._current))
+        view[:count] = self._current[:count]
+        self._current = self._current[count:]
+        return count
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            parts = []
+            while part := self.read(PREAD_WINDOW):
+                parts.append(part)
+            return b"".join(parts)
+        buf = bytearray(size)
+        return bytes(buf[: self.readinto(buf)])
+
+    def close(self) -> None:
+        """Stop the prefetch thread and close the file."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._free.put(None)
+        self._thread.join()
+        self._thread = None
+        os.close(self._fd)
+        self._current = memoryview(b"")
+        self._buffer = None
+        self._done = True
+
+
+def prefetches(file_path: str, io: Optional[str] = None) -> bool:
+    """Whether ``file_path`` is a plain log read with "pread" (``io`` defaults to ``current_io()``)."""
+    return check_io(io or current_io()) == "pread" and detect_compression(file_path) is None
+
+
+def prefetch_reader(file_path: str, start: int, end: int, io: Optional[str] = None) -> Optional[PrefetchReader]:
+    """A ``PrefetchReader`` over [start, end) when ``prefetches``; None otherwise.
+
+    Chunk workers that can walk their chunk as a stream use this before falling back to ``open_range``.
+    """
+    return PrefetchReader(file_path, start, end) if prefetches(file_path, io) else None
+
+
+@contextmanager
+def open_log(file_path: str) -> Iterator[Union[mmap.mmap, BlockReader]]:
+    """Whole-log random access: an mmap for plain logs, a ``BlockReader`` for compressed ones."""
+    if detect_compression(file_path) is None:
+        with open(file_path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield mm
+        finally:
+            mm.close()
+    else:
+        with BlockReader(file_path) as reader:
+            yield reader
+
+
+@contextmanager
+def open_range(
+    file_path: str, start: int, end: int, io: Optional[str] = None
+) -> Iterator[Tuple[Union[mmap.mmap, bytes, bytearray], int, int]]:
+    """Buffer holding raw bytes [start, end) of a log, with ``start``/``end`` relative to it.
+
+    Plain logs are read with the ``io`` strategy (default: ``current_io()``); compressed logs
+    only decompress the blocks that cover the range, which is what lets parallel workers
+    split the decompression work.
+    """
+    io = check_io(io or current_io())
+    if detect_compression(file_path) is not None:
+        with BlockReader(file_path, cache_blocks=0) as reader:
+            base, data = reader.read_blocks(start, end)
+        yield data, start - base, end - base
+    elif io == "mmap":
+        with open_log(file_path) as mm:
+            yield mm, start, end
+    elif io == "pread":
+        with open(file_path, "rb") as f:
+            data, base = pread_range(f.fileno(), start, end)
+        yield data, start - base, end - base
+    elif io == "range":
+        base = start - start % mmap.ALLOCATIONGRANULARITY
+        if end <= base:
+            yield b"", 0, 0
+            return
+        with open(file_path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), end - base, access=mmap.ACCESS_READ, offset=base)
+        try:
+            yield mm, start - base, end - base
+        finally:
+            mm.close()
+    else:
+        with open(file_path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                advise(mm, f.fileno(), start, end, "SEQUENTIAL")
+                advise(mm, f.fileno(), start, end, "WILLNEED")
+                yield mm, start, end
+                # behind the scan: nothing in this range is read again
+                advise(mm, f.fileno(), start, end, "DONTNEED")
+            finally:
+                mm.close()
+
+
+def compress_log(
+    src: str,
+    dst: str,
+    compression: str = "gzip",
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    level: Optional[int] = None,
+) -> List[Block]:
+    """Compress a plain log into independent blocks and write its block index."""
+    blocks: List[Block] = []
+    comp_pos = raw_pos = 0
+    with open(src, "rb") as fin, open(dst, "wb") as fout:
+        while data := fin.read(block_size):
+            packed = _compress(data, compression, level)
+            fout.write(packed)
+            blocks.append((comp_pos, len(packed), raw_pos, len(data)))
+            comp_pos += len(packed)
+            raw_pos += len(data)
+    write_block_index(dst, compression, blocks)
+    return blocks
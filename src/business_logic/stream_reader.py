@@ -0,0 +1,111 @@
+"""Parse logs from non-seekable sources: stdin, pipes and sockets.
+
+The reader walks the stream with ``mav_core.iter_records`` (a bounded buffer refilled in
+place, so memory does not grow with the stream) and decodes with the linear parser's
+decoders, so it returns the same messages as ``MAVParserLinear`` on the same bytes. Records
+split across reads are completed by the next read and garbage between records is skipped.
+Only what the stream has shown so far is known: there is no random access, scaling always
+follows the config tables and there are no segments.
+
+    zcat log.bin.gz | python -m src dump - --types GPS
+    python -m src dump tcp://gateway:5760 --types GPS
+"""
+
+import socket
+import sys
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional, Iterator
+
+from src.business_logic.mav_core import compile_fmt, iter_records, parse_message
+from src.business_logic.mav_parser_linear import MAVParserLinear
+from src.utils.config import FMT_TYPE, FMT_LENGTH
+
+READ_SIZE = 1 << 16
+STDIN = "-"
+TCP_PREFIX = "tcp://"
+
+
+def is_stream_source(spec: str) -> bool:
+    """Whether a command-line log argument names a stream ("-" or tcp://host:port) rather than a file."""
+    return spec == STDIN or spec.startswith(TCP_PREFIX)
+
+
+@contextmanager
+def open_source(spec: str) -> Iterator[Any]:
+    """stdin for "-", a connected socket for "tcp://host:port"."""
+    if spec == STDIN:
+        yield sys.stdin.buffer
+        return
+    host, _, port = spec[len(TCP_PREFIX) :].rpartition(":")
+    with socket.create_connection((host, int(port))) as sock:
+        yield sock
+
+
+class MAVStreamReader:
+    """Decode messages from a binary stream or socket as they arrive.
+
+        with socket.create_connection(("gateway", 5760)) as sock:
+            for msg in MAVStreamReader(sock, type_filter=["GPS"]):
+                ...
+
+    ``source`` is a socket (read with ``recv_into``) or any binary stream (``readinto1``,
+    ``readinto`` or ``read``); it is read in pieces of at most ``read_size`` bytes and is not
+    closed by the reader. Blocking sources only.
+    """
+
+    def __init__(
+        self,
+        source: Any,
+        type_filter: Optional[List[str]] = None,
+        rounding: bool = True,
+        read_size: int = READ_SIZE,
+    ):
+        self.source = source
+        self.type_filter = set(type_filter) if type_filter else None
+        self.rounding = rounding
+        self.formats: Dict[int, Dict[str, Any]] = {}
+        self.message_count = 0
+        # raw stream offset just past the last record read
+        self.offset = 0
+        self._records = iter_records(source, self.formats, read_size)
+
+    def __enter__(self) -> "MAVStreamReader":
+        return self
+
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Stop reading; the source stays open."""
+        self._records.close()
+
+    def parse_next(self) -> Optional[Dict[str, Any]]:
+        """Next message, blocking until the stream delivers it; None at the end of the stream."""
+        for offset, msg_type, buf, pos in self._records:
+            if msg_type == FMT_TYPE:
+                compiled = compile_fmt(buf, pos)
+                if compiled:
+                    self.formats[compiled[0]] = compiled[1]
+                self.offset = offset + FMT_LENGTH
+                self.message_count += 1
+                if self.type_filter is None or "FMT" in self.type_filter:
+                    return MAVParserLinear._fmt_message(buf, pos)
+                continue
+
+            fmt_info = self.formats[msg_type]
+            self.offset = offset + fmt_info["Length"]
+            if self.type_filter is None or fmt_info["Name"] in self.type_filter:
+                msg = parse_message(fmt_info, buf, pos + 3, self.rounding)
+                if msg is not None:
+                    self.message_count += 1
+                    return msg
+        return None
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        while msg := self.parse_next():
+            yield msg
+
+    iter_messages = __iter__
+
+    def parse_all(self) -> List[Dict[str, Any]]:
+        return list(self)
@@ -0,0 +1,139 @@
+"""Log summary from headers and lengths only: per-type counts, bytes and TimeUS span."""
+
+import struct
+from typing import List, Dict, Any, Tuple, Optional, Set, Union
+
+from src.business_logic.mav_core import walkable_fmts
+from src.business_logic.sources import open_range
+from src.utils.config import HEADER, FORMAT_TO_STRUCT
+
+
+def time_field(fmt_info: Dict[str, Any]) -> Optional[Tuple[int, struct.Struct]]:
+    """Payload offset and struct of the ``TimeUS`` column, or None if the type has none."""
+    if "TimeUS" not in fmt_info["Columns"]:
+        return None
+    position = fmt_info["Columns"].index("TimeUS")
+    codes = [FORMAT_TO_STRUCT.get(c, "") for c in fmt_info["Format"]]
+    if position >= len(codes) or not codes[position]:
+        return None
+    return struct.calcsize("<" + "".join(codes[:position])), struct.Struct("<" + codes[position])
+
+
+def _walk_counts(
+    mv: Union[bytes, memoryview], start: int, end: int, fmts: Dict[int, Dict[str, Any]]
+) -> Dict[int, List[int]]:
+    """``{type: [count, first_offset, last_offset]}`` with the byte-by-byte header walk."""
+    found: Dict[int, List[int]] = {}
+    h0, h1 = HEADER
+    offset = start
+
+    while offset < end - 3:
+        if mv[offset] == h0 and mv[offset + 1] == h1:
+            msg_type = mv[offset + 2]
+            fmt_info = fmts.get(msg_type)
+            if fmt_info:
+                length = fmt_info["Length"]
+                if offset + length > end:
+                    break
+                entry = found.get(msg_type)
+                if entry is None:
+                    found[msg_type] = [1, offset, offset]
+                else:
+                    entry[0] += 1
+                    entry[2] = offset
+                offset += length
+                continue
+        offset += 1
+    return found
+
+
+def _bulk_counts(buf: Any, start: int, end: int, fmts: Dict[int, Dict[str, Any]]) -> Dict[int, List[int]]:
+    """Same as ``_walk_counts`` using the vectorised header search from ``bulk_decode``."""
+    import numpy as np
+    from src.business_logic.bulk_decode import locate_messages
+
+    data = np.frombuffer(buf, dtype=np.uint8)
+    offsets, types = locate_messages(data, start, end, fmts)
+    del data
+    if not len(types):
+        return {}
+    counts = np.bincount(types, minlength=256)
+    present, first = np.unique(types, return_index=True)
+    _, last = np.unique(types[::-1], return_index=True)
+    last = len(types) - 1 - last
+    return {
+        int(t): [int(counts[t]), int(offsets[f]), int(offsets[l])]
+        for t, f, l in zip(present.tolist(), first.tolist(), last.tolist())
+    }
+
+
+def summarize_range(
+    buf: Any, start: int, end: int, fmts: Dict[int, Dict[str, Any]], type_filter: Optional[Set[str]] = None
+) -> Dict[int, Dict[str, Any]]:
+    """Counts, bytes and first/last TimeUS per message type for [start, end) of ``buf``."""
+    fmts = walkable_fmts(fmts)
+    try:
+        found = _bulk_counts(buf, start, end, fmts)
+    except ImportError:
+        found = _walk_counts(memoryview(buf), start, end, fmts)
+
+    summary: Dict[int, Dict[str, Any]] = {}
+    for msg_type, (count, first, last) in found.items():
+        fmt_info = fmts[msg_type]
+        if type_filter and fmt_info["Name"] not in type_filter:
+            continue
+        entry = {"count": count, "bytes": count * fmt_info["Length"], "first_TimeUS": None, "last_TimeUS": None}
+        field = time_field(fmt_info)
+        if field is not None:
+            position, unpacker = field
+            if first + 3 + position + unpacker.size <= len(buf) and last + 3 + position + unpacker.size <= len(buf):
+                entry["first_TimeUS"] = unpacker.unpack_from(buf, first + 3 + position)[0]
+                entry["last_TimeUS"] = unpacker.unpack_from(buf, last + 3 + position)[0]
+        summary[msg_type] = entry
+    return summary
+
+
+def summarize_chunk(args) -> Tuple[int, Dict[int, Dict[str, Any]]]:
+    """Worker entry point: summarize one chunk of a file."""
+    index, file_path, chunk, fmts, type_filter = args
+    with open_range(file_path, *chunk) as (buf, start, end):
+        return index, summarize_range(buf, start, end, fmts, type_filter)
+
+
+def merge_summaries(
+    parts: List[Dict[int, Dict[str, Any]]], fmts: Dict[int, Dict[str, Any]], size: int
+) -> Dict[str, Any]:
+    """Combine per-chunk summaries (in chunk order) into the log summary."""
+    fmts = walkable_fmts(fmts)
+    merged: Dict[int, Dict[str, Any]] = {}
+    for part in parts:
+        for msg_type, entry in part.items():
+            target = merged.get(msg_type)
+            if target is None:
+                merged[msg_type] = dict(entry)
+                continue
+            target["count"] += entry["count"]
+            target["bytes"] += entry["bytes"]
+            if target["first_TimeUS"] is None:
+                target["first_TimeUS"] = entry["first_TimeUS"]
+            if entry["last_TimeUS"] is not None:
+                target["last_TimeUS"] = entry["last_TimeUS"]
+
+    types = {
+        fmts[msg_type]["Name"]: {"type": msg_type, **entry}
+        for msg_type, entry in sorted(merged.items(), key=lambda item: fmts[item[0]]["Name"])
+    }
+    times = [t for entry in types.values() for t in (entry["first_TimeUS"], entry["last_TimeUS"]) if t is not None]
+    first_time, last_time = (min(times), max(times)) if times else (None, None)
+    return {
+        "size": size,
+        "messages": sum(entry["count"] for entry in types.values()),
+        "first_TimeUS": first_time,
+        "last_TimeUS": last_time,
+        "duration_s": (last_time - first_time) / 1e6 if times else None,
+        "types": types,
+        "fmts": {
+            msg_type: {key: info[key] for key in ("Name", "Length", "Format", "Columns")}
+            for msg_type, info in sorted(fmts.items())
+        },
+    }
@@ -0,0 +1,149 @@
+"""As-of alignment of several message types onto one timeline.
+
+``align_log`` decodes only the requested types into columns and joins every other type
+onto the first type's ``TimeUS`` values, taking the previous, next or nearest message.
+"""
+
+from typing import List, Dict, Optional, Sequence
+
+from src.business_logic.mav_parser_linear import MAVParserLinear
+
+DIRECTIONS = ("backward", "forward", "nearest")
+
+
+def _merge_indices(
+    left: Sequence[float], right: Sequence[float], tolerance: Optional[float], direction: str
+) -> List[int]:
+    """``asof_indices`` as one sorted merge in pure Python."""
+    n = len(right)
+    indices: List[int] = []
+    j = 0
+    for t in left:
+        while j < n and right[j] <= t:
+            j += 1
+        # right[j - 1] <= t < right[j]
+        before = j - 1
+        after = j if j < n else -1
+
+        if direction == "backward":
+            match = before
+        elif direction == "forward":
+            match = before if before >= 0 and right[before] == t else after
+        elif before < 0:
+            match = after
+        elif after < 0 or t - right[before] <= right[after] - t:
+            match = before
+        else:
+            match = after
+
+        if match >= 0 and tolerance is not None and abs(right[match] - t) > tolerance:
+            match = -1
+        indices.append(match)
+    return indices
+
+
+def _searchsorted_indices(
+    left: Sequence[float], right: Sequence[float], tolerance: Optional[float], direction: str
+) -> List[int]:
+    """Same as ``_merge_indices`` with one ``numpy.searchsorted`` call and masks."""
+    import numpy as np
+
+    t = np.asarray(left)
+    times = np.asarray(right)
+    n = len(times)
+    if n == 0:
+        return [-1] * len(t)
+
+    # right[j - 1] <= t < right[j]
+    j = np.searchsorted(times, t, side="right")
+    before = j - 1
+    after = np.where(j < n, j, -1)
+    before_time = times[np.maximum(before, 0)]
+    after_time = times[np.minimum(j, n - 1)]
+
+    if direction == "backward":
+        match = before
+    elif direction == "forward":
+        match = np.where((before >= 0) & (before_time == t), before, after)
+    else:
+        take_before = (before >= 0) & ((after < 0) | (t - before_time <= after_time - t))
+        match = np.where(take_before, before, after)
+
+    if tolerance is not None:
+        match = np.where((match >= 0) & (np.abs(times[np.maximum(match, 0)] - t) > tolerance), -1, match)
+    return match.tolist()
+
+
+def asof_indices(
+    left: Sequence[float], right: Sequence[float], tolerance: Optional[float] = None, direction: str = "backward"
+) -> List[int]:
+    """Match every time in ``left`` to an index in ``right``.
+
+    ``backward`` takes the last right time <= left time, ``forward`` the first right time
+    >= left time and ``nearest`` the closer of the two. Both sequences must be sorted;
+    -1 marks rows without a match inside ``tolerance``. Uses ``numpy.searchsorted`` when
+    NumPy is installed and a single sorted merge otherwise.
+    """
+    if direction not in DIRECTIONS:
+        raise ValueError(f"direction must be one of {DIRECTIONS}, got {direction!r}")
+    try:
+        return _searchsorted_indices(left, right, tolerance, direction)
+    except ImportError:
+        return _merge_indices(left, right, tolerance, direction)
+
+
+def _sorted_by(columns: Dict[str, list], on: str) -> Dict[str, list]:
+    """Return the table ordered by ``on``; logs are almost always sorted already."""
+    times = columns[on]
+    if all(a <= b for a, b in zip(times, times[1:])):
+        return columns
+    order = sorted(range(len(times)), key=times.__getitem__)
+    return {col: [values[i] for i in order] for col, values in columns.items()}
+
+
+def align_columns(
+    tables: Dict[str, Dict[str, list]],
+    types: List[str],
+    tolerance: Optional[float] = None,
+    direction: str = "backward",
+    on: str = "TimeUS",
+) -> Dict[str, list]:
+    """As-of join several decoded column tables onto the timeline of the first type.
+
+    The result is a single columnar table: ``on`` holds the base timeline and every
+    other column is named ``"<type>.<column>"``. Rows without a match get ``None``.
+    """
+    for name in types:
+        if name not in tables or on not in tables[name]:
+            raise ValueError(f"No {name} messages with a {on} column to align")
+
+    base_name = types[0]
+    base = _sorted_by(tables[base_name], on)
+    base_time = base[on]
+
+    aligned: Dict[str, list] = {on: base_time}
+    for col, values in base.items():
+        if col != on:
+            aligned[f"{base_name}.{col}"] = values
+
+    for name in types[1:]:
+        other = _sorted_by(tables[name], on)
+        indices = asof_indices(base_time, other[on], tolerance, direction)
+        for col, values in other.items():
+            aligned[f"{name}.{col}"] = [values[i] if i >= 0 else None for i in indices]
+
+    return aligned
+
+
+def align_log(
+    file_path: str,
+    types: List[str],
+    tolerance: Optional[float] = None,
+    direction: str = "backward",
+    on: str = "TimeUS",
+    rounding: bool = True,
+) -> Dict[str, list]:
+    """Decode only ``types`` from a log and align them on the first type's timeline."""
+    with MAVParserLinear(file_path, type_filter=types, rounding=rounding) as parser:
+        tables = parser.parse_columns()
+    return align_columns(tables, types, tolerance, direction, on)
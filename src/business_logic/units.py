@@ -0,0 +1,113 @@
+"""Units and multipliers from the log's own FMTU, UNIT and MULT messages.
+
+ArduPilot writes, next to the FMT table, one FMTU message per message type naming a unit
+id and a multiplier id for every column; UNIT and MULT map those ids to a label ("m",
+"deg", ...) and a factor (1e-2, 1e-7, ...). ``scan_units`` reads them from the head of
+the log. With ``scaling="log"`` a parser scales from these tables instead of the
+``FIELD_SCALERS`` / ``FORMAT_SCALERS`` defaults, so fields the defaults do not know about
+come out in their units too; ``units_table`` describes every column either way.
+"""
+
+import mmap
+from typing import Dict, Any, Optional, Iterator, Union
+
+from src.business_logic.mav_core import MAX_HEAD_SCAN, build_plan, build_processors, find_records
+from src.business_logic.sources import BlockReader
+from src.utils.config import FORMAT_SCALERS, STRING_FORMATS, ROUNDING
+
+CONFIG_SCALING = "config"
+LOG_SCALING = "log"
+SCALING_MODES = (CONFIG_SCALING, LOG_SCALING)
+
+# format characters that already imply a fixed-point encoding, whatever MULT says
+IMPLIED_SCALES = {**FORMAT_SCALERS, "L": 1e-7}
+INTEGER_FORMATS = frozenset("bBhHiIcCeELMqQ")
+# 64-bit fields are counters and timestamps; scaling them to floats would lose precision
+EXACT_FORMATS = frozenset("qQ")
+# columns measured in seconds keep their raw counters: the names carry the unit (TimeUS, TimeMS)
+TIME_UNIT = "s"
+
+
+def check_scaling(scaling: str) -> str:
+    if scaling not in SCALING_MODES:
+        raise ValueError(f"Unknown scaling {scaling!r}; expected one of {SCALING_MODES}")
+    return scaling
+
+
+def scan_units(
+    mm: Union[bytes, mmap.mmap, BlockReader], fmts: Dict[int, Dict[str, Any]], max_head: int = MAX_HEAD_SCAN
+) -> Dict[str, Any]:
+    """Read the FMTU, UNIT and MULT messages in the head of the log.
+
+    Returns ``{"units": {id: label}, "mults": {id: factor}, "fields": {type: (unit_ids, mult_ids)}}``;
+    every part is empty for logs that do not carry them.
+    """
+    records = find_records(mm, fmts, "UNIT", 0, max_head)
+    units = {chr(msg["Id"]): msg["Label"] for _, msg in records if 32 <= msg["Id"] < 127}
+    records = find_records(mm, fmts, "MULT", 0, max_head)
+    mults = {chr(msg["Id"]): msg["Mult"] for _, msg in records if 32 <= msg["Id"] < 127}
+    records = find_records(mm, fmts, "FMTU", 0, max_head)
+    fields = {msg["FmtType"]: (msg["UnitIds"], msg["MultIds"]) for _, msg in records if msg["FmtType"] in fmts}
+    return {"units": units, "mults": mults, "fields": fields}
+
+
+def _column_meta(fmt_info: Dict[str, Any], log_units: Dict[str, Any], msg_type: int) -> Iterator[tuple]:
+    """``(column, format_char, unit_label, multiplier)`` per column; None where the log says nothing."""
+    unit_ids, mult_ids = log_units["fields"].get(msg_type, ("", ""))
+    for i, (col, fmt_char) in enumerate(zip(fmt_info["Columns"], fmt_info["Format"])):
+        unit = log_units["units"].get(unit_ids[i]) if i < len(unit_ids) else None
+        mult = log_units["mults"].get(mult_ids[i]) if i < len(mult_ids) else None
+        # MULT "-" (0) marks columns without a multiplier
+        yield col, fmt_char, unit, (mult or None)
+
+
+def log_scale(fmt_char: str, unit: Optional[str], mult: Optional[float]) -> float:
+    """Scale for one column under ``scaling="log"``."""
+    if fmt_char in IMPLIED_SCALES:
+        return IMPLIED_SCALES[fmt_char]
+    if fmt_char not in INTEGER_FORMATS or fmt_char in EXACT_FORMATS or unit == TIME_UNIT or mult is None:
+        return 1
+    return mult
+
+
+def apply_units(fmts: Dict[int, Dict[str, Any]], log_units: Dict[str, Any]) -> Dict[int, Dict[str, Any]]:
+    """Rescale the compiled formats in place from the log's multipliers (``scaling="log"``).
+
+    The scale vector, processors and decode plan of every type the log describes are
+    rebuilt once here, so the decoders apply them exactly like the configured ones. Scaled
+    columns are rounded to 7 digits like the configured ``ROUNDING`` columns.
+    """
+    for msg_type, fmt_info in fmts.items():
+        if msg_type not in log_units["fields"]:
+            continue
+        scaling = {
+            col: log_scale(fmt_char, unit, mult)
+            for col, fmt_char, unit, mult in _column_meta(fmt_info, log_units, msg_type)
+            if fmt_char not in STRING_FORMATS
+        }
+        rounding = ROUNDING.intersection(fmt_info["Columns"]) | {col for col, scale in scaling.items() if scale != 1}
+        processors = build_processors(fmt_info["Columns"], fmt_info["Format"], fmt_info["Name"], scaling, rounding)
+        fmt_info.update(Scaling=scaling, Rounding=rounding, Processors=processors, Plan=build_plan(processors))
+    return fmts
+
+
+def units_table(fmts: Dict[int, Dict[str, Any]], log_units: Dict[str, Any]) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """``{type_name: {column: {"unit": label, "mult": factor}}}`` for the decoded values.
+
+    ``mult`` is what is left to multiply a decoded value by to get ``unit`` (1 once the
+    parser has scaled it; e.g. 1e-6 for TimeUS in seconds); either is None when the log
+    does not say. Only types described by FMTU messages are listed.
+    """
+    table = {}
+    for msg_type, fmt_info in fmts.items():
+        if msg_type not in log_units["fields"]:
+            continue
+        scaling = fmt_info.get("Scaling", {})
+        columns = {}
+        for col, fmt_char, unit, mult in _column_meta(fmt_info, log_units, msg_type):
+            if mult is not None and fmt_char not in STRING_FORMATS:
+                mult = mult / scaling.get(col, 1)
+                mult = 1 if abs(mult - 1) < 1e-9 else mult
+            columns[col] = {"unit": unit, "mult": mult}
+        table[fmt_info["Name"]] = columns
+    return table
@@ -0,0 +1,388 @@
+"""bin_reader command line: stream, export and inspect MAVLink .bin logs."""
+
+import argparse
+import json
+import os
+import sys
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional, Iterator, TextIO, Tuple
+
+from src.business_logic.auto_mode import choose_plan
+from src.business_logic.exporters import RowWriter, project
+from src.business_logic.mav_parser_chunked import MAVParserChunked
+from src.business_logic.mav_parser_linear import MAVParserLinear
+from src.business_logic.mav_parser_process import MAVParserProcess
+from src.business_logic.merged_reader import merge_messages, source_names
+from src.business_logic.mav_parser_threads import MAVParserThreads
+from src.business_logic.profiling import PROFILERS, format_report
+from src.business_logic.progress import format_event
+from src.business_logic.segments import SEGMENT_KINDS, log_segments
+from src.business_logic.stream_reader import MAVStreamReader, is_stream_source, open_source
+from src.business_logic.sources import DEFAULT_BLOCK_SIZE, IO_STRATEGIES, compress_log
+from src.business_logic.units import SCALING_MODES
+from src.time_measurements.results_manager import REGRESSION_THRESHOLD
+
+MODES = ("linear", "threads", "process", "interpreters", "auto")
+# exit status when a --timeout or --max-memory limit cut the output short
+EXIT_PARTIAL = 3
+FORMATS = ("jsonl", "csv", "tsv")
+
+
+def _split(value: Optional[str]) -> Optional[List[str]]:
+    if not value:
+        return None
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def _split_ints(value: Optional[str]) -> Optional[List[int]]:
+    items = _split(value)
+    return [int(item) for item in items] if items else None
+
+
+def _clock_offset(value: str) -> Tuple[str, int]:
+    name, sep, offset = value.rpartition("=")
+    if not sep or not name:
+        raise argparse.ArgumentTypeError(f"expected SOURCE=MICROSECONDS, got {value!r}")
+    return name, int(offset)
+
+
+@contextmanager
+def _open_output(path: Optional[str]) -> Iterator[TextIO]:
+    if path is None or path == "-":
+        yield sys.stdout
+        sys.stdout.flush()
+        return
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        yield f
+
+
+def resolve_mode(args: argparse.Namespace) -> None:
+    """Replace ``--mode auto`` with the planned mode; explicit --workers/--chunk-size still win."""
+    if args.mode != "auto":
+        return
+    plan = choose_plan(args.file, args.types, cores=args.workers)
+    args.mode = plan["mode"]
+    args.workers = args.workers or plan["workers"]
+    args.chunk_size = args.chunk_size or plan["chunk_size"]
+
+
+def _print_progress(event: Dict[str, Any]) -> None:
+    print("\r" + format_event(event), end="\n" if event["finished"] else "", file=sys.stderr, flush=True)
+
+
+def _parser_kwargs(args: argparse.Namespace) -> Dict[str, Any]:
+    """Opt-in profiling, progress, scaling, segment and I/O settings shared by every parser."""
+    kwargs: Dict[str, Any] = {"profile": args.profile, "profiler": args.profiler} if args.profile else {}
+    if getattr(args, "progress", False):
+        kwargs["progress"] = _print_progress
+    if getattr(args, "scale_from", None):
+        kwargs["scaling"] = args.scale_from
+    if getattr(args, "segments", None):
+        kwargs["segments"] = args.segments
+    if getattr(args, "io", None):
+        kwargs["io"] = args.io
+    return kwargs
+
+
+def _limit_kwargs(args: argparse.Namespace) -> Dict[str, Any]:
+    """Deadline and memory budget of the parallel modes."""
+    kwargs: Dict[str, Any] = {"timeout": args.timeout}
+    if args.max_memory is not None:
+        kwargs["max_memory"] = args.max_memory << 20
+    return kwargs
+
+
+def _note_stopped(args: argparse.Namespace, parser: MAVParserChunked) -> None:
+    args.stopped = parser.stopped
+    if parser.stopped:
+        print(f"stopped early ({parser.stopped} limit): output is partial", file=sys.stderr)
+
+
+def _print_profile(args: argparse.Namespace) -> None:
+    report_path = os.path.join(args.profile, "report.json")
+    if os.path.exists(report_path):
+        with open(report_path, encoding="utf-8") as f:
+            print(format_report(json.load(f)), file=sys.stderr)
+
+
+def iter_messages(args: argparse.Namespace) -> Iterator[Dict[str, Any]]:
+    """Stream messages from the parser selected on the command line ("-" and tcp:// read a stream)."""
+    if is_stream_source(args.file):
+        with open_source(args.file) as source:
+            yield from MAVStreamReader(source, type_filter=args.types)
+        return
+    resolve_mode(args)
+    if args.mode == "linear":
+        with MAVParserLinear(args.file, type_filter=args.types, **_parser_kwargs(args)) as parser:
+            yield from parser.iter_messages()
+        return
+    parser = _parallel_parser(args)
+    yield from parser.iter_messages()
+    _note_stopped(args, parser)
+
+
+def _parallel_parser(args: argparse.Namespace) -> MAVParserChunked:
+    parallel = (args.file, args.types, args.workers, args.chunk_size)
+    kwargs = {**_parser_kwargs(args), **_limit_kwargs(args)}
+    if args.mode == "threads":
+        return MAVParserThreads(*parallel, **kwargs)
+    if args.mode == "interpreters":
+        return MAVParserChunked(*parallel, backend="interpreters", **kwargs)
+    return MAVParserProcess(*parallel, **kwargs)
+
+
+def _exports_in_workers(args: argparse.Namespace) -> bool:
+    """Whether a parallel mode is selected for a log file, so the workers can write the output."""
+    if is_stream_source(args.file):
+        return False
+    resolve_mode(args)
+    return args.mode != "linear"
+
+
+def cmd_dump(args: argparse.Namespace) -> int:
+    if args.output not in (None, "-") and args.limit is None and _exports_in_workers(args):
+        parser = _parallel_parser(args)
+        parser.export(args.output, args.format, args.columns, by_type=False)
+        _note_stopped(args, parser)
+        return 0
+    header = ["mavpackettype", *args.columns] if args.columns else None
+    with _open_output(args.output) as out:
+        writer = RowWriter(out, args.format, header)
+        for count, msg in enumerate(iter_messages(args)):
+            if args.limit is not None and count >= args.limit:
+                break
+            row = project(msg, args.columns)
+            if row is not None:
+                writer.write(row)
+    return 0
+
+
+def cmd_export(args: argparse.Namespace) -> int:
+    if _exports_in_workers(args):
+        parser = _parallel_parser(args)
+        parser.export(args.output_dir, args.format, args.columns)
+        _note_stopped(args, parser)
+        return 0
+    os.makedirs(args.output_dir, exist_ok=True)
+    extension = "jsonl" if args.format == "jsonl" else args.format
+    files: Dict[str, TextIO] = {}
+    writers: Dict[str, RowWriter] = {}
+    try:
+        for msg in iter_messages(args):
+            row = project(msg, args.columns)
+            if row is None:
+                continue
+            name = row.pop("mavpackettype")
+            writer = writers.get(name)
+            if writer is None:
+                path = os.path.join(args.output_dir, f"{name}.{extension}")
+                files[name] = open(path, "w", encoding="utf-8", newline="")
+                writer = writers[name] = RowWriter(files[name], args.format, args.columns or list(row))
+            writer.write(row)
+    finally:
+        for f in files.values():
+            f.close()
+    return 0
+
+
+def cmd_merge(args: argparse.Namespace) -> int:
+    """Stream several logs on one TimeUS timeline, each row tagged with its source."""
+    per_file = [argparse.Namespace(**{**vars(args), "file": path}) for path in args.files]
+    streams = {name: iter_messages(file_args) for name, file_args in zip(source_names(args.files), per_file)}
+    header = ["source", "mavpackettype", *args.columns] if args.columns else None
+    with _open_output(args.output) as out:
+        writer = RowWriter(out, args.format, header)
+        merged = merge_messages(streams, dict(args.offset or []), args.window)
+        for count, msg in enumerate(merged):
+            if args.limit is not None and count >= args.limit:
+                break
+            row = project(msg, args.columns)
+            if row is not None:
+                writer.write({"source": msg["source"], **row})
+    args.stopped = next((file_args.stopped for file_args in per_file if getattr(file_args, "stopped", None)), None)
+    return 0
+
+
+def cmd_stats(args: argparse.Namespace) -> int:
+    resolve_mode(args)
+    backend = {"linear": "serial"}.get(args.mode, args.mode)
+    kwargs = {**_parser_kwargs(args), **_limit_kwargs(args)}
+    parser = MAVParserChunked(args.file, args.types, args.workers, args.chunk_size, backend, **kwargs)
+    summary = parser.summarize()
+    _note_stopped(args, parser)
+
+    with _open_output(args.output) as out:
+        writer = RowWriter(out, args.format, ["type", "count", "first_TimeUS", "last_TimeUS"])
+        for name, entry in summary["types"].items():
+            writer.write({"type": name, **{key: entry[key] for key in ("count", "first_TimeUS", "last_TimeUS")}})
+    return 0
+
+
+def cmd_index(args: argparse.Namespace) -> int:
+    with MAVParserLinear(args.file, type_filter=args.types) as parser, _open_output(args.output) as out:
+        writer = RowWriter(out, args.format, ["offset", "type", "length"])
+        for offset, name, length in parser.iter_index():
+            writer.write({"offset": offset, "type": name, "length": length})
+    return 0
+
+
+def cmd_segments(args: argparse.Namespace) -> int:
+    columns = ["kind", "start", "end", "bytes", "start_TimeUS", "end_TimeUS", "modes"]
+    with _open_output(args.output) as out:
+        writer = RowWriter(out, args.format, columns)
+        for row in log_segments(args.file, args.kind):
+            writer.write({**row, "modes": " ".join(map(str, row["modes"]))} if args.format != "jsonl" else row)
+    return 0
+
+
+def cmd_bench(args: argparse.Namespace) -> int:
+    from src.time_measurements.parser_runners import ParserRunners
+    from src.time_measurements.results_manager import ResultsManager
+
+    runners = ParserRunners(args.file, args.workers, args.chunk_size, **({"io": args.io} if args.io else {}))
+    if args.calibrate:
+        calibration = runners.calibrate(modes=args.modes)
+        with _open_output(args.output) as out:
+            writer = RowWriter(out, args.format, ["mode", "startup_s", "full_s_per_mb", "skip_s_per_mb"])
+            for mode, entry in calibration["modes"].items():
+                writer.write({"mode": mode, **entry})
+        return 0
+
+    category = ",".join(args.types) if args.types else "all messages"
+    if args.compare_io:
+        data = runners.run_io(args.compare_io, selected=args.modes, category=category, type_filter=args.types)
+    elif args.scaling:
+        data = runners.run_scaling(args.scaling, selected=args.modes, category=category, type_filter=args.types)
+    else:
+        data = runners.run_all(selected=args.modes, category=category, save_list=True, type_filter=args.types)
+
+    with _open_output(args.output) as out:
+        writer = RowWriter(out, args.format, ["category", "library", "save", "time", "workers"])
+        for row in data:
+            writer.write(row)
+    if not args.save:
+        return 0
+
+    manager = ResultsManager(args.save)
+    config = {"types": args.types, "workers": args.workers, "chunk_size": args.chunk_size, "scaling": args.scaling}
+    if args.io or args.compare_io:
+        config["io"] = args.compare_io or args.io
+    manager.save(data, file_path=args.file, config=config)
+    regressions = manager.regressions(args.threshold)
+    for row in regressions:
+        print(
+            f"regression: {row['library']} ({row['category']}, workers={row['workers']}) "
+            f"{row['time']:.3f}s vs baseline {row['baseline']:.3f}s (+{row['slowdown']:.0%})",
+            file=sys.stderr,
+        )
+    return 1 if regressions and args.check else 0
+
+
+def cmd_compress(args: argparse.Namespace) -> int:
+    output = args.output or args.file + (".gz" if args.codec == "gzip" else ".zst")
+    blocks = compress_log(args.file, output, args.codec, args.block_size)
+    print(f"{output}: {len(blocks)} blocks", file=sys.stderr)
+    return 0
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    options = argparse.ArgumentParser(add_help=False)
+    options.add_argument(
+        "--mode", choices=MODES, default="linear", help="parser backend; auto picks one for the log (default: linear)"
+    )
+    options.add_argument("--workers", type=int, default=None, help="worker count for the parallel modes")
+    options.add_argument("--chunk-size", type=int, default=None, help="bytes per chunk for the parallel modes")
+    options.add_argument("--profile", default=None, help="directory for profile artifacts (enables profiling)")
+    options.add_argument("--profiler", choices=PROFILERS, default="sample", help="stack sampler or cProfile")
+    options.add_argument("--progress", action="store_true", help="print progress and MB/s to stderr")
+    options.add_argument("--timeout", type=float, default=None, help="stop the parallel modes after this many seconds")
+    options.add_argument("--max-memory", type=int, default=None, help="memory budget of the parallel modes, in MB")
+    options.add_argument(
+        "--scale-from", choices=SCALING_MODES, default=None, help="scale from the config tables or the log's FMTU/MULT"
+    )
+    options.add_argument(
+        "--segments", choices=SEGMENT_KINDS, default=None, help="decode only the armed or in-flight parts of the log"
+    )
+    options.add_argument("--io", choices=IO_STRATEGIES, default=None, help="how plain logs are read (default: mmap)")
+    options.add_argument("--types", type=_split, default=None, help="comma separated message types, e.g. GPS,ATT")
+    options.add_argument("--columns", type=_split, default=None, help="comma separated columns to keep")
+    options.add_argument("--format", choices=FORMATS, default="jsonl", help="output format (default: jsonl)")
+    options.add_argument("-o", "--output", default=None, help="output file (default: stdout)")
+
+    common = argparse.ArgumentParser(add_help=False, parents=[options])
+    common.add_argument("file", help="path to the .bin log (dump/export: also - for stdin or tcp://host:port)")
+
+    parser = argparse.ArgumentParser(prog="bin_reader", description=__doc__)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    dump = subparsers.add_parser("dump", parents=[common], help="stream decoded messages")
+    dump.add_argument("--limit", type=int, default=None, help="stop after this many messages")
+    dump.set_defaults(handler=cmd_dump)
+
+    export = subparsers.add_parser("export", parents=[common], help="write one file per message type")
+    export.add_argument("--output-dir", required=True, help="directory for the per-type files")
+    export.set_defaults(handler=cmd_export)
+
+    merge = subparsers.add_parser("merge", parents=[options], help="stream several logs in global TimeUS order")
+    merge.add_argument("files", nargs="+", help="paths to the .bin logs")
+    merge.add_argument(
+        "--offset", type=_clock_offset, action="append", help="clock offset of one log, e.g. b.bin=-1500 (repeatable)"
+    )
+    merge.add_argument("--window", type=int, default=0, help="messages a log may be out of TimeUS order by")
+    merge.add_argument("--limit", type=int, default=None, help="stop after this many messages")
+    merge.set_defaults(handler=cmd_merge)
+
+    stats = subparsers.add_parser("stats", parents=[common], help="message counts and time span per type")
+    stats.set_defaults(handler=cmd_stats)
+
+    index = subparsers.add_parser("index", parents=[common], help="offset, type and length of every message")
+    index.set_defaults(handler=cmd_index)
+
+    segments = subparsers.add_parser("segments", parents=[common], help="armed or in-flight byte ranges of the log")
+    segments.add_argument("--kind", choices=SEGMENT_KINDS, default="flight", help="segment kind (default: flight)")
+    segments.set_defaults(handler=cmd_segments)
+
+    compress = subparsers.add_parser("compress", help="compress a log into independently readable blocks")
+    compress.add_argument("file", help="path to the .bin log")
+    compress.add_argument("-o", "--output", default=None, help="output path (default: <file>.gz / <file>.zst)")
+    compress.add_argument("--codec", choices=("gzip", "zstd"), default="gzip", help="compression (default: gzip)")
+    compress.add_argument("--block-size", type=int, default=DEFAULT_BLOCK_SIZE, help="raw bytes per block")
+    compress.set_defaults(handler=cmd_compress)
+
+    bench = subparsers.add_parser("bench", parents=[common], help="time the parsers on a log")
+    bench.add_argument("--modes", type=_split, default=None, help="runners to time (default: all)")
+    bench.add_argument(
+        "--save", default=None, help="also save the results to this JSON file and append them to its history"
+    )
+    bench.add_argument("--calibrate", action="store_true", help="measure the costs that --mode auto plans with")
+    bench.add_argument("--scaling", type=_split_ints, default=None, help="time the parallel modes per worker count")
+    bench.add_argument(
+        "--compare-io", type=_split, default=None, help="time the modes once per I/O strategy, e.g. mmap,pread"
+    )
+    bench.add_argument(
+        "--threshold", type=float, default=REGRESSION_THRESHOLD, help="slowdown flagged as a regression (default: 0.1)"
+    )
+    bench.add_argument("--check", action="store_true", help="exit with status 1 when --save flags a regression")
+    bench.set_defaults(handler=cmd_bench)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_arg_parser().parse_args(argv)
+    try:
+        status = args.handler(args)
+        if getattr(args, "profile", None):
+            _print_profile(args)
+        if getattr(args, "stopped", None):
+            return status or EXIT_PARTIAL
+        return status
+    except BrokenPipeError:
+        # Downstream closed the pipe (e.g. `| head`); silence the flush at interpreter exit.
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
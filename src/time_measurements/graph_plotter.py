@@ -1,9 +1,31 @@
-import pandas as pd
-import plotly.express as px
-
-from src.utils.config import FILE_PATH
 from src.time_measurements.parser_runners import ParserRunners
-from src.time_measurements.results_manager import ResultsManager
+from src.time_measurements.results_manager import REGRESSION_THRESHOLD, ResultsManager, find_regressions
+
+
+def history_frame(history, threshold=REGRESSION_THRESHOLD):
+    """One row per benchmark result across runs, with throughput (MB/s) and a regression flag."""
+    import pandas as pd
+
+    rows = []
+    for index, run in enumerate(history):
+        regressions = find_regressions(history, threshold, run_index=index)
+        flagged = {(r["category"], r["library"], r["save"], r.get("workers")) for r in regressions}
+        size_mb = (run.get("file_size") or 0) / (1 << 20)
+        for row in run["results"]:
+            rows.append({
+                "run": index,
+                "commit": run.get("commit") or f"run {index}",
+                "timestamp": run.get("timestamp"),
+                "category": row["category"],
+                "library": row["library"],
+                "save": row["save"],
+                "workers": row.get("workers"),
+                "time": row["time"],
+                "throughput": size_mb / row["time"] if size_mb and row["time"] else None,
+                "regression": (row["category"], row["library"], row["save"], row.get("workers")) in flagged,
+            })
+    return pd.DataFrame(rows)
+
 
 class GraphPlotter:
     @staticmethod
@@ -12,6 +34,9 @@ class GraphPlotter:
         Plots a benchmark bar chart for parser runtimes.
         The winner (fastest) in each category is highlighted in gold.
         """
+        import pandas as pd
+        import plotly.express as px
+
         df = pd.DataFrame(data)
 
         # Identify the winner (minimum time) in each category
@@ -55,8 +80,68 @@ class GraphPlotter:
 
         fig.show()
 
+    @staticmethod
+    def plot_trend(history, threshold=REGRESSION_THRESHOLD):
+        """
+        Plots throughput (MB/s) per parser over the recorded runs, labelled by git commit.
+        Runs slower than their baseline by more than ``threshold`` are marked with a red X.
+        """
+        import plotly.express as px
+
+        df = history_frame(history, threshold)
+        df["series"] = df["library"] + df["save"].map({True: "", False: " (no save)"})
+        fig = px.line(
+            df,
+            x="run",
+            y="throughput",
+            color="series",
+            facet_col="category",
+            markers=True,
+            hover_data=["commit", "timestamp", "workers", "time"],
+            title="Parser Throughput over Commits",
+        )
+        flagged = df[df["regression"]]
+        for category in flagged["category"].unique():
+            col = list(df["category"].unique()).index(category) + 1
+            points = flagged[flagged["category"] == category]
+            fig.add_scatter(
+                x=points["run"], y=points["throughput"], mode="markers", row=1, col=col,
+                marker=dict(symbol="x", size=14, color="red"), name="regression", showlegend=False,
+                hovertext=points["library"],
+            )
+        runs = df.drop_duplicates("run")
+        fig.update_xaxes(tickmode="array", tickvals=runs["run"], ticktext=runs["commit"], title="commit")
+        fig.update_layout(yaxis_title="Throughput (MB/s)", title_x=0.5)
+        fig.show()
+
+    @staticmethod
+    def plot_scaling(history, commit=None):
+        """
+        Plots throughput against worker count for the parallel parsers of one commit
+        (default: the commit of the latest run).
+        """
+        import plotly.express as px
+
+        df = history_frame(history)
+        commit = commit or df["commit"].iloc[-1]
+        df = df[(df["commit"] == commit) & df["workers"].notna()]
+        df = df.groupby(["category", "library", "workers"], as_index=False)["throughput"].median()
+        fig = px.line(
+            df.sort_values("workers"),
+            x="workers",
+            y="throughput",
+            color="library",
+            facet_col="category",
+            markers=True,
+            title=f"Scaling versus Workers ({commit})",
+        )
+        fig.update_layout(yaxis_title="Throughput (MB/s)", xaxis_title="Workers", title_x=0.5)
+        fig.show()
+
 
 if __name__ == "__main__":
+    from src.utils.config import FILE_PATH
+
     # Initialize runners and results manager
     runners = ParserRunners(FILE_PATH)
     results_manager = ResultsManager()
@@ -71,7 +156,12 @@ if __name__ == "__main__":
         data = data_all + data_gps
 
         # Save the results for future use
-        results_manager.save(data)
+        results_manager.save(data, file_path=FILE_PATH)
 
     # Plot the benchmark chart
     GraphPlotter.plot(data)
+
+    # Trend over the recorded runs, with regressions marked
+    history = results_manager.load_history()
+    if len(history) > 1:
+        GraphPlotter.plot_trend(history)
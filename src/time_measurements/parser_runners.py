@@ -1,21 +1,46 @@
+import subprocess
+import sys
 import time
+from pathlib import Path
 
+from src.business_logic.auto_mode import calibrate, choose_plan, create_parser
+from src.business_logic.backends import get_backend
 from src.business_logic.mav_parser_linear import MAVParserLinear
+from src.business_logic.mav_parser_chunked import MAVParserChunked
 from src.business_logic.mav_parser_process import MAVParserProcess
 from src.business_logic.mav_parser_threads import MAVParserThreads
-from pymavlink import mavutil
+from src.business_logic.sources import DEFAULT_IO
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+IMPORT_TIMER = (
+    "import time; start = time.perf_counter(); "
+    "import src.business_logic.mav_parser_linear, src.business_logic.mav_parser_threads, "
+    "src.business_logic.mav_parser_process; print(time.perf_counter() - start)"
+)
+
+PARALLEL_RUNNERS = {"process": "process", "threads": "threads", "interpreters": "interpreters"}
+
 
 class ParserRunners:
-    def __init__(self, file_path):
+    def __init__(self, file_path, workers=None, chunk_size=None, io=DEFAULT_IO):
         self.file_path = file_path
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.io = io
         self.runners = {
             "pymavlink": self.run_mavutil,
             "linear": self.run_linear,
             "process": self.run_process,
-            "threads": self.run_threads
+            "threads": self.run_threads,
+            "interpreters": self.run_interpreters,
+            "auto": self.run_auto,
+            "dataframes": self.run_dataframes,
+            "import": self.run_import,
         }
 
     def run_mavutil(self, save=True, type_filter=None):
+        from pymavlink import mavutil
+
         start = time.perf_counter()
         mav = mavutil.mavlink_connection(self.file_path)
         msgs = []
@@ -33,28 +58,80 @@ class ParserRunners:
 
     def run_linear(self, save=True, type_filter=None):
         start = time.perf_counter()
-        with MAVParserLinear(self.file_path, type_filter=type_filter) as parser:
+        with MAVParserLinear(self.file_path, type_filter=type_filter, io=self.io) as parser:
             if save:
                 parser.parse_all()
             else:
                 while _ := parser.parse_next():
                     pass
         end = time.perf_counter()
-        return "one run", round(end - start, 3), save
+        return self.label("one run"), round(end - start, 3), save
 
     def run_process(self, save=True, type_filter=None):
         start = time.perf_counter()
-        process = MAVParserProcess(self.file_path, type_filter=type_filter)
+        process = MAVParserProcess(self.file_path, type_filter, self.workers, self.chunk_size, io=self.io)
         process.run()
         end = time.perf_counter()
-        return "process", round(end - start, 3), save
+        return self.label("process"), round(end - start, 3), save
 
     def run_threads(self, save=True, type_filter=None):
         start = time.perf_counter()
-        threads = MAVParserThreads(self.file_path, type_filter=type_filter)
+        threads = MAVParserThreads(self.file_path, type_filter, self.workers, self.chunk_size, io=self.io)
         threads.run()
         end = time.perf_counter()
-        return "threads", round(end - start, 3), save
+        return self.label("threads"), round(end - start, 3), save
+
+    def run_interpreters(self, save=True, type_filter=None):
+        start = time.perf_counter()
+        parser = MAVParserChunked(
+            self.file_path, type_filter, self.workers, self.chunk_size, backend="interpreters", io=self.io
+        )
+        parser.run()
+        end = time.perf_counter()
+        return self.label("interpreters"), round(end - start, 3), save
+
+    def run_auto(self, save=True, type_filter=None):
+        start = time.perf_counter()
+        plan = choose_plan(self.file_path, type_filter)
+        parser = create_parser(self.file_path, type_filter, plan, io=self.io)
+        if isinstance(parser, MAVParserLinear):
+            with parser:
+                parser.parse_all()
+        else:
+            parser.run()
+        end = time.perf_counter()
+        # the mode auto picked is part of the name, so history entries say what actually ran
+        return self.label(f"auto:{plan['mode']}"), round(end - start, 3), save
+
+    def calibrate(self, modes=None, path=None):
+        """Time the parser modes on this log and store the costs that ``auto`` mode plans with."""
+        return calibrate(self.file_path, modes=modes, path=path)
+
+    def run_dataframes(self, save=True, type_filter=None):
+        start = time.perf_counter()
+        with MAVParserLinear(self.file_path, type_filter=type_filter, io=self.io) as parser:
+            parser.to_dataframes()
+        end = time.perf_counter()
+        return self.label("dataframes"), round(end - start, 3), save
+
+    def run_import(self, save=True, type_filter=None):
+        """Cold import time of the parser modules, measured in a fresh interpreter."""
+        output = subprocess.run(
+            [sys.executable, "-c", IMPORT_TIMER], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout
+        return "import", round(float(output), 3), save
+
+    def label(self, library):
+        """Result name of a runner; runs with a non-default I/O strategy are kept apart in the history."""
+        return library if self.io == DEFAULT_IO else f"{library}/{self.io}"
+
+    def worker_count(self, name):
+        """Workers a runner uses: 1 for the serial ones, None when chosen at run time (auto)."""
+        if name == "auto":
+            return None
+        if name not in PARALLEL_RUNNERS:
+            return 1
+        return get_backend(PARALLEL_RUNNERS[name], self.workers).workers
 
     def run_all(self, selected=None, category="all messages", save_list=True, type_filter=None):
         selected = selected or list(self.runners.keys())
@@ -62,6 +139,7 @@ class ParserRunners:
 
         for name in selected:
             func = self.runners[name]
+            workers = self.worker_count(name)
 
             if name in ["pymavlink", "linear"]:
                 for save_val in [False, True]:
@@ -70,7 +148,8 @@ class ParserRunners:
                         "category": category,
                         "library": lib_name,
                         "save": saved,
-                        "time": elapsed
+                        "time": elapsed,
+                        "workers": workers
                     })
             else:
                 lib_name, elapsed, saved = func(save=save_list, type_filter=type_filter)
@@ -78,7 +157,34 @@ class ParserRunners:
                     "category": category,
                     "library": lib_name,
                     "save": saved,
-                    "time": elapsed
+                    "time": elapsed,
+                    "workers": workers
                 })
 
-        return data
\ No newline at end of file
+        return data
+
+    def run_scaling(self, worker_counts, selected=None, category="all messages", type_filter=None):
+        """Time the parallel runners once per worker count (for the scaling view)."""
+        selected = [name for name in (selected or list(PARALLEL_RUNNERS)) if name in PARALLEL_RUNNERS]
+        configured = self.workers
+        data = []
+        try:
+            for workers in worker_counts:
+                self.workers = workers
+                data += self.run_all(selected=selected, category=category, type_filter=type_filter)
+        finally:
+            self.workers = configured
+        return data
+
+    def run_io(self, strategies, selected=None, category="all messages", type_filter=None):
+        """Time the runners once per I/O strategy (see ``sources.IO_STRATEGIES``)."""
+        selected = [name for name in (selected or ["linear", *PARALLEL_RUNNERS]) if name not in ("pymavlink", "import")]
+        configured = self.io
+        data = []
+        try:
+            for io in strategies:
+                self.io = io
+                data += self.run_all(selected=selected, category=category, type_filter=type_filter)
+        finally:
+            self.io = configured
+        return data
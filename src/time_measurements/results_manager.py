@@ -1,26 +1,157 @@
 import json
 import os
+import platform
+import statistics
+import subprocess
+import time
+from pathlib import Path
+
+from src.utils.logger import get_logger
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+HISTORY_SUFFIX = ".history.jsonl"
+# a run is flagged when it is this much slower than the median of the previous runs
+REGRESSION_THRESHOLD = 0.10
+BASELINE_RUNS = 5
+
+
+def git_commit():
+    """Short hash of the checked-out commit (with "+dirty" for local changes), or None outside git."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], cwd=REPO_ROOT, capture_output=True, text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + "+dirty" if dirty else commit
+
+
+def cpu_model():
+    """CPU model name (from /proc/cpuinfo on Linux, platform.processor() elsewhere)."""
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+
+def run_metadata(file_path=None, config=None):
+    """Tags stored with every benchmark run."""
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "cpu": cpu_model(),
+        "cpu_count": os.cpu_count(),
+        "file": os.path.basename(file_path) if file_path else None,
+        "file_size": os.path.getsize(file_path) if file_path else None,
+        "config": config or {},
+    }
+
+
+def _row_key(row):
+    return row["category"], row["library"], row["save"], row.get("workers")
+
+
+def _comparable(run, other):
+    """Same machine, interpreter, log and parser configuration (chunk size, I/O strategy, ...).
+
+    Only such runs have comparable timings.
+    """
+    if (run.get("config") or {}) != (other.get("config") or {}):
+        return False
+    return all(run.get(key) == other.get(key) for key in ("cpu", "cpu_count", "python", "file", "file_size"))
+
+
+def find_regressions(history, threshold=REGRESSION_THRESHOLD, baseline_runs=BASELINE_RUNS, run_index=-1):
+    """Rows of one run (default: the latest) slower than ``1 + threshold`` times their baseline.
+
+    The baseline of a row is the median time of the same row (category, library, save,
+    workers) in up to ``baseline_runs`` earlier comparable runs.
+    """
+    if not history:
+        return []
+    run_index = run_index % len(history)
+    run = history[run_index]
+    earlier = [other for other in history[:run_index] if _comparable(run, other)][-baseline_runs:]
+
+    regressions = []
+    for row in run["results"]:
+        previous = [r["time"] for other in earlier for r in other["results"] if _row_key(r) == _row_key(row)]
+        if not previous:
+            continue
+        baseline = statistics.median(previous)
+        if baseline > 0 and row["time"] > baseline * (1 + threshold):
+            regressions.append({
+                **row,
+                "commit": run.get("commit"),
+                "baseline": baseline,
+                "slowdown": round(row["time"] / baseline - 1, 3),
+            })
+    return regressions
+
 
 class ResultsManager:
-    def __init__(self, results_file="results.json"):
+    """Latest benchmark snapshot in ``results_file`` plus an append-only history of every run.
+
+    The history lives next to the snapshot (``results.history.jsonl`` for ``results.json``),
+    one JSON object per run: the tags from ``run_metadata`` and the result rows. Status
+    messages go to the logger (stderr), never to stdout.
+    """
+
+    def __init__(self, results_file="results.json", history_file=None):
         self.results_file = results_file
+        self.history_file = history_file or str(Path(results_file).with_suffix("")) + HISTORY_SUFFIX
         self.results = []
+        self.history = []
 
     def load(self):
         if os.path.exists(self.results_file):
             try:
                 with open(self.results_file, "r", encoding="utf-8") as f:
                     self.results = json.load(f)
-                print(f"📂 Loaded results from {self.results_file}")
+                get_logger().info(f"Loaded results from {self.results_file}")
             except Exception as e:
-                print(f"⚠️ Failed to load results: {e}")
+                get_logger().warning(f"Failed to load results: {e}")
         return self.results
 
-    def save(self, data):
+    def load_history(self):
+        """Every recorded run, oldest first; unreadable lines are skipped."""
+        self.history = []
+        if os.path.exists(self.history_file):
+            with open(self.history_file, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        self.history.append(json.loads(line))
+                    except ValueError:
+                        continue
+        return self.history
+
+    def append(self, data, file_path=None, config=None):
+        """Add one run to the history; returns the stored entry."""
+        entry = {**run_metadata(file_path, config), "results": data}
+        with open(self.history_file, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+        self.history.append(entry)
+        return entry
+
+    def save(self, data, file_path=None, config=None):
+        """Write the snapshot and append the run to the history."""
         self.results = data
         try:
             with open(self.results_file, "w", encoding="utf-8") as f:
                 json.dump(self.results, f, indent=2)
-            print(f"💾 Results saved to {self.results_file}")
+            self.append(data, file_path, config)
+            get_logger().info(f"Results saved to {self.results_file} (history: {self.history_file})")
         except Exception as e:
-            print(f"⚠️ Failed to save results: {e}")
\ No newline at end of file
+            get_logger().warning(f"Failed to save results: {e}")
+
+    def regressions(self, threshold=REGRESSION_THRESHOLD):
+        """Regressions of the latest run against the history (see ``find_regressions``)."""
+        return find_regressions(self.load_history(), threshold)
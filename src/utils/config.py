@@ -1,38 +1,141 @@
+"""Lazily loaded configuration.
+
+Nothing is read at import time. Settings and binary format tables start from the packaged
+defaults in ``src.utils.defaults``; a JSON file given to ``load_config(path)`` or through the
+``BIN_READER_CONFIG`` environment variable overrides any of them, and the repository's
+``config.json`` is used when no override file is configured.
+
+The module constants (``HEADER``, ``FMT_LENGTH``, ...) are computed on first access, so
+``load_config`` must be called before the parsers are imported to affect them.
+"""
+
 import json
+import os
+import struct
 from pathlib import Path
+from typing import Any, Dict, Optional
 
-# ---------- Load config from JSON ----------
-CONFIG_PATH = r"C:\Users\shuki\Desktop\9900\bin_reader\config.json"
+from src.utils.defaults import DEFAULT_CONFIG
 
-with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-    raw_config = json.load(f)
+CONFIG_ENV_VAR = "BIN_READER_CONFIG"
+REPO_CONFIG_PATH = Path(__file__).resolve().parents[2] / "config.json"
 
-# ---------- File & Logger Settings ----------
-FILE_PATH = raw_config["FILE_PATH"]
-LOGGER_SETTINGS = raw_config["LOGGER_SETTINGS"]
+_config_path: Optional[str] = None
+_settings: Optional[Dict[str, Any]] = None
+_binary: Optional[Dict[str, Any]] = None
+# value BIN_READER_CONFIG had before load_config(path) exported a path; () when nothing was exported
+_env_before: tuple = ()
 
-# ---------- Binary Format Config ----------
-binary_config = raw_config["BINARY_FORMAT"]
+_BINARY_NAMES = frozenset(
+    {
+        "binary_config",
+        "HEADER",
+        "FMT_TYPE",
+        "FMT_HEADER",
+        "FMT_LENGTH",
+        "FORMAT_TO_STRUCT",
+        "FMT_SIZE_MAP",
+        "FIELD_SCALERS",
+        "FORMAT_SCALERS",
+        "PRECOMPUTED_SCALES",
+        "STRING_FORMATS",
+        "ROUNDING",
+        "STRUCT_CACHE",
+    }
+)
+_SETTING_NAMES = frozenset({"raw_config", "FILE_PATH", "LOGGER_SETTINGS", "CONFIG_PATH"})
 
-HEADER = bytes.fromhex(binary_config["HEADER"])
-FMT_TYPE = binary_config["FMT_TYPE"]
-FMT_HEADER = bytes.fromhex(binary_config["FMT_HEADER"])
-FMT_LENGTH = binary_config["FMT_LENGTH"]
 
-FORMAT_TO_STRUCT = binary_config["FORMAT_TO_STRUCT"]
-FMT_SIZE_MAP = binary_config["FMT_SIZE_MAP"]
+def _config_file() -> Optional[str]:
+    """The file settings and binary tables are read from: the override, else the repo config."""
+    path = _config_path or os.environ.get(CONFIG_ENV_VAR)
+    if path is None and REPO_CONFIG_PATH.exists():
+        path = str(REPO_CONFIG_PATH)
+    return path
 
-# ---------- Scaling ----------
-FIELD_SCALERS = binary_config.get("FIELD_SCALERS", {})
-FORMAT_SCALERS = binary_config.get("FORMAT_SCALERS", {})
-PRECOMPUTED_SCALES = {**FIELD_SCALERS, **FORMAT_SCALERS}
 
-# ---------- String formats ----------
-STRING_FORMATS = frozenset(binary_config.get("STRING_FORMATS", []))
+def _read_json(path: Any) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
 
-# ---------- Rounding ----------
-ROUNDING = frozenset(binary_config.get("ROUNDING", []))
 
-# ---------- Precompiled Structs ----------
-import struct
-STRUCT_CACHE = {fmt: struct.Struct("<" + fmt_str) for fmt, fmt_str in FORMAT_TO_STRUCT.items()}
+def _merged(overrides: Dict[str, Any]) -> Dict[str, Any]:
+    merged = {**DEFAULT_CONFIG, **overrides}
+    for section in ("LOGGER_SETTINGS", "BINARY_FORMAT"):
+        merged[section] = {**DEFAULT_CONFIG[section], **overrides.get(section, {})}
+    return merged
+
+
+def load_config(path: Optional[str] = None) -> Dict[str, Any]:
+    """Use ``path`` (or the environment / repository config) and drop cached values.
+
+    The path is exported to ``BIN_READER_CONFIG`` so spawned worker processes see it too;
+    ``load_config()`` without a path restores the variable's earlier value.
+    """
+    global _config_path, _settings, _binary, _env_before
+    _config_path = str(path) if path else None
+    if _config_path:
+        if not _env_before:
+            _env_before = (os.environ.get(CONFIG_ENV_VAR),)
+        os.environ[CONFIG_ENV_VAR] = _config_path
+    elif _env_before:
+        (previous,) = _env_before
+        if previous is None:
+            os.environ.pop(CONFIG_ENV_VAR, None)
+        else:
+            os.environ[CONFIG_ENV_VAR] = previous
+        _env_before = ()
+    _settings = None
+    _binary = None
+    for name in _BINARY_NAMES | _SETTING_NAMES:
+        globals().pop(name, None)
+    return get_config()
+
+
+def get_config() -> Dict[str, Any]:
+    """Full configuration: defaults merged with the first config file found."""
+    global _settings
+    if _settings is None:
+        path = _config_file()
+        _settings = _merged(_read_json(path) if path else {})
+        _settings["CONFIG_PATH"] = path
+    return _settings
+
+
+def _binary_values() -> Dict[str, Any]:
+    """Derived binary format constants, read from the same file as ``get_config``."""
+    global _binary
+    if _binary is None:
+        path = _config_file()
+        binary_config = _merged(_read_json(path) if path else {})["BINARY_FORMAT"]
+        format_to_struct = binary_config["FORMAT_TO_STRUCT"]
+        field_scalers = binary_config.get("FIELD_SCALERS", {})
+        format_scalers = binary_config.get("FORMAT_SCALERS", {})
+        _binary = {
+            "binary_config": binary_config,
+            "HEADER": bytes.fromhex(binary_config["HEADER"]),
+            "FMT_TYPE": binary_config["FMT_TYPE"],
+            "FMT_HEADER": bytes.fromhex(binary_config["FMT_HEADER"]),
+            "FMT_LENGTH": binary_config["FMT_LENGTH"],
+            "FORMAT_TO_STRUCT": format_to_struct,
+            "FMT_SIZE_MAP": binary_config["FMT_SIZE_MAP"],
+            "FIELD_SCALERS": field_scalers,
+            "FORMAT_SCALERS": format_scalers,
+            "PRECOMPUTED_SCALES": {**field_scalers, **format_scalers},
+            "STRING_FORMATS": frozenset(binary_config.get("STRING_FORMATS", [])),
+            "ROUNDING": frozenset(binary_config.get("ROUNDING", [])),
+            "STRUCT_CACHE": {fmt: struct.Struct("<" + fmt_str) for fmt, fmt_str in format_to_struct.items()},
+        }
+    return _binary
+
+
+def __getattr__(name: str) -> Any:
+    if name in _BINARY_NAMES:
+        value = _binary_values()[name]
+    elif name in _SETTING_NAMES:
+        settings = get_config()
+        value = settings if name == "raw_config" else settings[name]
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
@@ -1,23 +1,33 @@
+import atexit
+import multiprocessing
 import sys
-from logging import Formatter, Logger, StreamHandler, FileHandler, getLogger
+import threading
+import time
+from logging import Formatter, Logger, StreamHandler, FileHandler, Handler, getLogger
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, List, Optional
 
 import src.utils.config as config
 
 
 class AppLogger:
-    """Logger that writes to both console and file with separate formatters."""
+    """Logger that writes to stderr and, when a log file is configured, to that file.
 
-    def __init__(
-        self, name: str = config.LOGGER_SETTINGS["LOG_NAME"], log_file: str = config.LOGGER_SETTINGS["LOG_FILE"]
-    ):
-        self.logger: Logger = getLogger(name)
+    Diagnostics never go to stdout, which carries the command line's data rows. The log
+    file is only created once the first record is written to it.
+    """
+
+    def __init__(self, name: Optional[str] = None, log_file: Optional[str] = None):
+        settings = config.LOGGER_SETTINGS
+        self.logger: Logger = getLogger(name or settings["LOG_NAME"])
         self.console_handler: StreamHandler | None = None
         self.file_handler: FileHandler | None = None
 
         if not self.logger.hasHandlers():
             self._setup_console_handler()
-            self._setup_file_handler(log_file)
-            self.logger.setLevel(config.LOGGER_SETTINGS["LOG_LEVEL"])
+            if log_file or settings["LOG_FILE"]:
+                self._setup_file_handler(log_file or settings["LOG_FILE"])
+            self.logger.setLevel(settings["LOG_LEVEL"])
 
     @staticmethod
     def _console_formatter() -> Formatter:
@@ -28,12 +38,12 @@ class AppLogger:
         return Formatter("%(asctime)s - %(levelname)s - %(filename)s:%(lineno)d - %(funcName)s() - %(message)s")
 
     def _setup_console_handler(self) -> None:
-        self.console_handler = StreamHandler(sys.stdout)
+        self.console_handler = StreamHandler(sys.stderr)
         self.console_handler.setFormatter(self._console_formatter())
         self.logger.addHandler(self.console_handler)
 
     def _setup_file_handler(self, log_file: str) -> None:
-        self.file_handler = FileHandler(log_file, encoding="utf-8")
+        self.file_handler = FileHandler(log_file, encoding="utf-8", delay=True)
         self.file_handler.setFormatter(self._file_formatter())
         self.logger.addHandler(self.file_handler)
 
@@ -41,4 +51,129 @@ class AppLogger:
         return self.logger
 
 
-logger = AppLogger().get_logger()
+_logger: Optional[Logger] = None
+
+
+def get_logger() -> Logger:
+    """Return the application logger, creating its handlers (and log file) on first use."""
+    global _logger
+    if _logger is None:
+        _logger = AppLogger().get_logger()
+    return _logger
+
+
+_queue: Optional[Any] = None
+_listener: Optional[QueueListener] = None
+_direct_handlers: List[Handler] = []
+
+
+def enable_queue_logging(queue: Optional[Any] = None) -> Any:
+    """Route the app logger through a queue so callers never block on console/file I/O.
+
+    The real handlers run on a background ``QueueListener`` thread. The queue is a
+    ``multiprocessing`` queue so process workers can log into it as well (see
+    ``worker_logging_kwargs``).
+    """
+    global _queue, _listener, _direct_handlers
+    if _listener is not None:
+        return _queue
+
+    app_logger = get_logger()
+    _direct_handlers = list(app_logger.handlers)
+    for handler in _direct_handlers:
+        app_logger.removeHandler(handler)
+
+    _queue = queue if queue is not None else multiprocessing.Queue(-1)
+    app_logger.addHandler(QueueHandler(_queue))
+    _listener = QueueListener(_queue, *_direct_handlers, respect_handler_level=True)
+    _listener.start()
+    return _queue
+
+
+def queue_logging_enabled() -> bool:
+    return _listener is not None
+
+
+def disable_queue_logging() -> None:
+    """Flush pending records and put the direct handlers back."""
+    global _queue, _listener, _direct_handlers
+    if _listener is None:
+        return
+    _listener.stop()
+    app_logger = get_logger()
+    for handler in list(app_logger.handlers):
+        if isinstance(handler, QueueHandler):
+            app_logger.removeHandler(handler)
+    for handler in _direct_handlers:
+        app_logger.addHandler(handler)
+    _queue, _listener, _direct_handlers = None, None, []
+
+
+# flush whatever the listener still holds at exit; a no-op when queue logging is off
+atexit.register(disable_queue_logging)
+
+
+def install_worker_queue_handler(queue: Any) -> None:
+    """Pool initializer: send this worker's records to the parent's listener."""
+    global _logger
+    settings = config.LOGGER_SETTINGS
+    worker_logger = getLogger(settings["LOG_NAME"])
+    worker_logger.handlers = [QueueHandler(queue)]
+    worker_logger.setLevel(settings["LOG_LEVEL"])
+    _logger = worker_logger
+
+
+def worker_logging_kwargs() -> Dict[str, Any]:
+    """``Pool`` keyword arguments that hook workers into queue logging when it is enabled."""
+    if _queue is None:
+        return {}
+    return {"initializer": install_worker_queue_handler, "initargs": (_queue,)}
+
+
+class DecodeErrorReporter:
+    """Aggregate decode errors per chunk and log them as rate-limited summaries.
+
+    Instead of one record per bad message, a chunk produces one warning per message type
+    ("N decode errors of type X in chunk K"). At most ``max_per_second`` summaries are
+    logged; the rest are counted and mentioned with the next summary that gets through.
+    """
+
+    def __init__(self, max_per_second: float = 5.0, logger: Optional[Logger] = None):
+        self.max_per_second = max_per_second
+        self.logger = logger
+        self.suppressed = 0
+        self._allowance = max_per_second
+        self._last_check = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _allow(self) -> bool:
+        now = time.monotonic()
+        self._allowance = min(self.max_per_second, self._allowance + (now - self._last_check) * self.max_per_second)
+        self._last_check = now
+        if self._allowance < 1:
+            return False
+        self._allowance -= 1
+        return True
+
+    def report(self, chunk_index: int, errors: Dict[str, int]) -> None:
+        for name, count in errors.items():
+            with self._lock:
+                if not self._allow():
+                    self.suppressed += 1
+                    continue
+                suppressed, self.suppressed = self.suppressed, 0
+
+            message = f"{count} decode errors of type {name} in chunk {chunk_index}"
+            if suppressed:
+                message += f" ({suppressed} more summaries suppressed)"
+            (self.logger or get_logger()).warning(message)
+
+
+error_reporter = DecodeErrorReporter()
+
+
+def __getattr__(name: str) -> Logger:
+    # `from src.utils.logger import logger` keeps working but no longer opens the log file at import
+    if name == "logger":
+        return get_logger()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
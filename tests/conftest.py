@@ -0,0 +1,10 @@
+import pytest
+from src.business_logic.sources import INDEX_DIR_ENV_VAR
+
+
+@pytest.fixture(autouse=True)
+def block_index_dir(tmp_path, monkeypatch):
+    """Keep the block indexes the tests build out of the user's cache directory."""
+    path = tmp_path / "index-cache"
+    monkeypatch.setenv(INDEX_DIR_ENV_VAR, str(path))
+    return path
@@ -0,0 +1,31 @@
+"""Builders for the small DataFlash logs the tests write."""
+
+import struct
+
+from src.business_logic.mav_parser_linear import HEADER, FMT_TYPE
+
+
+def fmt_message(msg_type: int, length: int, name: bytes, fmt: bytes, cols: bytes) -> bytes:
+    return bytes(HEADER) + bytes([FMT_TYPE]) + struct.pack("<BB4s16s64s", msg_type, length, name, fmt, cols)
+
+
+def record(msg_type: int, fmt: str, *values) -> bytes:
+    """One message of ``msg_type`` with ``values`` packed by the struct format ``fmt``."""
+    return bytes(HEADER) + bytes([msg_type]) + struct.pack(fmt, *values)
+
+
+# the FMT definition of FMT itself, which every log starts with
+FMT_FMT = fmt_message(FMT_TYPE, 89, b"FMT", b"BBnNZ", b"Type,Length,Name,Format,Columns")
+ATT_FMT = fmt_message(10, 15, b"ATT", b"Qf", b"TimeUS,Roll")
+GPS_FMT = fmt_message(11, 19, b"GPS", b"QLL", b"TimeUS,Lat,Lng")
+
+
+def att_gps_log(path, count: int, gps_every: int = 5, step: int = 100, roll: float = 1.5) -> str:
+    """ATT (15 bytes) at every step and GPS (19 bytes) every ``gps_every`` steps; TimeUS is ``i * step``."""
+    with open(path, "wb") as f:
+        f.write(FMT_FMT + ATT_FMT + GPS_FMT)
+        for i in range(count):
+            f.write(record(10, "<Qf", i * step, roll))
+            if i % gps_every == 0:
+                f.write(record(11, "<Qii", i * step, 320000000, 350000000))
+    return str(path)
@@ -0,0 +1,97 @@
+import pytest
+import json
+from pathlib import Path
+from src.business_logic import auto_mode
+from src.business_logic.mav_parser_linear import MAVParserLinear
+from src.cli import main
+from src.time_measurements.parser_runners import ParserRunners
+from tests.helpers import att_gps_log
+
+
+# -------------------------
+# Fixtures
+# -------------------------
+@pytest.fixture
+def sample_file(tmp_path):
+    """ATT (15 bytes) every step, GPS (19 bytes) every 10th step."""
+    return att_gps_log(tmp_path / "test_log.bin", 20000, gps_every=10, step=1, roll=0.5)
+
+
+@pytest.fixture
+def no_size_floor(monkeypatch):
+    """Let the planner parallelise the small sample log."""
+    monkeypatch.setattr(auto_mode, "SMALL_LOG", 0)
+    monkeypatch.setattr(auto_mode, "MIN_CHUNK", 64 << 10)
+
+
+CALIBRATION = {
+    "linear": {"startup_s": 0.0, "full_s_per_mb": 1.0, "skip_s_per_mb": 0.2},
+    "threads": {"startup_s": 2.0, "full_s_per_mb": 0.5, "skip_s_per_mb": 0.1},
+    "process": {"startup_s": 0.0, "full_s_per_mb": 2.0, "skip_s_per_mb": 0.01},
+}
+
+
+# -------------------------
+# Test planning
+# -------------------------
+def test_selectivity_estimate(sample_file):
+    info = auto_mode.inspect_log(sample_file, ["GPS"])
+    assert info["blocks"] is None
+    assert info["selectivity"] == pytest.approx(19 / (19 + 150), rel=0.05)
+    assert auto_mode.inspect_log(sample_file)["selectivity"] == 1.0
+
+
+def test_small_log_stays_linear(sample_file):
+    plan = auto_mode.choose_plan(sample_file, cores=8, calibration={"modes": CALIBRATION})
+    assert plan["mode"] == "linear"
+    assert plan["workers"] == 1
+
+
+def test_calibration_picks_fastest_mode(sample_file, no_size_floor):
+    full = auto_mode.choose_plan(sample_file, cores=4, calibration={"modes": CALIBRATION})
+    assert full["mode"] == "linear"
+    selective = auto_mode.choose_plan(sample_file, ["GPS"], cores=4, calibration={"modes": CALIBRATION})
+    assert selective["mode"] == "process"
+    assert selective["workers"] == 4
+    assert selective["chunk_size"] >= auto_mode.MIN_CHUNK
+
+
+def test_created_parser_matches_linear(sample_file, no_size_floor):
+    with MAVParserLinear(sample_file, type_filter=["GPS"]) as parser:
+        expected = parser.parse_all()
+    plan = auto_mode.choose_plan(sample_file, ["GPS"], cores=2, calibration={})
+    assert plan["mode"] != "linear"
+    assert list(auto_mode.create_parser(sample_file, ["GPS"], plan).iter_messages()) == expected
+    parser = auto_mode.create_parser(sample_file, ["GPS"], plan, io="pread")
+    assert parser.io == "pread" and list(parser.iter_messages()) == expected
+
+
+def test_auto_runner_reports_mode_and_io(sample_file, no_size_floor):
+    name, _, _ = ParserRunners(sample_file, io="pread").run_auto(type_filter=["GPS"])
+    assert name == f"auto:{auto_mode.choose_plan(sample_file, ['GPS'])['mode']}/pread"
+
+
+# -------------------------
+# Test calibration
+# -------------------------
+def test_calibrate_roundtrip(sample_file, tmp_path):
+    path = tmp_path / "calibration.json"
+    calibration = auto_mode.calibrate(sample_file, modes=["linear", "threads"], path=path)
+    assert set(calibration["modes"]) == {"linear", "threads"}
+    assert calibration["filter"]["types"] == ["GPS"]
+    assert auto_mode.load_calibration(path) == calibration
+
+    stale = {**calibration, "machine": {**calibration["machine"], "cpu_count": -1}}
+    path.write_text(json.dumps(stale))
+    assert auto_mode.load_calibration(path) is None
+
+
+def test_calibration_next_to_block_indexes(block_index_dir, monkeypatch):
+    monkeypatch.delenv(auto_mode.CALIBRATION_ENV_VAR, raising=False)
+    assert auto_mode.calibration_path() == Path(block_index_dir) / "calibration.json"
+
+
+def test_cli_auto_mode(sample_file, capsys):
+    assert main(["dump", sample_file, "--mode", "auto", "--types", "GPS", "--limit", "2"]) == 0
+    rows = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [row["TimeUS"] for row in rows] == [0, 10]
@@ -0,0 +1,79 @@
+import pytest
+from src.business_logic.bulk_decode import decode_buffers_bulk, decode_chunk_bulk, locate_messages
+from src.business_logic.columnar import decode_buffers, scan_offsets
+from src.business_logic.mav_core import decode_chunk, scan_fmts
+from src.business_logic.mav_parser_threads import MAVParserThreads, HEADER
+from tests.helpers import FMT_FMT, fmt_message, record
+
+np = pytest.importorskip("numpy")
+
+
+# -------------------------
+# Fixtures
+# -------------------------
+@pytest.fixture
+def sample_data():
+    """GPS/MSG/BLOB/ARR messages with header patterns hidden in payloads, garbage and a cut-off tail."""
+    data = bytearray()
+    data += FMT_FMT
+    data += fmt_message(11, 22, b"GPS", b"QLLcB", b"TimeUS,Lat,Lng,Alt,NSats")
+    data += fmt_message(12, 75, b"MSG", b"QZ", b"TimeUS,Message")
+    data += fmt_message(13, 27, b"BLOB", b"QN", b"TimeUS,Data")
+    data += fmt_message(14, 75, b"ARR", b"Qa", b"TimeUS,Values")
+    data += fmt_message(15, 15, b"DUP", b"Qf", b"TimeUS,TimeUS")
+    for i in range(120):
+        data += record(11, "<QiihB", i, 320000000 + i, -350000000, -5 * i, 9)
+        if i % 7 == 0:
+            data += record(12, "<Q64s", i, b"\xa3\x95\x0b" + b"text %d" % i)
+            data += b"\xa3\x95\x63garbage"
+        if i % 11 == 0:
+            data += record(13, "<Q16s", i, bytes(HEADER) + bytes([12, 0, 0]))
+            data += record(14, "<Q32h", i, *range(-16, 16))
+            data += record(15, "<Qf", i, 0.5)
+    data += bytes(HEADER) + bytes([11]) + b"\x00" * 5
+    return bytes(data)
+
+
+# -------------------------
+# Test equivalence with the core decoder
+# -------------------------
+def test_locate_matches_walk(sample_data):
+    fmts = scan_fmts(sample_data)
+    offsets, types = locate_messages(np.frombuffer(sample_data, dtype=np.uint8), 200, len(sample_data), fmts)
+    walked = scan_offsets(memoryview(sample_data), 200, len(sample_data), fmts)
+    by_type = {t: offsets[types == t].tolist() for t in np.unique(types).tolist()}
+    assert by_type == walked
+
+
+@pytest.mark.parametrize("type_filter", [None, {"MSG", "BLOB"}])
+def test_decode_chunk_matches_core(sample_data, type_filter):
+    fmts = scan_fmts(sample_data)
+    data = np.frombuffer(sample_data, dtype=np.uint8)
+    for start, end in [(0, len(sample_data)), (1000, 3000)]:
+        expected = decode_chunk(memoryview(sample_data), start, end, fmts, type_filter)
+        assert decode_chunk_bulk(data, start, end, fmts, type_filter) == expected
+
+
+def test_decode_buffers_match_columnar(sample_data):
+    fmts = scan_fmts(sample_data)
+    data = np.frombuffer(sample_data, dtype=np.uint8)
+    expected = decode_buffers(memoryview(sample_data), scan_offsets(memoryview(sample_data), 0, len(data), fmts), fmts)
+    buffers = decode_buffers_bulk(data, 0, len(data), fmts)
+    assert set(buffers) == set(expected)
+    for name, columns in expected.items():
+        for col, values in columns.items():
+            if isinstance(values, list) and col != "Data":
+                # string buffers only need to agree once the null padding is stripped
+                assert buffers[name][col] == [v.rstrip(b"\x00") for v in values], (name, col)
+            elif isinstance(values, list):
+                assert buffers[name][col] == values
+            else:
+                assert list(np.asarray(buffers[name][col]).ravel()) == list(values), (name, col)
+
+
+def test_threads_parser_uses_bulk_path(tmp_path, sample_data):
+    path = tmp_path / "test_log.bin"
+    path.write_bytes(sample_data)
+    parser = MAVParserThreads(str(path), workers=3, chunk_size=1024)
+    parser.run()
+    assert parser.messages == decode_chunk(memoryview(sample_data), 0, len(sample_data), scan_fmts(sample_data))[0]
@@ -0,0 +1,98 @@
+import pytest
+import json
+from src.cli import main
+from tests.helpers import att_gps_log
+
+
+# -------------------------
+# Fixtures
+# -------------------------
+@pytest.fixture
+def sample_file(tmp_path):
+    return att_gps_log(tmp_path / "test_log.bin", 10)
+
+
+# -------------------------
+# Test dump
+# -------------------------
+@pytest.mark.parametrize("mode", ["linear", "threads", "process"])
+def test_dump_jsonl(sample_file, capsys, mode):
+    assert main(["dump", sample_file, "--mode", mode, "--workers", "2", "--types", "GPS"]) == 0
+    rows = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [row["TimeUS"] for row in rows] == [0, 500]
+    assert rows[0]["Lat"] == 32.0
+
+
+def test_dump_csv_projection(sample_file, capsys):
+    main(["dump", sample_file, "--types", "ATT,GPS", "--columns", "TimeUS,Lat", "--format", "csv", "--limit", "3"])
+    lines = capsys.readouterr().out.splitlines()
+    assert lines == ["mavpackettype,TimeUS,Lat", "ATT,0,", "GPS,0,32.0", "ATT,100,"]
+
+
+# -------------------------
+# Test export
+# -------------------------
+def test_export_csv(sample_file, tmp_path):
+    out_dir = tmp_path / "out"
+    main(["export", sample_file, "--types", "ATT,GPS", "--format", "csv", "--output-dir", str(out_dir)])
+    assert sorted(p.name for p in out_dir.iterdir()) == ["ATT.csv", "GPS.csv"]
+    lines = (out_dir / "GPS.csv").read_text().splitlines()
+    assert lines[0] == "TimeUS,Lat,Lng"
+    assert len(lines) == 3
+
+
+# -------------------------
+# Test stats and index
+# -------------------------
+def test_stats(sample_file, capsys):
+    main(["stats", sample_file, "--format", "csv"])
+    lines = capsys.readouterr().out.splitlines()
+    assert "ATT,10,0,900" in lines
+    assert "GPS,2,0,500" in lines
+
+
+def test_index(sample_file, capsys):
+    main(["index", sample_file, "--types", "GPS", "--format", "tsv"])
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0] == "offset\ttype\tlength"
+    assert lines[1] == f"{3 * 89 + 15}\tGPS\t19"
+    assert len(lines) == 3
+
+
+# -------------------------
+# Test compress
+# -------------------------
+def test_compress_then_dump(sample_file, capsys):
+    assert main(["compress", sample_file, "--block-size", "256"]) == 0
+    capsys.readouterr()
+    assert main(["dump", sample_file + ".gz", "--mode", "threads", "--types", "GPS"]) == 0
+    rows = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [row["TimeUS"] for row in rows] == [0, 500]
+
+
+# -------------------------
+# Test limits
+# -------------------------
+def test_deadline_exits_partial(sample_file, capsys):
+    assert main(["dump", sample_file, "--mode", "threads", "--chunk-size", "256", "--timeout", "0"]) == 3
+    captured = capsys.readouterr()
+    assert "deadline" in captured.err
+    assert 0 < len(captured.out.splitlines()) < 15
+
+
+# -------------------------
+# Test merge
+# -------------------------
+def test_merge_two_logs(sample_file, tmp_path, capsys):
+    other = tmp_path / "other.bin"
+    other.write_bytes(open(sample_file, "rb").read())
+    args = ["merge", sample_file, str(other), "--types", "GPS", "--offset", "other.bin=50", "--format", "csv"]
+    assert main([*args, "--columns", "TimeUS"]) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert lines == [
+        "source,mavpackettype,TimeUS",
+        "test_log.bin,GPS,0",
+        "other.bin,GPS,50",
+        "test_log.bin,GPS,500",
+        "other.bin,GPS,550",
+    ]
@@ -0,0 +1,96 @@
+import pytest
+from array import array
+from src.business_logic.compact import CompactColumns, StringPool, compact_buffers
+from src.business_logic.mav_parser_chunked import MAVParserChunked
+from src.business_logic.mav_parser_linear import MAVParserLinear
+from src.business_logic.mav_parser_process import MAVParserProcess
+from src.business_logic.mav_parser_threads import MAVParserThreads
+from tests.helpers import FMT_FMT, fmt_message, record
+
+
+# -------------------------
+# Fixtures
+# -------------------------
+@pytest.fixture
+def sample_file(tmp_path):
+    """Scaled GPS, float IMU, string MSG, a byte-blob Data column and a 32-item array column."""
+    path = tmp_path / "test_log.bin"
+    with open(path, "wb") as f:
+        f.write(FMT_FMT)
+        f.write(fmt_message(11, 22, b"GPS", b"QLLcB", b"TimeUS,Lat,Lng,Alt,NSats"))
+        f.write(fmt_message(12, 19, b"IMU", b"Qff", b"TimeUS,AccX,Roll"))
+        f.write(fmt_message(13, 75, b"MSG", b"QZ", b"TimeUS,Message"))
+        f.write(fmt_message(14, 27, b"BLOB", b"QN", b"TimeUS,Data"))
+        f.write(fmt_message(15, 75, b"ISBD", b"Qa", b"TimeUS,Samples"))
+        for i in range(2000):
+            f.write(record(12, "<Qff", i * 100, 0.1 * i, 1.25))
+            if i % 10 == 0:
+                f.write(record(11, "<QiihB", i * 100, 320000000 + i, 350000000, 1234, 9))
+            if i % 100 == 0:
+                f.write(record(13, "<Q64s", i * 100, b"ARMED" if i % 200 else b"Mode"))
+                f.write(record(14, "<Q16s", i * 100, b"\x01\x02"))
+                f.write(record(15, "<Q32h", i * 100, *range(32)))
+    return str(path)
+
+
+def expected_by_type(path):
+    with MAVParserLinear(path) as parser:
+        messages = parser.parse_all()
+    by_type = {}
+    for msg in messages:
+        by_type.setdefault(msg["mavpackettype"], []).append(msg)
+    return by_type
+
+
+# -------------------------
+# Test the building blocks
+# -------------------------
+def test_string_pool_interns():
+    pool = StringPool()
+    codes = pool.encode([b"ARMED\x00\x00", b"Mode", b"ARMED\x00"])
+    assert codes.typecode == "I" and codes[0] == codes[2] != codes[1]
+    assert sorted(pool.values) == ["ARMED", "Mode"]
+    assert pool.remap(["Mode", "new"]) == [pool.values.index("Mode"), 2]
+
+
+def test_typecodes_follow_format(sample_file):
+    with MAVParserLinear(sample_file) as parser:
+        columns = parser.to_arrays()
+    gps, imu = columns["GPS"], columns["IMU"]
+    assert gps["TimeUS"].typecode == "Q" and gps["NSats"].typecode == "B"
+    assert gps["Lat"].typecode == "d" and gps["Alt"].typecode == "d"
+    assert imu["AccX"].typecode == "f"
+    assert columns["ISBD"]["Samples"].typecode == "h" and columns.count("ISBD") == 20
+    assert memoryview(imu["AccX"]).nbytes == 4 * columns.count("IMU")
+    assert columns.nbytes < 200_000
+
+
+# -------------------------
+# Test the parsers
+# -------------------------
+@pytest.mark.parametrize(
+    "make",
+    [
+        lambda path: MAVParserLinear(path).to_arrays(),
+        lambda path: MAVParserThreads(path, workers=2, chunk_size=8192).to_arrays(),
+        lambda path: MAVParserProcess(path, workers=2, chunk_size=8192).to_arrays(),
+        lambda path: MAVParserChunked(path, workers=2, chunk_size=8192, backend="interpreters").to_arrays(),
+    ],
+)
+def test_rows_match_messages(sample_file, make):
+    columns = make(sample_file)
+    expected = expected_by_type(sample_file)
+    assert sorted(columns) == sorted(expected)
+    for name in columns:
+        assert list(columns.rows(name)) == expected[name]
+    assert {"ARMED", "Mode", b"\x01\x02" + bytes(14)} <= set(columns.strings)
+    assert len(set(columns.strings)) == len(columns.strings)
+
+
+def test_merge_recodes_strings():
+    fmts = {13: {"Name": "MSG", "Processors": [("numeric", "TimeUS", (1, False)), ("string", "Message", 0)]}}
+    first = compact_buffers({"MSG": {"TimeUS": array("Q", [1]), "Message": [b"a"]}}, fmts)
+    second = compact_buffers({"MSG": {"TimeUS": array("Q", [2, 3]), "Message": [b"b", b"a"]}}, fmts)
+    merged = CompactColumns.merge([first, second], fmts)
+    assert merged.column("MSG", "Message") == ["a", "b", "a"]
+    assert merged.strings == ["a", "b"]
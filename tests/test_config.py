@@ -0,0 +1,101 @@
+import pytest
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import src.utils.config as config
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+# -------------------------
+# Fixtures
+# -------------------------
+@pytest.fixture
+def restore_config(monkeypatch):
+    """Start from packaged defaults and reset cached values afterwards."""
+    monkeypatch.delenv(config.CONFIG_ENV_VAR, raising=False)
+    config.load_config()
+    yield
+    monkeypatch.delenv(config.CONFIG_ENV_VAR, raising=False)
+    config.load_config()
+
+
+# -------------------------
+# Test defaults and overrides
+# -------------------------
+def test_binary_defaults(restore_config):
+    assert config.HEADER == b"\xa3\x95"
+    assert config.FMT_LENGTH == 89
+    assert "Lat" in config.ROUNDING
+    assert config.STRUCT_CACHE["Q"].size == 8
+
+
+def test_override_from_path(restore_config, tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"FILE_PATH": "flight.bin", "BINARY_FORMAT": {"FIELD_SCALERS": {"Lat": 1}}}))
+    config.load_config(str(path))
+    assert config.FILE_PATH == "flight.bin"
+    assert config.FIELD_SCALERS == {"Lat": 1}
+    assert config.FORMAT_SCALERS["c"] == 0.01
+    assert config.LOGGER_SETTINGS["LOG_LEVEL"] == "INFO"
+
+
+def test_override_from_env(restore_config, tmp_path, monkeypatch):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"LOGGER_SETTINGS": {"LOG_LEVEL": "DEBUG"}}))
+    monkeypatch.setenv(config.CONFIG_ENV_VAR, str(path))
+    config.load_config()
+    assert config.LOGGER_SETTINGS["LOG_LEVEL"] == "DEBUG"
+    assert config.CONFIG_PATH == str(path)
+
+
+def test_load_without_path_restores_env(restore_config, tmp_path, monkeypatch):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"BINARY_FORMAT": {"FMT_LENGTH": 90}}))
+    config.load_config(str(path))
+    assert os.environ[config.CONFIG_ENV_VAR] == str(path) and config.FMT_LENGTH == 90
+    config.load_config()
+    assert config.CONFIG_ENV_VAR not in os.environ and config.FMT_LENGTH == 89
+
+    outer = tmp_path / "outer.json"
+    outer.write_text("{}")
+    monkeypatch.setenv(config.CONFIG_ENV_VAR, str(outer))
+    config.load_config(str(path))
+    config.load_config()
+    assert os.environ[config.CONFIG_ENV_VAR] == str(outer)
+
+
+def test_binary_tables_follow_repo_config(restore_config, monkeypatch, tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"BINARY_FORMAT": {"ROUNDING": ["Alt"]}}))
+    monkeypatch.setattr(config, "REPO_CONFIG_PATH", path)
+    config.load_config()
+    assert config.CONFIG_PATH == str(path)
+    assert config.ROUNDING == frozenset({"Alt"})
+
+
+def test_unknown_attribute():
+    with pytest.raises(AttributeError):
+        config.NOT_A_SETTING
+
+
+# -------------------------
+# Test import side effects
+# -------------------------
+def test_import_is_side_effect_free(tmp_path):
+    code = (
+        "import sys\n"
+        "import src.business_logic.mav_parser_linear, src.business_logic.mav_parser_threads\n"
+        "import src.business_logic.mav_parser_process, src.utils.logger\n"
+        "import src.utils.config as config\n"
+        "assert config._settings is None\n"
+        "assert 'pymavlink' not in sys.modules and 'pandas' not in sys.modules\n"
+    )
+    env = {key: value for key, value in os.environ.items() if key != config.CONFIG_ENV_VAR}
+    env["PYTHONPATH"] = str(REPO_ROOT)
+    result = subprocess.run([sys.executable, "-c", code], cwd=tmp_path, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert list(tmp_path.iterdir()) == []
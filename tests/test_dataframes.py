@@ -0,0 +1,98 @@
+import pytest
+from src.business_logic.mav_parser_linear import MAVParserLinear
+from src.business_logic.mav_parser_process import MAVParserProcess
+from src.business_logic.mav_parser_threads import MAVParserThreads
+from tests.helpers import FMT_FMT, fmt_message, record
+
+pd = pytest.importorskip("pandas")
+
+
+# -------------------------
+# Fixtures
+# -------------------------
+@pytest.fixture
+def sample_file(tmp_path):
+    """A log with a scaled GPS type and a string MSG type."""
+    path = tmp_path / "test_log.bin"
+    with open(path, "wb") as f:
+        f.write(FMT_FMT)
+        f.write(fmt_message(11, 22, b"GPS", b"QLLcB", b"TimeUS,Lat,Lng,Alt,NSats"))
+        f.write(fmt_message(12, 75, b"MSG", b"QZ", b"TimeUS,Message"))
+        for i in range(50):
+            f.write(record(11, "<QiihB", i * 1000, 320000000 + i, 350000000, 1234, 9))
+            if i % 10 == 0:
+                f.write(record(12, "<Q64s", i * 1000, b"ARMED" if i else b"BOOT"))
+    return str(path)
+
+
+def check_frames(frames):
+    assert {"FMT", "GPS", "MSG"} <= set(frames)
+    gps = frames["GPS"]
+    assert len(gps) == 50
+    assert str(gps["TimeUS"].dtype) == "uint64"
+    assert str(gps["NSats"].dtype) == "uint8"
+    assert str(gps["Lat"].dtype) == "float64"
+    assert gps["Lat"].iloc[1] == pytest.approx(32.0000001)
+    assert gps["Alt"].iloc[0] == pytest.approx(12.34)
+    msg = frames["MSG"]
+    assert isinstance(msg["Message"].dtype, pd.CategoricalDtype)
+    assert list(msg["Message"]) == ["BOOT", "ARMED", "ARMED", "ARMED", "ARMED"]
+
+
+# -------------------------
+# Test to_dataframes
+# -------------------------
+def test_linear_to_dataframes(sample_file):
+    with MAVParserLinear(sample_file) as parser:
+        check_frames(parser.to_dataframes())
+
+
+def test_threads_to_dataframes(sample_file):
+    check_frames(MAVParserThreads(sample_file).to_dataframes())
+
+
+def test_process_to_dataframes(sample_file):
+    check_frames(MAVParserProcess(sample_file).to_dataframes())
+
+
+def test_to_dataframes_matches_dict_route(sample_file):
+    with MAVParserLinear(sample_file) as parser:
+        frames = parser.to_dataframes()
+    parser = MAVParserProcess(sample_file, type_filter=["GPS"])
+    parser.run()
+    expected = pd.DataFrame(parser.messages).drop(columns="mavpackettype")
+    pd.testing.assert_frame_equal(frames["GPS"], expected, check_dtype=False)
+
+
+def test_unscaled_rounded_floats_match_parse_all(tmp_path):
+    path = tmp_path / "att.bin"
+    with open(path, "wb") as f:
+        f.write(FMT_FMT + fmt_message(10, 19, b"ATT", b"Qff", b"TimeUS,Roll,Pitch"))
+        for i in range(100):
+            f.write(record(10, "<Qff", i * 1000, 0.1 * i + 1e-9, -1.0 / (i + 3)))
+    with MAVParserLinear(str(path)) as parser:
+        frames = parser.to_dataframes()
+    with MAVParserLinear(str(path)) as parser:
+        expected = pd.DataFrame(msg for msg in parser.parse_all() if msg["mavpackettype"] == "ATT")
+    expected = expected.drop(columns="mavpackettype")
+    pd.testing.assert_frame_equal(frames["ATT"], expected, check_dtype=False, check_exact=True)
+
+
+@pytest.mark.parametrize("rounding", [True, False])
+def test_scaled_floats_match_parse_all(tmp_path, rounding):
+    path = tmp_path / "gps.bin"
+    with open(path, "wb") as f:
+        f.write(FMT_FMT + fmt_message(10, 15, b"GPS", b"Qf", b"TimeUS,HDop"))
+        for i in range(100):
+            f.write(record(10, "<Qf", i * 1000, 123.456 + i / 7))
+    with MAVParserLinear(str(path), rounding=rounding) as parser:
+        frames = parser.to_dataframes()
+    with MAVParserLinear(str(path), rounding=rounding) as parser:
+        expected = [msg["HDop"] for msg in parser.parse_all() if msg["mavpackettype"] == "GPS"]
+    assert str(frames["GPS"]["HDop"].dtype) == "float64"
+    assert frames["GPS"]["HDop"].tolist() == expected
+
+
+def test_categories_in_first_appearance_order(sample_file):
+    with MAVParserLinear(sample_file) as parser:
+        assert list(parser.to_dataframes()["MSG"]["Message"].cat.categories) == ["BOOT", "ARMED"]
@@ -0,0 +1,141 @@
+import pytest
+import math
+from src.business_logic.derived import Rolling, merge_parts, derive_part
+from src.business_logic.mav_parser_chunked import MAVParserChunked
+from src.business_logic.mav_parser_linear import MAVParserLinear
+from src.business_logic.mav_parser_process import MAVParserProcess
+from src.business_logic.mav_parser_threads import MAVParserThreads
+from tests.helpers import FMT_FMT, fmt_message, record
+
+
+# -------------------------
+# Fixtures
+# -------------------------
+def accel(i: int) -> float:
+    return math.sin(i / 7) * 3 + (i % 5)
+
+
+@pytest.fixture
+def sample_file(tmp_path):
+    """IMU at 1 kHz with an irregular gap, BAT at 10 Hz."""
+    path = tmp_path / "test_log.bin"
+    with open(path, "wb") as f:
+        f.write(FMT_FMT)
+        f.write(fmt_message(10, 23, b"IMU", b"Qfff", b"TimeUS,AccX,AccY,AccZ"))
+        f.write(fmt_message(11, 19, b"BAT", b"Qff", b"TimeUS,Volt,Curr"))
+        for i in range(3000):
+            t = i * 1000 + (500_000 if i >= 1500 else 0)
+            f.write(record(10, "<Qfff", t, accel(i), 0.5, -9.75))
+            if i % 100 == 0:
+                f.write(record(11, "<Qff", t, 12.5, 4.0))
+    return str(path)
+
+
+def brute_force(times, values, window, stat):
+    out = []
+    for t in times:
+        inside = [(s, v) for s, v in zip(times, values) if t - window < s <= t]
+        vs = [v for _, v in inside]
+        if stat == "mean":
+            out.append(sum(vs) / len(vs))
+        elif stat == "rms":
+            out.append(math.sqrt(sum(v * v for v in vs) / len(vs)))
+        elif stat == "max":
+            out.append(max(vs))
+        else:
+            out.append(sum((b[1] + a[1]) * (b[0] - a[0]) * 0.5e-6 for a, b in zip(inside, inside[1:])))
+    return out
+
+
+class Count:
+    """A custom statistic, resolved by module path."""
+
+    def __init__(self):
+        self.n = 0
+
+    def add(self, t, v):
+        self.n += 1
+
+    def remove(self, t, v):
+        self.n -= 1
+
+    def value(self):
+        return self.n
+
+
+# -------------------------
+# Test the windows
+# -------------------------
+@pytest.mark.parametrize("stat", ["mean", "rms", "max", "integral"])
+def test_split_matches_brute_force(stat):
+    times = [i * 10 + (i // 7) * 3 for i in range(200)]
+    values = [accel(i) for i in range(200)]
+    transform = Rolling("x", "IMU", "AccX", 95, stat)
+    expected = brute_force(times, values, 95, stat)
+    for cuts in ([], [50], [3, 4, 5, 120, 121]):
+        bounds = [0, *cuts, len(times)]
+        parts = [
+            derive_part({"TimeUS": times[a:b], "AccX": values[a:b]}, transform) for a, b in zip(bounds, bounds[1:])
+        ]
+        merged = merge_parts(parts, transform)
+        assert merged["TimeUS"] == times
+        assert merged["x"] == pytest.approx(expected, abs=1e-9)
+
+
+def test_running_integral_and_every():
+    times = list(range(0, 10_000_000, 100_000))
+    transform = Rolling("e", "BAT", "Volt", None, "integral", every=1_000_000)
+    parts = [derive_part({"TimeUS": times[a : a + 17], "Volt": [2.0] * 17}, transform) for a in range(0, 100, 17)]
+    merged = merge_parts(parts, transform)
+    assert merged["TimeUS"] == list(range(0, 10_000_000, 1_000_000))
+    assert merged["e"] == pytest.approx([2.0 * s for s in range(10)])
+
+
+def test_invalid_transforms(sample_file):
+    with pytest.raises(ValueError):
+        Rolling("x", "IMU", "AccX", None, "mean")
+    with pytest.raises(ValueError):
+        Rolling("x", "IMU", "AccX", 1000, "median")
+    with pytest.raises(ValueError), MAVParserLinear(sample_file) as parser:
+        parser.derive([Rolling("x", "IMU", "AccX", 10), Rolling("x", "BAT", "Volt", 10)])
+
+
+# -------------------------
+# Test the parsers
+# -------------------------
+TRANSFORMS = [
+    Rolling("vibe", "IMU", ("AccX", "AccY", "AccZ"), 200_000, "rms", combine="norm"),
+    Rolling("acc_max", "IMU", "AccX", 50_000, "max", every=10_000),
+    Rolling("energy", "BAT", ("Volt", "Curr"), None, "integral"),
+    Rolling("count", "IMU", "AccX", 100_000, "test_derived:Count"),
+]
+
+
+@pytest.mark.parametrize(
+    "make",
+    [
+        lambda path: MAVParserThreads(path, workers=2, chunk_size=7000),
+        lambda path: MAVParserProcess(path, workers=2, chunk_size=20000),
+        lambda path: MAVParserChunked(path, workers=2, chunk_size=7000, backend="serial"),
+    ],
+)
+def test_parallel_matches_linear(sample_file, make):
+    with MAVParserLinear(sample_file) as parser:
+        expected = parser.derive(TRANSFORMS)
+    parser = make(sample_file)
+    derived = parser.derive(TRANSFORMS)
+    assert len(parser.chunks) > 3
+    for name, table in expected.items():
+        assert derived[name]["TimeUS"] == table["TimeUS"]
+        assert derived[name][name] == pytest.approx(table[name], rel=1e-9)
+
+
+def test_linear_values(sample_file):
+    with MAVParserLinear(sample_file) as parser:
+        derived = parser.derive(TRANSFORMS)
+    assert len(derived["vibe"]["TimeUS"]) == 3000
+    assert derived["count"]["count"][:3] == [1, 2, 3] and max(derived["count"]["count"]) == 100
+    # the gap empties the window: the first sample after it stands alone
+    assert derived["count"]["count"][1500] == 1
+    # 50 W from 0 to 3.4 s (the 0.5 s gap is bridged by the trapezoid)
+    assert derived["energy"]["energy"][-1] == pytest.approx(50.0 * 3.4)
@@ -0,0 +1,103 @@
+import os
+import pytest
+from src.business_logic.exporters import copy_into, write_exports
+from src.business_logic.mav_parser_chunked import MAVParserChunked
+from src.business_logic.mav_parser_process import MAVParserProcess
+from src.business_logic.mav_parser_threads import MAVParserThreads
+from src.cli import main
+from tests.helpers import FMT_FMT, fmt_message, record
+
+
+# -------------------------
+# Fixtures
+# -------------------------
+@pytest.fixture
+def sample_file(tmp_path):
+    path = tmp_path / "test_log.bin"
+    with open(path, "wb") as f:
+        f.write(FMT_FMT)
+        f.write(fmt_message(10, 15, b"ATT", b"Qf", b"TimeUS,Roll"))
+        f.write(fmt_message(11, 19, b"GPS", b"QLL", b"TimeUS,Lat,Lng"))
+        f.write(fmt_message(12, 75, b"MSG", b"QZ", b"TimeUS,Message"))
+        for i in range(2000):
+            f.write(record(10, "<Qf", i * 100, 0.25 * i))
+            if i % 10 == 0:
+                f.write(record(11, "<Qii", i * 100, 320000000 + i, 350000000))
+            if i % 500 == 0:
+                f.write(record(12, "<Q64s", i * 100, b'say "hi", then land'))
+    return str(path)
+
+
+def read_dir(path):
+    return {name: open(os.path.join(path, name), "rb").read() for name in sorted(os.listdir(path))}
+
+
+# -------------------------
+# Test the exporters
+# -------------------------
+@pytest.mark.parametrize("fmt", ["csv", "tsv", "jsonl"])
+@pytest.mark.parametrize("columns", [None, ["TimeUS", "Lat", "Message"]])
+@pytest.mark.parametrize("cls", [MAVParserThreads, MAVParserProcess])
+def test_export_matches_linear(sample_file, tmp_path, fmt, columns, cls):
+    expected = tmp_path / "linear"
+    args = ["export", sample_file, "--format", fmt, "--output-dir", str(expected)]
+    assert main(args + (["--columns", ",".join(columns)] if columns else [])) == 0
+
+    parser = cls(sample_file, workers=3, chunk_size=4000)
+    outputs = parser.export(str(tmp_path / "parallel"), fmt, columns)
+    assert len(parser.chunks) > 3
+    assert read_dir(tmp_path / "parallel") == read_dir(expected)
+    assert sorted(outputs) == (["ATT", "FMT", "GPS", "MSG"] if columns is None else ["ATT", "GPS", "MSG"])
+
+
+@pytest.mark.parametrize("fmt", ["csv", "jsonl"])
+def test_single_file_matches_dump(sample_file, tmp_path, capsys, fmt):
+    main(["dump", sample_file, "--format", fmt, "--types", "GPS,MSG", "--columns", "TimeUS,Message"])
+    expected = capsys.readouterr().out.encode()
+    output = tmp_path / "sub" / f"all.{fmt}"
+    args = ["dump", sample_file, "--format", fmt, "--mode", "process", "--workers", "2", "--chunk-size", "5000"]
+    assert main(args + ["--types", "GPS,MSG", "--columns", "TimeUS,Message", "-o", str(output)]) == 0
+    assert output.read_bytes() == expected
+    # the part files are gone with their directory
+    assert os.listdir(tmp_path / "sub") == [f"all.{fmt}"]
+
+
+def test_empty_export(sample_file, tmp_path):
+    parser = MAVParserChunked(sample_file, type_filter=["BARO"], workers=2)
+    assert parser.export(str(tmp_path / "out"), "csv") == {}
+    assert os.listdir(tmp_path / "out") == []
+    parser.export(str(tmp_path / "all.csv"), "csv", ["TimeUS"], by_type=False)
+    assert (tmp_path / "all.csv").read_text() == "mavpackettype,TimeUS\n"
+    with pytest.raises(ValueError):
+        parser.export(str(tmp_path / "out"), "xlsx")
+
+
+# -------------------------
+# Test the concatenation
+# -------------------------
+@pytest.mark.parametrize("missing", [(), ("copy_file_range",), ("copy_file_range", "sendfile")])
+def test_copy_fallbacks(tmp_path, monkeypatch, missing):
+    def unsupported(*args):
+        raise OSError(38, "Function not implemented")
+
+    for name in missing:
+        monkeypatch.setattr(os, name, unsupported)
+    parts = []
+    for index in range(3):
+        path = tmp_path / f"{index}.part"
+        path.write_bytes(b"%d,x\n" % index * (index + 1))
+        parts.append({"A": (["n", "s"], str(path))})
+    outputs = write_exports(parts, str(tmp_path), "csv")
+    assert outputs == {"A": str(tmp_path / "A.csv")}
+    assert (tmp_path / "A.csv").read_bytes() == b"n,s\n0,x\n1,x\n1,x\n2,x\n2,x\n2,x\n"
+    assert sorted(os.listdir(tmp_path)) == ["A.csv"]
+
+
+def test_copy_into_appends(tmp_path):
+    src, dst = tmp_path / "src", tmp_path / "dst"
+    src.write_bytes(b"payload" * 1000)
+    with open(dst, "wb") as out, open(src, "rb") as f:
+        out.write(b"head\n")
+        out.flush()
+        copy_into(f.fileno(), out.fileno(), 7000)
+    assert dst.read_bytes() == b"head\n" + b"payload" * 1000
@@ -0,0 +1,106 @@
+import pytest
+from src.business_logic import limits
+from src.business_logic.mav_parser_chunked import MAVParserChunked
+from src.business_logic.mav_parser_process import MAVParserProcess
+from src.business_logic.mav_parser_threads import MAVParserThreads
+from tests.helpers import att_gps_log
+
+TOTAL = 12003
+
+
+# -------------------------
+# Fixtures
+# -------------------------
+@pytest.fixture
+def sample_file(tmp_path):
+    return att_gps_log(tmp_path / "test_log.bin", 10000)
+
+
+# -------------------------
+# Test building blocks
+# -------------------------
+def test_cancel_token_callbacks():
+    token = limits.CancelToken()
+    seen = []
+    unsubscribe = token.on_cancel(seen.append)
+    token.on_cancel(lambda reason: seen.append("second"))
+    unsubscribe()
+    token.cancel()
+    token.cancel("again")
+    assert token.cancelled and token.reason == limits.CANCELLED
+    assert seen == ["second"]
+
+    token.on_cancel(seen.append)
+    assert seen == ["second", limits.CANCELLED]
+
+
+def test_estimate_nbytes():
+    messages = [{"mavpackettype": "ATT", "TimeUS": i, "Roll": 1.5} for i in range(100)]
+    one = limits.message_size(messages[0])
+    assert 100 * one <= limits.estimate_nbytes(messages) < 100 * one + 2000
+    assert limits.estimate_nbytes([]) == 0
+    assert limits.estimate_nbytes({"ATT": {"TimeUS": list(range(100))}}) > 0
+
+
+def test_memory_budget_counts_in_flight_and_retained():
+    store = {}
+    with limits.RunLimits(store, max_memory=1000) as run:
+        worker = limits.ChunkLimits(1, *run.worker_args())
+        assert worker.check(600) is None
+        assert run.chunk_done(0, 300) is None
+        assert worker.check(800) == limits.MEMORY
+    assert store[limits.REASON_KEY] == limits.MEMORY
+
+
+def test_deadline_without_shared_store():
+    run = limits.RunLimits({}, timeout=-1)
+    assert limits.ChunkLimits(0, *run.worker_args(shared=False)).check(0) == limits.DEADLINE
+    assert run.check() == limits.DEADLINE
+
+
+# -------------------------
+# Test parser runs
+# -------------------------
+@pytest.mark.parametrize("parser_cls", [MAVParserThreads, MAVParserProcess])
+def test_unlimited_run_completes(sample_file, parser_cls):
+    parser = parser_cls(sample_file, workers=2, chunk_size=16384, timeout=60, max_memory=1 << 30)
+    parser.run()
+    assert parser.stopped is None
+    assert parser.message_count == TOTAL
+
+
+@pytest.mark.parametrize("parser_cls", [MAVParserThreads, MAVParserProcess])
+@pytest.mark.parametrize(
+    "kwargs, reason",
+    [({"max_memory": 1}, limits.MEMORY), ({"timeout": 0}, limits.DEADLINE), ({"cancel": "token"}, limits.CANCELLED)],
+)
+def test_limits_stop_with_partial_results(sample_file, parser_cls, kwargs, reason):
+    if "cancel" in kwargs:
+        kwargs = {"cancel": limits.CancelToken()}
+        kwargs["cancel"].cancel()
+    parser = parser_cls(sample_file, workers=2, chunk_size=16384, **kwargs)
+    parser.run()
+    assert len(parser.chunks) > 2
+    assert parser.stopped == reason
+    assert 0 < parser.message_count < TOTAL
+    full = parser_cls(sample_file, workers=2, chunk_size=16384)
+    full.run()
+    # the bulk decoder stops between message types, so a partial chunk is not a prefix
+    assert {tuple(m.items()) for m in parser.messages} <= {tuple(m.items()) for m in full.messages}
+
+
+def test_worker_stops_inside_chunk(sample_file):
+    parser = MAVParserChunked(sample_file, workers=1, max_memory=100_000)
+    parser.run()
+    assert len(parser.chunks) == 1
+    assert parser.stopped == limits.MEMORY
+    assert parser.message_count == 4096
+
+
+def test_stopped_stream_and_summary(sample_file):
+    parser = MAVParserThreads(sample_file, workers=2, chunk_size=16384, timeout=0)
+    assert 0 < len(list(parser.iter_messages())) < TOTAL
+    assert parser.stopped == limits.DEADLINE
+    summary = parser.summarize()
+    assert parser.stopped == limits.DEADLINE
+    assert sum(entry["count"] for entry in summary["types"].values()) < TOTAL
@@ -0,0 +1,135 @@
+import pytest
+import json
+import logging
+import os
+import struct
+import sys
+
+import src.utils.logger as app_logging
+from src.utils.logger import AppLogger, DecodeErrorReporter, enable_queue_logging, disable_queue_logging, get_logger
+from src.business_logic.mav_parser_process import MAVParserProcess, HEADER, FMT_HEADER
+from src.cli import main
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+# -------------------------
+# Fixtures
+# -------------------------
+@pytest.fixture
+def app_logger(tmp_path, monkeypatch):
+    """App logger writing its file into tmp_path, with a capturing handler attached."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(app_logging, "_logger", None)
+    logger = get_logger()
+    handler = ListHandler()
+    logger.addHandler(handler)
+    yield logger, handler
+    disable_queue_logging()
+    for h in list(logger.handlers):
+        logger.removeHandler(h)
+        h.close()
+
+
+@pytest.fixture
+def broken_file(tmp_path):
+    """A log whose TEST messages are shorter than their struct format."""
+    path = tmp_path / "broken.bin"
+    with open(path, "wb") as f:
+        f.write(FMT_HEADER + struct.pack("<BB4s16s64s", 1, 7, b"TEST", b"ZZ", b"A,B"))
+        for _ in range(3):
+            f.write(bytes(HEADER) + bytes([1]) + bytes(4))
+    return str(path)
+
+
+@pytest.fixture
+def corrupt_file(tmp_path):
+    """Valid ATT messages, then trailing TEST records that are shorter than their format."""
+    path = tmp_path / "corrupt.bin"
+    with open(path, "wb") as f:
+        f.write(FMT_HEADER + struct.pack("<BB4s16s64s", 1, 7, b"TEST", b"ZZ", b"A,B"))
+        f.write(FMT_HEADER + struct.pack("<BB4s16s64s", 2, 15, b"ATT", b"Qf", b"TimeUS,Roll"))
+        for i in range(200):
+            f.write(bytes(HEADER) + bytes([2]) + struct.pack("<Qf", i, 1.5))
+        for _ in range(3):
+            f.write(bytes(HEADER) + bytes([1]) + bytes(4))
+    return str(path)
+
+
+# -------------------------
+# Test DecodeErrorReporter
+# -------------------------
+def test_reporter_aggregates_and_rate_limits():
+    logger = logging.getLogger("test_reporter")
+    handler = ListHandler()
+    logger.addHandler(handler)
+    reporter = DecodeErrorReporter(max_per_second=2, logger=logger)
+
+    reporter.report(3, {"IMU": 10, "GPS": 1})
+    reporter.report(4, {"IMU": 5})
+    assert handler.messages == ["10 decode errors of type IMU in chunk 3", "1 decode errors of type GPS in chunk 3"]
+    assert reporter.suppressed == 1
+
+    reporter._allowance = 2
+    reporter.report(5, {"ATT": 2})
+    assert handler.messages[-1] == "2 decode errors of type ATT in chunk 5 (1 more summaries suppressed)"
+
+
+# -------------------------
+# Test queue logging
+# -------------------------
+def test_queue_logging_writes_through_listener(app_logger):
+    logger, handler = app_logger
+    enable_queue_logging()
+    assert not any(isinstance(h, ListHandler) for h in logger.handlers)
+    logger.warning("queued record")
+    disable_queue_logging()
+    assert handler.messages == ["queued record"]
+    assert handler in logger.handlers
+
+
+def test_process_chunk_reports_errors(app_logger, broken_file):
+    logger, handler = app_logger
+    parser = MAVParserProcess(broken_file)
+    parser._scan_fmts()
+    index, messages = MAVParserProcess._process_chunk((2, broken_file, (0, 110), parser.fmts, None, True))
+    assert messages == []
+    assert "3 decode errors of type TEST in chunk 2" in handler.messages
+
+
+@pytest.mark.parametrize("mode", ["threads", "process"])
+def test_cli_output_stays_clean(capsys, app_logger, corrupt_file, tmp_path, mode):
+    logger, handler = app_logger
+    assert main(["dump", corrupt_file, "--mode", mode, "--workers", "2", "--chunk-size", "1000"]) == 0
+    rows = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [row["TimeUS"] for row in rows if row["mavpackettype"] == "ATT"] == list(range(200))
+    assert {row["mavpackettype"] for row in rows} == {"ATT"}
+    # process workers log through the queue into the parent's handlers; nothing writes a log file
+    assert any("decode errors of type TEST" in message for message in handler.messages)
+    assert not logger.handlers or not any(isinstance(h, logging.handlers.QueueHandler) for h in logger.handlers)
+    assert os.listdir(tmp_path) == ["corrupt.bin"]
+
+
+def test_console_on_stderr_and_log_file_opened_on_first_record(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    logger = logging.getLogger("test_console_handler")
+    logger.propagate = False
+    app = AppLogger("test_console_handler")
+    assert app.console_handler.stream is sys.stderr
+    assert os.path.basename(app.file_handler.baseFilename) == "bin_reader.log"
+    assert os.listdir(tmp_path) == []
+    logger.handlers.clear()
+
+    app = AppLogger("test_console_handler", log_file=str(tmp_path / "run.log"))
+    logger.warning("to the file")
+    app.file_handler.close()
+    logger.handlers.clear()
+    assert "to the file" in (tmp_path / "run.log").read_text()
+    assert os.listdir(tmp_path) == ["run.log"]
@@ -0,0 +1,153 @@
+import pytest
+import struct
+from array import array
+from src.business_logic.backends import InterpreterBackend, ProcessBackend, _pack, _unpack, get_backend
+from src.business_logic.mav_core import (
+    FORMAT_CACHE,
+    FormatCache,
+    compile_fmt,
+    parse_message,
+    plan_chunks,
+    portable_fmts,
+    scan_fmts,
+)
+from src.business_logic.mav_parser_chunked import MAVParserChunked
+from src.business_logic.mav_parser_linear import MAVParserLinear, HEADER
+from src.business_logic.mav_parser_process import MAVParserProcess
+from src.business_logic.mav_parser_threads import MAVParserThreads
+from tests.helpers import FMT_FMT, fmt_message, record
+
+
+# -------------------------
+# Fixtures
+# -------------------------
+@pytest.fixture
+def sample_file(tmp_path):
+    """A log with a scaled GPS type, a string MSG type and a byte-blob Data column."""
+    path = tmp_path / "test_log.bin"
+    with open(path, "wb") as f:
+        f.write(FMT_FMT)
+        f.write(fmt_message(11, 22, b"GPS", b"QLLcB", b"TimeUS,Lat,Lng,Alt,NSats"))
+        f.write(fmt_message(12, 75, b"MSG", b"QZ", b"TimeUS,Message"))
+        f.write(fmt_message(13, 27, b"BLOB", b"QN", b"TimeUS,Data"))
+        for i in range(200):
+            f.write(record(11, "<QiihB", i * 1000, 320000000 + i, 350000000, 1234, 9))
+            if i % 10 == 0:
+                f.write(record(12, "<Q64s", i * 1000, b"ARMED"))
+                f.write(record(13, "<Q16s", i * 1000, b"\x01\x02"))
+    return str(path)
+
+
+# -------------------------
+# Test the shared core
+# -------------------------
+def test_compile_fmt(sample_file):
+    with open(sample_file, "rb") as f:
+        data = f.read()
+    fmt_type, info = compile_fmt(data, 89)
+    assert fmt_type == 11
+    assert info["Name"] == "GPS"
+    assert info["StructSize"] == 19
+    assert ("numeric", "Lat", (1e-7, True)) in info["Processors"]
+    assert compile_fmt(bytes(89)) is None
+
+
+def test_format_cache(sample_file):
+    with open(sample_file, "rb") as f:
+        data = f.read()
+    cache = FormatCache(maxsize=2)
+    records = [data[i * 89 : (i + 1) * 89] for i in range(4)]
+    first = cache.compile(records[1])
+    again = cache.compile(records[1])
+    assert again == first and again[1] is not first[1]
+    assert again[1]["CompiledStruct"] is first[1]["CompiledStruct"]
+    # callers replace keys of their copy without touching the cached entry
+    again[1]["Scaling"] = {}
+    assert cache.compile(records[1])[1]["Scaling"]["Lat"] == 1e-7
+    for record in records:
+        cache.compile(record)
+    assert len(cache) == 2 and cache.info()["hits"] == 3 and cache.info()["misses"] == 4
+
+    before = FORMAT_CACHE.info()["hits"]
+    for _ in range(2):
+        with MAVParserLinear(sample_file) as parser:
+            parser.parse_all()
+    assert FORMAT_CACHE.info()["hits"] >= before + 4
+
+
+def test_parse_message_without_compiled_struct():
+    fmt_info = {"Name": "TEST", "Format": "fZ", "Columns": ["A", "Name"], "CombinedFmt": "<f64s"}
+    message = parse_message(fmt_info, struct.pack("<f64s", 1.5, b"abc"), 0)
+    assert message == {"mavpackettype": "TEST", "A": 1.5, "Name": "abc"}
+    assert parse_message(fmt_info, b"\x00", 0) is None
+
+
+def test_parse_message_plan_matches_processors(sample_file):
+    with open(sample_file, "rb") as f:
+        data = f.read()
+    fmts = scan_fmts(data)
+    assert fmts[11]["Plan"] is not None
+    for msg_type, offset in ((11, 89 * 4), (12, 89 * 4 + 22), (13, 89 * 4 + 22 + 75)):
+        without_plan = {k: v for k, v in fmts[msg_type].items() if k != "Plan"}
+        message = parse_message(fmts[msg_type], data, offset + 3)
+        assert message is not None and message == parse_message(without_plan, data, offset + 3)
+
+
+def test_plan_chunks_cover_file(sample_file):
+    with open(sample_file, "rb") as f:
+        data = f.read()
+    fmts = scan_fmts(data)
+    chunks = plan_chunks(data, fmts, 7)
+    assert chunks[0][0] == 0 and chunks[-1][1] == len(data)
+    assert all(prev[1] == nxt[0] for prev, nxt in zip(chunks, chunks[1:]))
+    assert all(data[start : start + 2] == bytes(HEADER) for start, _ in chunks[1:])
+
+
+def test_portable_fmts_drops_structs(sample_file):
+    with open(sample_file, "rb") as f:
+        fmts = scan_fmts(f.read())
+    assert all("CompiledStruct" not in info for info in portable_fmts(fmts).values())
+    assert all("CompiledStruct" in info for info in fmts.values())
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        get_backend("gpu")
+
+
+def test_interpreters_backend_falls_back():
+    backend = get_backend("interpreters", 2)
+    expected = InterpreterBackend if InterpreterBackend.supported() else ProcessBackend
+    assert type(backend) is expected
+    assert backend.workers == 2
+
+
+def test_pack_roundtrip():
+    result = (3, {"GPS": {"Lat": array("i", [1, 2]), "Name": [b"a"]}})
+    unpacked = _unpack(_pack(result))
+    assert unpacked == result
+    assert unpacked[1]["GPS"]["Lat"].typecode == "i"
+
+
+# -------------------------
+# Test that every mode decodes identically
+# -------------------------
+@pytest.mark.parametrize(
+    "parser_cls, kwargs",
+    [
+        (MAVParserChunked, {}),
+        (MAVParserChunked, {"backend": "interpreters", "workers": 2}),
+        (MAVParserThreads, {}),
+        (MAVParserProcess, {}),
+    ],
+)
+def test_modes_agree_with_linear(sample_file, parser_cls, kwargs):
+    with MAVParserLinear(sample_file) as linear:
+        expected = [msg for msg in linear.parse_all() if msg["mavpackettype"] != "FMT"]
+
+    parser = parser_cls(sample_file, chunk_size=512, **kwargs)
+    parser.run()
+    assert len(parser.chunks) > 1
+    assert [msg for msg in parser.messages if msg["mavpackettype"] != "FMT"] == expected
+    blobs = [msg for msg in expected if msg["mavpackettype"] == "BLOB"]
+    assert blobs[-1]["Data"] == b"\x01\x02" + bytes(14)
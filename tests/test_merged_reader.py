@@ -0,0 +1,87 @@
+import pytest
+from src.business_logic.merged_reader import MergedReader, merge_messages, source_names
+from src.business_logic.mav_parser_threads import MAVParserThreads
+from tests.helpers import FMT_FMT, fmt_message, record
+
+
+# -------------------------
+# Fixtures
+# -------------------------
+def write_log(path, times):
+    with open(path, "wb") as f:
+        f.write(FMT_FMT)
+        f.write(fmt_message(10, 15, b"ATT", b"Qf", b"TimeUS,Roll"))
+        for t in times:
+            f.write(record(10, "<Qf", t, 1.5))
+    return str(path)
+
+
+@pytest.fixture
+def logs(tmp_path):
+    return [write_log(tmp_path / "a.bin", range(0, 1000, 10)), write_log(tmp_path / "b.bin", range(5, 1000, 20))]
+
+
+def att(*times):
+    return [{"mavpackettype": "ATT", "TimeUS": t} for t in times]
+
+
+# -------------------------
+# Test merge
+# -------------------------
+def test_merge_orders_and_tags():
+    merged = list(merge_messages({"a": att(0, 20, 40), "b": att(10, 20, 30)}))
+    order = [("a", 0), ("b", 10), ("a", 20), ("b", 20), ("b", 30), ("a", 40)]
+    assert [(m["source"], m["TimeUS"]) for m in merged] == order
+
+
+def test_merge_offsets_and_untimed_messages():
+    fmt = {"mavpackettype": "FMT", "Name": "ATT"}
+    merged = list(merge_messages({"a": [fmt, *att(0, 100)], "b": att(0, 100)}, offsets={"b": 50}))
+    order = [("a", None), ("a", 0), ("b", 50), ("a", 100), ("b", 150)]
+    assert [(m["source"], m.get("TimeUS")) for m in merged] == order
+
+    with pytest.raises(ValueError):
+        list(merge_messages({"a": att(0)}, offsets={"c": 1}))
+
+
+def test_merge_window_reorders_jitter():
+    merged = merge_messages({"a": att(0, 30, 10, 20, 40), "b": att(25)}, window=2)
+    assert [m["TimeUS"] for m in merged] == [0, 10, 20, 25, 30, 40]
+
+
+def test_merge_is_lazy():
+    consumed = []
+
+    def stream(name, times):
+        for msg in att(*times):
+            consumed.append(name)
+            yield msg
+
+    merged = merge_messages({"a": stream("a", range(0, 10**6, 2)), "b": stream("b", range(1, 10**6, 2))})
+    assert [next(merged)["TimeUS"] for _ in range(4)] == [0, 1, 2, 3]
+    assert len(consumed) <= 6
+
+
+def test_source_names():
+    assert source_names(["x/a.bin", "y/b.bin"]) == ["a.bin", "b.bin"]
+    assert source_names(["x/a.bin", "y/a.bin"]) == ["x/a.bin", "y/a.bin"]
+
+
+# -------------------------
+# Test reader
+# -------------------------
+def test_reader_merges_files(logs):
+    with MergedReader(logs, type_filter=["ATT"]) as reader:
+        merged = list(reader)
+    times = [m["TimeUS"] for m in merged]
+    assert times == sorted(times)
+    assert len(merged) == 100 + 50
+    assert {m["source"] for m in merged} == {"a.bin", "b.bin"}
+
+
+def test_reader_accepts_parsers(logs):
+    parallel = MAVParserThreads(logs[1], type_filter=["ATT"], workers=2, chunk_size=512)
+    with MergedReader({"a": logs[0], "b": parallel}, type_filter=["ATT"], offsets={"b": 1000}) as reader:
+        merged = list(reader)
+    assert [m["source"] for m in merged[-50:]] == ["b"] * 50
+    assert merged[-1]["TimeUS"] == 1985
@@ -0,0 +1,85 @@
+import pytest
+from src.business_logic.mav_parser_linear import MAVParserLinear, HEADER
+from src.business_logic.message_index import MessageIndex
+from src.business_logic.sources import compress_log
+from tests.helpers import FMT_FMT, fmt_message, record
+
+
+# -------------------------
+# Fixtures
+# -------------------------
+@pytest.fixture
+def sample_file(tmp_path):
+    """ATT and GPS messages with a header pattern inside a MSG payload and garbage between records."""
+    path = tmp_path / "test_log.bin"
+    with open(path, "wb") as f:
+        f.write(FMT_FMT)
+        f.write(fmt_message(10, 15, b"ATT", b"Qf", b"TimeUS,Roll"))
+        f.write(fmt_message(11, 19, b"GPS", b"QLL", b"TimeUS,Lat,Lng"))
+        f.write(fmt_message(12, 75, b"MSG", b"QZ", b"TimeUS,Message"))
+        for i in range(500):
+            f.write(record(10, "<Qf", i, i / 4))
+            if i % 3 == 0:
+                f.write(record(11, "<Qii", i, 320000000 + i, 350000000))
+            if i % 50 == 0:
+                f.write(record(12, "<Q64s", i, b"\xa3\x95\x0a text"))
+                f.write(b"\xa3\x95\x63junk")
+    return str(path)
+
+
+def parse_all(path, type_filter=None):
+    with MAVParserLinear(path, type_filter=type_filter) as parser:
+        return parser.parse_all()
+
+
+# -------------------------
+# Test random access
+# -------------------------
+@pytest.mark.parametrize("type_filter", [None, ["GPS", "MSG"]])
+def test_len_and_items_match_parse_all(sample_file, type_filter):
+    expected = parse_all(sample_file, type_filter)
+    with MAVParserLinear(sample_file, type_filter=type_filter) as parser:
+        assert len(parser) == len(expected)
+        assert parser[0] == expected[0]
+        assert parser[-1] == expected[-1]
+        assert parser[10:20] == expected[10:20]
+        assert parser[::7] == expected[::7]
+        with pytest.raises(IndexError):
+            parser[len(expected)]
+
+
+def test_per_type_indexing(sample_file):
+    gps = [msg for msg in parse_all(sample_file) if msg["mavpackettype"] == "GPS"]
+    with MAVParserLinear(sample_file) as parser:
+        assert len(parser["GPS"]) == len(gps)
+        assert parser["GPS"][100:120] == gps[100:120]
+        assert parser["GPS"][-1] == gps[-1]
+        assert list(parser["GPS"]) == gps
+        with pytest.raises(KeyError):
+            parser["BARO"]
+
+
+def test_index_does_not_move_parse_next(sample_file):
+    expected = parse_all(sample_file)
+    with MAVParserLinear(sample_file) as parser:
+        assert parser.parse_next() == expected[0]
+        assert parser[42] == expected[42]
+        assert parser.parse_next() == expected[1]
+
+
+def test_index_offsets_are_headers(sample_file):
+    with open(sample_file, "rb") as f:
+        data = f.read()
+    index = MessageIndex.build(data)
+    assert len(index) == len(parse_all(sample_file))
+    assert all(data[offset : offset + 2] == bytes(HEADER) for offset in index.offsets)
+    assert index.names == ["ATT", "FMT", "GPS", "MSG"]
+
+
+def test_compressed_random_access(sample_file, tmp_path):
+    packed = str(tmp_path / "test_log.bin.gz")
+    compress_log(sample_file, packed, block_size=1024)
+    expected = parse_all(sample_file)
+    with MAVParserLinear(packed) as parser:
+        assert len(parser) == len(expected)
+        assert parser[300:310] == expected[300:310]
@@ -0,0 +1,84 @@
+import pytest
+import json
+import pstats
+import time
+from src.business_logic import profiling
+from src.business_logic.mav_parser_linear import MAVParserLinear
+from src.business_logic.mav_parser_threads import MAVParserThreads
+from tests.helpers import att_gps_log
+
+
+# -------------------------
+# Fixtures
+# -------------------------
+@pytest.fixture
+def sample_file(tmp_path):
+    return att_gps_log(tmp_path / "test_log.bin", 5000)
+
+
+def busy_decode(name: str, seconds: float) -> None:
+    fmt_info = {"Name": name}
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+    del fmt_info
+
+
+def artifacts(directory, suffix=".json"):
+    return sorted(p for p in directory.iterdir() if p.name.endswith(suffix) and p.name != "report.json")
+
+
+# -------------------------
+# Test sampler
+# -------------------------
+def test_sampler_attributes_types():
+    with profiling.StackSampler(interval=0.001) as sampler:
+        busy_decode("IMU", 0.15)
+        busy_decode("GPS", 0.05)
+    report = sampler.report()
+    assert report["samples"] > 10
+    assert report["types"]["IMU"] > report["types"].get("GPS", 0)
+    assert any(name.endswith(":busy_decode") for name in report["functions"])
+
+
+def test_run_ids_are_unique():
+    assert len({profiling.new_run_id() for _ in range(100)}) == 100
+
+
+def test_session_writes_artifacts(tmp_path):
+    with profiling.profile_session(str(tmp_path), "run1", profiler="cprofile"):
+        busy_decode("ATT", 0.05)
+    with profiling.profile_session(str(tmp_path), "run2"):
+        busy_decode("GPS", 0.05)
+
+    (prof,) = artifacts(tmp_path, ".prof")
+    assert pstats.Stats(str(prof)).total_calls > 0
+    report = profiling.merge_profiles(str(tmp_path), "run1")
+    assert report["artifacts"] == 1
+    assert list(report["types"])[0] == "ATT"
+    assert profiling.merge_profiles(str(tmp_path))["artifacts"] == 2
+
+    with pytest.raises(ValueError):
+        with profiling.profile_session(str(tmp_path), "run3", profiler="perf"):
+            pass
+
+
+# -------------------------
+# Test parser integration
+# -------------------------
+def test_linear_profile(sample_file, tmp_path):
+    out = tmp_path / "profile"
+    with MAVParserLinear(sample_file, profile=str(out)) as parser:
+        messages = parser.parse_all()
+    assert len(messages) == 6003
+    assert parser.profile_report["artifacts"] == 1
+    assert json.loads((out / "report.json").read_text()) == parser.profile_report
+
+
+def test_threads_profile_per_chunk(sample_file, tmp_path):
+    out = tmp_path / "profile"
+    parser = MAVParserThreads(sample_file, workers=2, chunk_size=8192, profile=str(out))
+    parser.run()
+    assert len(artifacts(out)) == len(parser.chunks) > 1
+    assert parser.profile_report["artifacts"] == len(parser.chunks)
+    assert len(parser.messages) == 6003
@@ -0,0 +1,101 @@
+import pytest
+import os
+import queue
+from src.business_logic import progress
+from src.business_logic.mav_parser_chunked import MAVParserChunked
+from src.business_logic.mav_parser_linear import MAVParserLinear
+from src.business_logic.mav_parser_process import MAVParserProcess
+from src.business_logic.mav_parser_threads import MAVParserThreads
+from tests.helpers import att_gps_log
+
+
+# -------------------------
+# Fixtures
+# -------------------------
+@pytest.fixture
+def sample_file(tmp_path):
+    return att_gps_log(tmp_path / "test_log.bin", 10000)
+
+
+# -------------------------
+# Test tracker
+# -------------------------
+def test_tracker_throttles_and_finishes():
+    events = []
+    tracker = progress.ProgressTracker(events.append, total_bytes=1000, chunks=4, interval=60)
+    for i in range(4):
+        tracker.chunk_done(i, 250, 10)
+    tracker.finish()
+
+    assert len(events) == 2
+    assert not events[0]["finished"]
+    final = events[-1]
+    assert final["finished"]
+    assert final["bytes"] == 1000 and final["fraction"] == 1.0
+    assert final["messages"] == 40 and final["chunks_done"] == 4
+    assert final["eta_s"] == 0
+
+
+def test_tracker_unknown_total():
+    events = []
+    tracker = progress.ProgressTracker(events.append, total_bytes=None)
+    tracker.update(0, 500, 3, "w1")
+    tracker.finish()
+    assert events[0]["fraction"] is None and events[0]["eta_s"] is None
+    assert list(events[0]["workers"]) == ["w1"]
+    assert "msgs" in progress.format_event(events[0])
+
+
+def test_chunk_checkpoint_throttles():
+    channel = queue.Queue()
+    checkpoint = progress.ChunkCheckpoint(channel, index=2, start=100, interval=60)
+    assert not checkpoint(150, 1)
+    assert not checkpoint(200, 2)
+    assert not checkpoint(300, 3, force=True)
+    assert [channel.get_nowait() for _ in range(channel.qsize())] == [
+        (checkpoint.worker, 2, 50, 1),
+        (checkpoint.worker, 2, 200, 3),
+    ]
+
+
+# -------------------------
+# Test parser integration
+# -------------------------
+@pytest.mark.parametrize("parser_cls", [MAVParserThreads, MAVParserProcess])
+def test_parallel_final_event(sample_file, parser_cls):
+    events = []
+    parser = parser_cls(sample_file, workers=2, chunk_size=16384, progress=events.append)
+    parser.run()
+
+    assert len(parser.chunks) > 1
+    final = events[-1]
+    assert final["finished"] and sum(e["finished"] for e in events) == 1
+    assert final["bytes"] == final["total_bytes"] == os.path.getsize(sample_file)
+    assert final["messages"] == len(parser.messages) == 12003
+    assert final["chunks_done"] == len(parser.chunks)
+    assert final["workers"]
+
+
+def test_dataframes_count_worker_reports(sample_file):
+    pytest.importorskip("pandas")
+    events = []
+    parser = MAVParserThreads(sample_file, workers=2, chunk_size=16384, progress=events.append)
+    frames = parser.to_dataframes()
+    assert events[-1]["messages"] == sum(len(df) for df in frames.values())
+
+
+def test_interpreters_report_chunks(sample_file):
+    events = []
+    parser = MAVParserChunked(sample_file, workers=2, chunk_size=16384, backend="interpreters", progress=events.append)
+    parser.run()
+    assert events[-1]["bytes"] == os.path.getsize(sample_file)
+    assert events[-1]["messages"] == 12003
+
+
+def test_linear_progress(sample_file):
+    events = []
+    with MAVParserLinear(sample_file, progress=events.append) as parser:
+        messages = list(parser.iter_messages())
+    assert events[-1]["finished"]
+    assert events[-1]["bytes"] == events[-1]["total_bytes"] == os.path.getsize(sample_file)
+    assert events[-1]["messages"] == len(messages) == 12003
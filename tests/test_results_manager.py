@@ -0,0 +1,98 @@
+import pytest
+import json
+from src.cli import main
+from src.time_measurements.parser_runners import ParserRunners
+from src.time_measurements.results_manager import ResultsManager, find_regressions
+from tests.helpers import FMT_FMT, fmt_message, record
+
+
+# -------------------------
+# Fixtures
+# -------------------------
+@pytest.fixture
+def sample_file(tmp_path):
+    path = tmp_path / "test_log.bin"
+    with open(path, "wb") as f:
+        f.write(FMT_FMT)
+        f.write(fmt_message(10, 15, b"ATT", b"Qf", b"TimeUS,Roll"))
+        for i in range(100):
+            f.write(record(10, "<Qf", i * 100, 1.5))
+    return str(path)
+
+
+def run(times, commit="abc123", **tags):
+    results = [
+        {"category": "all messages", "library": library, "save": True, "time": t, "workers": workers}
+        for library, (t, workers) in times.items()
+    ]
+    machine = {"cpu": "cpu", "cpu_count": 4, "python": "3.12", "file": "log.bin", "file_size": 1 << 20}
+    return {"commit": commit, **machine, **tags, "results": results}
+
+
+# -------------------------
+# Test history
+# -------------------------
+def test_save_appends_history(tmp_path, sample_file):
+    manager = ResultsManager(str(tmp_path / "results.json"))
+    rows = [{"category": "all messages", "library": "one run", "save": True, "time": 1.0, "workers": 1}]
+    manager.save(rows, file_path=sample_file, config={"workers": None})
+    manager.save(rows, file_path=sample_file)
+
+    assert manager.history_file == str(tmp_path / "results.history.jsonl")
+    assert manager.load() == rows
+    history = ResultsManager(str(tmp_path / "results.json")).load_history()
+    assert len(history) == 2
+    assert history[0]["results"] == rows
+    assert history[0]["file_size"] > 0
+    assert history[0]["config"] == {"workers": None}
+    assert {"commit", "python", "cpu", "timestamp"} <= set(history[0])
+
+
+# -------------------------
+# Test regression flags
+# -------------------------
+def test_find_regressions_against_median():
+    history = [
+        run({"process": (1.0, 4), "threads": (2.0, 4)}),
+        run({"process": (1.2, 4), "threads": (2.0, 4)}),
+        run({"process": (0.9, 4), "threads": (2.1, 4)}),
+        run({"process": (1.25, 4), "threads": (2.1, 4)}, commit="def456"),
+    ]
+    flagged = find_regressions(history, threshold=0.1)
+    assert [(r["library"], r["baseline"], r["commit"]) for r in flagged] == [("process", 1.0, "def456")]
+    assert find_regressions(history, threshold=0.3) == []
+
+
+def test_regressions_ignore_other_machines_workers_and_config():
+    history = [
+        run({"process": (1.0, 4)}, cpu="other"),
+        run({"process": (1.0, 2)}),
+        run({"process": (1.0, 4)}, config={"chunk_size": 1 << 20, "io": "pread"}),
+        run({"process": (5.0, 4)}, config={"chunk_size": 1 << 16, "io": "pread"}),
+    ]
+    assert find_regressions(history) == []
+    history.append(run({"process": (5.0, 4)}, config={"chunk_size": 1 << 20, "io": "pread"}))
+    assert [row["baseline"] for row in find_regressions(history)] == [1.0]
+
+
+def test_history_frame_flags_rows():
+    pytest.importorskip("pandas")
+    from src.time_measurements.graph_plotter import history_frame
+
+    frame = history_frame([run({"process": (1.0, 4)}), run({"process": (2.0, 4)}, commit="slow")])
+    assert frame["regression"].tolist() == [False, True]
+    assert frame["throughput"].tolist() == [1.0, 0.5]
+
+
+def test_cli_bench_check(tmp_path, sample_file, capsys, monkeypatch):
+    results = str(tmp_path / "results.json")
+    err = ""
+    for elapsed, status in [(1.0, 0), (1.05, 0), (2.0, 1)]:
+        rows = [{"category": "all messages", "library": "one run", "save": True, "time": elapsed, "workers": 1}]
+        monkeypatch.setattr(ParserRunners, "run_all", lambda self, **kwargs: rows)
+        assert main(["bench", sample_file, "--modes", "linear", "--save", results, "--check"]) == status
+        # stdout carries only the rows, so it can be piped
+        captured = capsys.readouterr()
+        assert [json.loads(line) for line in captured.out.splitlines()] == rows
+        err += captured.err
+    assert "regression: one run (all messages, workers=1) 2.000s vs baseline 1.025s" in err
@@ -0,0 +1,165 @@
+import gzip
+from functools import partial
+import pytest
+from src.business_logic.mav_core import scan_fmts
+from src.business_logic.mav_parser_chunked import MAVParserChunked
+from src.business_logic.mav_parser_linear import MAVParserLinear
+from src.business_logic.mav_parser_process import MAVParserProcess
+from src.business_logic.mav_parser_threads import MAVParserThreads
+from src.business_logic.segments import detect_segments, log_segments, plan_segments, segment_ranges
+from tests.helpers import FMT_FMT, fmt_message, record
+
+
+# -------------------------
+# Fixtures
+# -------------------------
+def write_log(path, landing: bool = True, arming: bool = True) -> str:
+    """IMU at every step; armed 200..699 (flying 300..599) and from 900 to the end (flying from 950 to 1099)."""
+    events = {200: [10], 300: [28], 600: [18], 700: [11], 900: [10], 950: [28], 1100: [18]}
+    arm_states = {200: 1, 700: 0, 900: 1}
+    modes = {0: 0, 300: 3, 1000: 6}
+    with open(path, "wb") as f:
+        f.write(FMT_FMT)
+        f.write(fmt_message(20, 12, b"ARM", b"QB", b"TimeUS,ArmState"))
+        f.write(fmt_message(21, 12, b"EV", b"QB", b"TimeUS,Id"))
+        f.write(fmt_message(22, 13, b"MODE", b"QMB", b"TimeUS,Mode,ModeNum"))
+        f.write(fmt_message(23, 15, b"IMU", b"Qf", b"TimeUS,AccX"))
+        for i in range(1200):
+            t = i * 1000
+            if i in modes:
+                f.write(record(22, "<QBB", t, modes[i], modes[i]))
+            if arming and i in arm_states:
+                f.write(record(20, "<QB", t, arm_states[i]))
+            for event in events.get(i, []) if arming else []:
+                if landing or event in (10, 11):
+                    f.write(record(21, "<QB", t, event))
+            f.write(record(23, "<Qf", t, 0.5 * i))
+    return str(path)
+
+
+@pytest.fixture
+def sample_file(tmp_path):
+    return write_log(tmp_path / "test_log.bin")
+
+
+def imu_times(messages):
+    return [msg["TimeUS"] for msg in messages if msg["mavpackettype"] == "IMU"]
+
+
+FLIGHT = [i * 1000 for i in [*range(300, 600), *range(950, 1100)]]
+ARMED = [i * 1000 for i in [*range(200, 700), *range(900, 1200)]]
+
+
+# -------------------------
+# Test the segment table
+# -------------------------
+def test_flight_and_armed_tables(sample_file):
+    flight = log_segments(sample_file)
+    assert [(row["kind"], row["start_TimeUS"], row["end_TimeUS"]) for row in flight] == [
+        ("flight", 300_000, 600_000),
+        ("flight", 950_000, 1_100_000),
+    ]
+    assert flight[0]["modes"] == [3] and flight[1]["modes"] == [3, 6]
+    armed = log_segments(sample_file, "armed")
+    assert [(row["start_TimeUS"], row["end_TimeUS"]) for row in armed] == [(200_000, 700_000), (900_000, None)]
+    assert armed[-1]["end"] == len(open(sample_file, "rb").read())
+    assert all(row["bytes"] == row["end"] - row["start"] for row in armed)
+
+
+def test_fallbacks(tmp_path):
+    # no landing events: flight falls back to armed
+    no_landing = log_segments(write_log(tmp_path / "a.bin", landing=False))
+    assert [(row["kind"], row["start_TimeUS"]) for row in no_landing] == [("flight", 200_000), ("flight", 900_000)]
+    # no arming records: one row covering the whole log
+    path = write_log(tmp_path / "b.bin", arming=False)
+    (row,) = log_segments(path)
+    assert row["kind"] == "log" and row["start"] == 0 and row["end"] == len(open(path, "rb").read())
+    assert row["modes"] == [0, 3, 6]
+    with pytest.raises(ValueError):
+        log_segments(path, "landed")
+
+
+def test_ranges_merge_and_plan(sample_file):
+    data = open(sample_file, "rb").read()
+    fmts = scan_fmts(data)
+    table, ranges = segment_ranges(data, fmts, [(5000, 9000), (0, 100), (8000, 12000), (15000, 10**9)])
+    assert table == [] and ranges == [(0, 100), (5000, 12000), (15000, len(data))]
+    _, ranges = segment_ranges(data, fmts, "flight")
+    chunks = plan_segments(data, fmts, ranges, 8)
+    assert len(chunks) >= 2 and chunks[0][0] == ranges[0][0] and chunks[-1][1] == ranges[-1][1]
+    assert all(start < end for start, end in chunks)
+    assert detect_segments(data, fmts)[0]["start"] == ranges[0][0]
+
+
+# -------------------------
+# Test the parsers
+# -------------------------
+def linear_messages(path, segments, io="mmap"):
+    with MAVParserLinear(path, segments=segments, io=io) as parser:
+        return parser.parse_all()
+
+
+def linear_columns(path, segments, io="mmap"):
+    with MAVParserLinear(path, segments=segments, io=io) as parser:
+        columns = parser.parse_columns()
+    return [{"mavpackettype": "IMU", "TimeUS": t} for t in columns["IMU"]["TimeUS"]]
+
+
+def compressed_messages(path, segments):
+    with open(path, "rb") as f:
+        data = f.read()
+    with open(path + ".gz", "wb") as f:
+        f.write(gzip.compress(data))
+    return linear_messages(path + ".gz", segments)
+
+
+def parallel(cls, **kwargs):
+    def run(path, segments):
+        parser = cls(path, workers=2, chunk_size=2000, segments=segments, **kwargs)
+        parser.run()
+        assert len(parser.chunks) > 2 and parser.segment_table
+        return parser.messages
+
+    return run
+
+
+@pytest.mark.parametrize(
+    "parse",
+    [
+        linear_messages,
+        linear_columns,
+        partial(linear_messages, io="pread"),
+        partial(linear_columns, io="pread"),
+        compressed_messages,
+        parallel(MAVParserThreads),
+        parallel(MAVParserProcess),
+        parallel(MAVParserChunked, backend="serial"),
+    ],
+)
+@pytest.mark.parametrize("segments, expected", [("flight", FLIGHT), ("armed", ARMED)])
+def test_parsers_decode_only_segments(sample_file, parse, segments, expected):
+    assert imu_times(parse(sample_file, segments)) == expected
+
+
+def test_linear_segment_table_and_summary(sample_file):
+    with MAVParserLinear(sample_file, segments="flight") as parser:
+        assert len(parser.segment_table) == 2
+        messages = parser.parse_all()
+    assert {msg["mavpackettype"] for msg in messages} == {"IMU", "EV", "MODE"}
+    with MAVParserLinear(sample_file) as parser:
+        assert parser.segment_table == []
+
+    parser = MAVParserChunked(sample_file, workers=2, segments="flight")
+    summary = parser.summarize()
+    assert summary["types"]["IMU"]["count"] == len(FLIGHT)
+    assert summary["size"] == sum(row["bytes"] for row in parser.segment_table)
+
+
+@pytest.mark.parametrize("segments", ["flight", "armed", [(5000, 9000), (20000, 21000)]])
+def test_index_covers_only_segments(sample_file, segments):
+    with MAVParserLinear(sample_file, segments=segments) as parser:
+        messages = parser.parse_all()
+    with MAVParserLinear(sample_file, segments=segments) as parser:
+        assert len(parser) == len(messages)
+        assert parser[:] == messages
+        assert imu_times(parser["IMU"]) == imu_times(messages)
@@ -0,0 +1,265 @@
+import pytest
+import gzip
+import json
+import os
+from src.business_logic.mav_parser_linear import MAVParserLinear, HEADER
+from src.business_logic.mav_parser_process import MAVParserProcess
+from src.business_logic.mav_parser_threads import MAVParserThreads
+from src.business_logic.mav_parser_chunked import MAVParserChunked
+from src.business_logic import sources
+from src.business_logic import mav_parser_linear as linear
+from src.business_logic.sources import (
+    BlockReader,
+    INDEX_SUFFIX,
+    IO_STRATEGIES,
+    compress_log,
+    current_io,
+    detect_compression,
+    io_chunk,
+    load_block_index,
+    open_range,
+    pread_range,
+    PrefetchReader,
+)
+from tests.helpers import FMT_FMT, fmt_message, record
+
+
+# -------------------------
+# Fixtures
+# -------------------------
+@pytest.fixture
+def sample_file(tmp_path):
+    path = tmp_path / "test_log.bin"
+    with open(path, "wb") as f:
+        f.write(FMT_FMT)
+        f.write(fmt_message(10, 15, b"ATT", b"Qf", b"TimeUS,Roll"))
+        f.write(fmt_message(11, 22, b"GPS", b"QLLcB", b"TimeUS,Lat,Lng,Alt,NSats"))
+        for i in range(2000):
+            f.write(record(10, "<Qf", i * 100, 0.25 * i))
+            if i % 4 == 0:
+                f.write(record(11, "<QiihB", i * 100, 320000000 + i, 350000000, 99, 7))
+    return str(path)
+
+
+@pytest.fixture
+def blocked_gz(sample_file):
+    path = sample_file + ".gz"
+    compress_log(sample_file, path, block_size=4096)
+    return path
+
+
+@pytest.fixture
+def single_gz(sample_file):
+    path = sample_file + ".single.gz"
+    with open(sample_file, "rb") as src, gzip.open(path, "wb") as dst:
+        dst.write(src.read())
+    return path
+
+
+def read_raw(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+# -------------------------
+# Test the block index
+# -------------------------
+def test_detect_compression(sample_file, blocked_gz):
+    assert detect_compression(sample_file) is None
+    assert detect_compression(blocked_gz) == "gzip"
+
+
+def test_index_is_cached(blocked_gz, single_gz, block_index_dir):
+    # compress_log wrote the index to the cache directory, not next to the archive
+    (cached,) = block_index_dir.iterdir()
+    assert not os.path.exists(blocked_gz + INDEX_SUFFIX)
+    compression, blocks = load_block_index(blocked_gz)
+    assert compression == "gzip" and len(blocks) > 10
+
+    cached.unlink()
+    assert load_block_index(blocked_gz)[1] == blocks  # rebuilt by walking the members
+    assert len(load_block_index(single_gz)[1]) == 1
+    assert len(list(block_index_dir.iterdir())) == 2
+
+
+def test_stale_index_is_rebuilt(blocked_gz, block_index_dir):
+    blocks = load_block_index(blocked_gz)[1]
+    (cached,) = block_index_dir.iterdir()
+    payload = json.loads(cached.read_text())
+    payload["blocks"] = payload["blocks"][:1]
+    cached.write_text(json.dumps(payload))
+    assert load_block_index(blocked_gz)[1] == blocks[:1]
+
+    # same size, new mtime: the archive was rewritten, so the index is not trusted
+    stat = os.stat(blocked_gz)
+    os.utime(blocked_gz, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert load_block_index(blocked_gz)[1] == blocks
+
+
+def test_block_reader_random_access(sample_file, blocked_gz):
+    raw = read_raw(sample_file)
+    with BlockReader(blocked_gz) as reader:
+        assert len(reader) == len(raw)
+        for start in range(0, len(raw), 977):
+            assert reader[start] == raw[start]
+            assert reader[start : start + 5000] == raw[start : start + 5000]
+            assert reader.find(bytes(HEADER) + bytes([11]), start) == raw.find(bytes(HEADER) + bytes([11]), start)
+        # a pattern split across a block boundary
+        assert reader.find(raw[4094:4098], 4000) == raw.find(raw[4094:4098], 4000)
+
+
+# -------------------------
+# Test the parsers on compressed input
+# -------------------------
+@pytest.mark.parametrize("archive", ["blocked_gz", "single_gz"])
+def test_linear_streams_compressed(request, sample_file, archive):
+    path = request.getfixturevalue(archive)
+    with MAVParserLinear(sample_file) as plain, MAVParserLinear(path) as packed:
+        assert packed.parse_all() == plain.parse_all()
+    with MAVParserLinear(sample_file, type_filter=["GPS"]) as plain:
+        with MAVParserLinear(path, type_filter=["GPS"]) as packed:
+            assert list(packed.iter_index()) == list(plain.iter_index())
+
+
+def test_linear_columns_after_streaming(sample_file, blocked_gz):
+    with MAVParserLinear(sample_file) as plain, MAVParserLinear(blocked_gz) as packed:
+        for _ in range(100):
+            assert packed.parse_next() == plain.parse_next()
+        assert packed.parse_columns() == plain.parse_columns()
+
+
+@pytest.mark.parametrize("parser_cls", [MAVParserThreads, MAVParserProcess])
+def test_parallel_parsers_split_blocks(sample_file, blocked_gz, parser_cls):
+    plain = parser_cls(sample_file, workers=2, chunk_size=8192)
+    plain.run()
+    packed = parser_cls(blocked_gz, workers=2, chunk_size=8192)
+    packed.run()
+    assert len(packed.chunks) > 1
+    assert packed.messages == plain.messages
+
+
+def test_zstd_roundtrip(sample_file):
+    pytest.importorskip("zstandard")
+    path = sample_file + ".zst"
+    compress_log(sample_file, path, compression="zstd", block_size=4096)
+    assert detect_compression(path) == "zstd"
+    with MAVParserLinear(sample_file) as plain, MAVParserLinear(path) as packed:
+        assert packed.parse_all() == plain.parse_all()
+    with BlockReader(path) as reader:
+        assert reader[0 : len(reader)] == read_raw(sample_file)
+
+
+# -------------------------
+# Test the I/O strategies
+# -------------------------
+def range_bytes(path, start, end, io):
+    with open_range(path, start, end, io) as (buf, rel_start, rel_end):
+        return bytes(buf[rel_start:rel_end])
+
+
+def io_of_chunk(args):
+    return current_io()
+
+
+@pytest.mark.parametrize("io", IO_STRATEGIES)
+def test_open_range_strategies(sample_file, io):
+    raw = read_raw(sample_file)
+    for start, end in ((0, 89), (5000, 9000), (4095, 4097), (len(raw) - 100, len(raw)), (700, 700)):
+        assert range_bytes(sample_file, start, end, io) == raw[start:end]
+
+
+def test_pread_range_is_page_aligned(sample_file):
+    raw = read_raw(sample_file)
+    with open(sample_file, "rb") as f:
+        data, base = pread_range(f.fileno(), 5000, 9000)
+    assert base % 4096 == 0 and base <= 5000 and bytes(data) == raw[base:9000]
+    with pytest.raises(ValueError):
+        range_bytes(sample_file, 0, 10, "direct")
+
+
+def test_prefetch_reader_reads_ranges(sample_file):
+    raw = read_raw(sample_file)
+    for start, end in ((0, None), (5000, 9000), (4095, 4097), (len(raw) - 100, len(raw)), (700, 700), (0, 10**9)):
+        with PrefetchReader(sample_file, start, end, window=4096) as reader:
+            assert reader.read() == raw[start:end]
+    # closed half-way: the prefetch thread stops and the file is released
+    reader = PrefetchReader(sample_file, window=4096)
+    assert reader.read(10) == raw[:10]
+    reader.close()
+    assert reader.read(10) == b""
+
+
+def test_pread_streams_bounded_windows(sample_file, monkeypatch):
+    with MAVParserLinear(sample_file) as parser:
+        expected = parser.parse_all()
+    with MAVParserLinear(sample_file) as parser:
+        columns = parser.parse_columns()
+
+    sizes = []
+    preadv = os.preadv
+
+    def recording_preadv(fd, buffers, offset):
+        sizes.append(sum(len(buf) for buf in buffers))
+        return preadv(fd, buffers, offset)
+
+    monkeypatch.setattr(os, "preadv", recording_preadv)
+    monkeypatch.setattr(sources, "PREAD_WINDOW", 4096)
+    with MAVParserLinear(sample_file, io="pread") as parser:
+        assert parser.parse_all() == expected
+    with MAVParserLinear(sample_file, io="pread") as parser:
+        assert parser.parse_columns() == columns
+    with MAVParserLinear(sample_file, io="pread", type_filter=["GPS"]) as parser:
+        assert parser.parse_columns() == {"GPS": columns["GPS"]}
+    for backend in ("serial", "threads"):
+        parser = MAVParserChunked(sample_file, workers=2, chunk_size=20000, backend=backend, io="pread")
+        parser.run()
+        assert parser.messages == expected
+        arrays = parser.to_arrays()
+        assert {name: {col: arrays.column(name, col) for col in columns[name]} for name in arrays} == columns
+    assert len(sizes) > 20 and max(sizes) <= 4096
+    # header-only work reads a chunk in one piece
+    assert parser.summarize()["types"]["ATT"]["count"] == 2000
+
+
+def test_madvise_releases_on_every_scan(sample_file, monkeypatch):
+    released = []
+
+    def recording_advise(mapped, fd, start, end, advice):
+        if advice == "DONTNEED":
+            released.append((start, end))
+
+    monkeypatch.setattr(linear, "advise", recording_advise)
+    monkeypatch.setattr(linear, "RELEASE_STEP", 4096)
+    size = os.path.getsize(sample_file)
+    with MAVParserLinear(sample_file, io="madvise") as parser:
+        while parser.parse_next():
+            pass
+    # the plain parse_next loop drops pages as it goes, not only at the end
+    assert len(released) > 1 and all(end - start >= 4096 for start, end in released[:-1])
+    for scan in ("parse_columns", "to_dataframes", "to_arrays", "parse_all"):
+        released.clear()
+        with MAVParserLinear(sample_file, io="madvise") as parser:
+            getattr(parser, scan)()
+        assert released and released[-1][1] == size, scan
+
+
+def test_io_chunk_sets_strategy():
+    assert io_chunk((__name__, "io_of_chunk", "pread", ())) == "pread"
+    assert current_io() == "mmap"
+
+
+@pytest.mark.parametrize("io", IO_STRATEGIES)
+def test_parsers_match_across_strategies(sample_file, io):
+    with MAVParserLinear(sample_file) as parser:
+        expected = parser.parse_all()
+    with MAVParserLinear(sample_file, io=io) as parser:
+        assert parser.parse_all() == expected
+    with MAVParserLinear(sample_file, io=io) as parser:
+        assert len(parser.parse_columns()["ATT"]["TimeUS"]) == 2000
+    for parser in (
+        MAVParserThreads(sample_file, workers=2, chunk_size=8192, io=io),
+        MAVParserProcess(sample_file, workers=2, chunk_size=8192, io=io),
+        MAVParserChunked(sample_file, workers=2, chunk_size=8192, backend="interpreters", io=io),
+    ):
+        parser.run()
+        assert len(parser.chunks) > 1 and parser.messages == expected
@@ -0,0 +1,146 @@
+import json
+import os
+import pytest
+import random
+import socket
+import threading
+import time
+from src.business_logic.mav_core import MAX_RECORD, iter_records
+from src.business_logic.mav_parser_linear import MAVParserLinear, FMT_TYPE
+from src.business_logic.stream_reader import MAVStreamReader
+from src.cli import main
+from tests.helpers import FMT_FMT, fmt_message, record
+
+
+# -------------------------
+# Fixtures
+# -------------------------
+def log_bytes(garbage: bool = False) -> bytes:
+    """ATT, scaled GPS and string MSG records; with ``garbage``, junk (and stray header bytes) between them."""
+    rng = random.Random(7)
+    parts = [
+        FMT_FMT,
+        fmt_message(10, 15, b"ATT", b"Qf", b"TimeUS,Roll"),
+        fmt_message(11, 19, b"GPS", b"QLL", b"TimeUS,Lat,Lng"),
+        fmt_message(12, 75, b"MSG", b"QZ", b"TimeUS,Message"),
+    ]
+    for i in range(3000):
+        parts.append(record(10, "<Qf", i * 100, 0.25 * i))
+        if i % 10 == 0:
+            parts.append(record(11, "<Qii", i * 100, 320000000 + i, 350000000))
+        if i % 500 == 0:
+            parts.append(record(12, "<Q64s", i * 100, b"EKF3 IMU0 in-flight yaw"))
+        if garbage and i % 37 == 0:
+            parts.append(bytes(rng.choice([0x00, 0x13, 0xA3, 0xFF]) for _ in range(rng.randrange(1, 9))))
+    return b"".join(parts)
+
+
+@pytest.fixture
+def sample_file(tmp_path):
+    path = tmp_path / "test_log.bin"
+    path.write_bytes(log_bytes())
+    return str(path)
+
+
+def expected_messages(path):
+    with MAVParserLinear(path) as parser:
+        return parser.parse_all()
+
+
+def send_in_pieces(write, data: bytes, seed: int = 1, pause: float = 0.0) -> None:
+    """Write ``data`` in random piece sizes, down to single bytes, so records split across reads."""
+    rng = random.Random(seed)
+    pos = 0
+    while pos < len(data):
+        size = rng.choice([1, 2, 3, 17, 90, 1000, 5000])
+        write(data[pos : pos + size])
+        pos += size
+        if pause and rng.random() < 0.01:
+            time.sleep(pause)
+
+
+def pipe_with(data: bytes):
+    """Read end of a pipe that a writer thread feeds ``data`` into, in pieces."""
+    read_fd, write_fd = os.pipe()
+
+    def feed():
+        send_in_pieces(lambda piece: os.write(write_fd, piece), data)
+        os.close(write_fd)
+
+    writer = threading.Thread(target=feed)
+    writer.start()
+    return os.fdopen(read_fd, "rb"), writer
+
+
+@pytest.fixture
+def tcp_server():
+    """A local stand-in for the vehicle gateway: serves ``data`` to the first client, in pieces."""
+    server = socket.create_server(("127.0.0.1", 0))
+    served = {}
+
+    def serve():
+        conn, _ = server.accept()
+        with conn:
+            send_in_pieces(conn.sendall, served["data"], pause=0.001)
+
+    def start(data: bytes) -> str:
+        served["data"] = data
+        threading.Thread(target=serve, daemon=True).start()
+        return "127.0.0.1:%d" % server.getsockname()[1]
+
+    yield start
+    server.close()
+
+
+# -------------------------
+# Test the record walk
+# -------------------------
+def test_buffer_stays_bounded():
+    data = log_bytes()
+    stream, writer = pipe_with(data)
+    fmts = {}
+    count = 0
+    with stream:
+        for offset, msg_type, buf, pos in iter_records(stream, fmts, read_size=100):
+            assert len(buf) == 100 + MAX_RECORD
+            assert buf[pos : pos + 3] == data[offset : offset + 3]
+            if msg_type == FMT_TYPE:
+                fmts[buf[pos + 3]] = {"Length": buf[pos + 4]}
+            count += 1
+    writer.join()
+    assert count == 3000 + 300 + 6 + 4
+
+
+# -------------------------
+# Test the reader
+# -------------------------
+@pytest.mark.parametrize("garbage", [False, True])
+def test_pipe_matches_linear(tmp_path, sample_file, garbage):
+    data = log_bytes(garbage)
+    path = tmp_path / "dirty.bin"
+    path.write_bytes(data)
+    stream, writer = pipe_with(data)
+    with stream, MAVStreamReader(stream, read_size=512) as reader:
+        messages = reader.parse_all()
+    writer.join()
+    assert messages == expected_messages(str(path))
+    # garbage between records is skipped without losing any of them
+    assert messages == expected_messages(sample_file)
+    assert reader.offset == len(data)
+
+
+def test_socket_and_type_filter(tcp_server, sample_file):
+    address = tcp_server(log_bytes())
+    host, port = address.split(":")
+    with socket.create_connection((host, int(port))) as sock:
+        gps = list(MAVStreamReader(sock, type_filter=["GPS"]))
+    assert gps == [msg for msg in expected_messages(sample_file) if msg["mavpackettype"] == "GPS"]
+    assert gps[1]["Lat"] == 32.000001
+
+
+def test_cli_dump_from_socket(tcp_server, capsys):
+    address = tcp_server(log_bytes(garbage=True))
+    assert main(["dump", "tcp://" + address, "--types", "MSG"]) == 0
+    rows = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [row["TimeUS"] for row in rows] == [0, 50000, 100000, 150000, 200000, 250000]
+    assert rows[0]["Message"] == "EKF3 IMU0 in-flight yaw"
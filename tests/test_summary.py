@@ -0,0 +1,71 @@
+import pytest
+from src.business_logic import summary
+from src.business_logic.mav_core import scan_fmts, walkable_fmts
+from src.business_logic.mav_parser_chunked import MAVParserChunked
+from src.business_logic.mav_parser_linear import MAVParserLinear
+from src.business_logic.sources import compress_log
+from tests.helpers import FMT_FMT, fmt_message, record
+
+
+# -------------------------
+# Fixtures
+# -------------------------
+@pytest.fixture
+def sample_file(tmp_path):
+    """ATT every 100us, GPS every 500us (TimeUS second), PARM without TimeUS."""
+    path = tmp_path / "test_log.bin"
+    with open(path, "wb") as f:
+        f.write(FMT_FMT)
+        f.write(fmt_message(10, 15, b"ATT", b"Qf", b"TimeUS,Roll"))
+        f.write(fmt_message(11, 20, b"GPS", b"BQLL", b"I,TimeUS,Lat,Lng"))
+        f.write(fmt_message(12, 23, b"PARM", b"Nf", b"Name,Value"))
+        f.write(record(12, "<16sf", b"\xa3\x95\x0a", 1.0))
+        for i in range(1, 1001):
+            f.write(record(10, "<Qf", i * 100, 0.5))
+            if i % 5 == 0:
+                f.write(record(11, "<BQii", 0, i * 100, 320000000, 350000000))
+    return str(path)
+
+
+# -------------------------
+# Test summarize
+# -------------------------
+def test_summary_matches_decoded_log(sample_file):
+    result = MAVParserChunked(sample_file, chunk_size=2048).summarize()
+    with MAVParserLinear(sample_file) as parser:
+        messages = parser.parse_all()
+
+    counts = {}
+    for msg in messages:
+        counts[msg["mavpackettype"]] = counts.get(msg["mavpackettype"], 0) + 1
+    assert {name: entry["count"] for name, entry in result["types"].items()} == counts
+
+    att, gps = result["types"]["ATT"], result["types"]["GPS"]
+    assert (att["first_TimeUS"], att["last_TimeUS"], att["bytes"]) == (100, 100000, 15000)
+    assert (gps["first_TimeUS"], gps["last_TimeUS"], gps["type"]) == (500, 100000, 11)
+    assert result["types"]["PARM"]["first_TimeUS"] is None
+    assert result["duration_s"] == pytest.approx(0.0999)
+    assert result["fmts"][11]["Columns"] == ["I", "TimeUS", "Lat", "Lng"]
+    assert result["messages"] == len(messages)
+
+
+def test_summary_type_filter(sample_file):
+    result = MAVParserChunked(sample_file, type_filter=["GPS"]).summarize()
+    assert list(result["types"]) == ["GPS"]
+    assert len(result["fmts"]) == 4
+
+
+def test_walk_and_bulk_counts_agree(sample_file):
+    pytest.importorskip("numpy")
+    with open(sample_file, "rb") as f:
+        data = f.read()
+    fmts = walkable_fmts(scan_fmts(data))
+    for start, end in [(0, len(data)), (400, 9000)]:
+        assert summary._bulk_counts(data, start, end, fmts) == summary._walk_counts(data, start, end, fmts)
+
+
+def test_summary_of_compressed_log(sample_file):
+    compress_log(sample_file, sample_file + ".gz", block_size=1024)
+    plain = MAVParserChunked(sample_file, chunk_size=1024).summarize()
+    packed = MAVParserChunked(sample_file + ".gz", chunk_size=1024).summarize()
+    assert packed == plain
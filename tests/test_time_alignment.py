@@ -0,0 +1,99 @@
+import random
+import pytest
+from src.business_logic import time_alignment
+from src.business_logic.mav_parser_linear import MAVParserLinear
+from src.business_logic.time_alignment import asof_indices, align_columns, align_log
+from tests.helpers import FMT_FMT, fmt_message, record
+
+
+# -------------------------
+# Fixtures
+# -------------------------
+@pytest.fixture
+def sample_file(tmp_path):
+    """ATT at 50 Hz and GPS at 5 Hz over 0.4 s."""
+    path = tmp_path / "test_log.bin"
+    with open(path, "wb") as f:
+        f.write(FMT_FMT)
+        f.write(fmt_message(10, 15, b"ATT", b"Qf", b"TimeUS,Roll"))
+        f.write(fmt_message(11, 19, b"GPS", b"QLL", b"TimeUS,Lat,Lng"))
+        for i in range(20):
+            time_us = i * 20_000
+            if i % 10 == 0:
+                f.write(record(11, "<Qii", time_us + 5, 320000000 + i, 350000000))
+            f.write(record(10, "<Qf", time_us, float(i)))
+    return str(path)
+
+
+# -------------------------
+# Test parse_columns
+# -------------------------
+def test_parse_columns(sample_file):
+    with MAVParserLinear(sample_file, type_filter=["ATT", "GPS"]) as parser:
+        tables = parser.parse_columns()
+    assert set(tables) == {"ATT", "GPS"}
+    assert tables["ATT"]["TimeUS"] == [i * 20_000 for i in range(20)]
+    assert tables["ATT"]["Roll"][3] == 3.0
+    assert tables["GPS"]["TimeUS"] == [5, 200_005]
+    assert tables["GPS"]["Lat"] == [32.0, 32.000001]
+
+
+# -------------------------
+# Test asof_indices
+# -------------------------
+def test_asof_indices_directions():
+    left = [0, 10, 20, 30]
+    right = [9, 21]
+    assert asof_indices(left, right, direction="backward") == [-1, 0, 0, 1]
+    assert asof_indices(left, right, direction="forward") == [0, 1, 1, -1]
+    assert asof_indices(left, right, direction="nearest") == [0, 0, 1, 1]
+    assert asof_indices(left, right, tolerance=2, direction="nearest") == [-1, 0, 1, -1]
+
+
+@pytest.mark.parametrize("direction", ["backward", "forward", "nearest"])
+@pytest.mark.parametrize("tolerance", [None, 0, 3])
+def test_searchsorted_matches_merge(direction, tolerance):
+    pytest.importorskip("numpy")
+    rng = random.Random(7)
+    left = sorted(rng.randrange(100) for _ in range(200))
+    for right in ([], [50], sorted(rng.randrange(100) for _ in range(40)), [float(v) for v in range(0, 100, 7)]):
+        expected = time_alignment._merge_indices(left, right, tolerance, direction)
+        assert time_alignment._searchsorted_indices(left, right, tolerance, direction) == expected
+
+
+def test_asof_indices_bad_direction():
+    with pytest.raises(ValueError):
+        asof_indices([1], [1], direction="sideways")
+
+
+# -------------------------
+# Test align_columns
+# -------------------------
+def test_align_columns_unsorted_input():
+    tables = {
+        "A": {"TimeUS": [1, 2, 3], "X": [10, 20, 30]},
+        "B": {"TimeUS": [3, 1], "Y": ["c", "a"]},
+    }
+    aligned = align_columns(tables, ["A", "B"])
+    assert aligned["TimeUS"] == [1, 2, 3]
+    assert aligned["A.X"] == [10, 20, 30]
+    assert aligned["B.Y"] == ["a", "a", "c"]
+    assert aligned["B.TimeUS"] == [1, 1, 3]
+
+
+def test_align_columns_missing_type():
+    with pytest.raises(ValueError):
+        align_columns({"A": {"TimeUS": [1]}}, ["A", "B"])
+
+
+# -------------------------
+# Test align_log
+# -------------------------
+def test_align_log(sample_file):
+    aligned = align_log(sample_file, ["ATT", "GPS"], tolerance=100_000)
+    assert len(aligned["TimeUS"]) == 20
+    assert aligned["GPS.Lat"][0] is None
+    assert aligned["GPS.Lat"][1] == 32.0
+    assert aligned["GPS.TimeUS"][5] == 5
+    assert aligned["GPS.TimeUS"][6] is None
+    assert aligned["GPS.Lat"][11] == 32.000001
@@ -0,0 +1,111 @@
+import pytest
+from src.business_logic.mav_core import scan_fmts
+from src.business_logic.mav_parser_linear import MAVParserLinear
+from src.business_logic.mav_parser_process import MAVParserProcess
+from src.business_logic.mav_parser_threads import MAVParserThreads
+from src.business_logic.units import scan_units
+from tests.helpers import FMT_FMT, fmt_message, record
+
+
+# -------------------------
+# Fixtures
+# -------------------------
+@pytest.fixture
+def sample_file(tmp_path):
+    """A log whose BAT type is described by FMTU/UNIT/MULT messages; Volt and Curr have no configured scaler."""
+    path = tmp_path / "test_log.bin"
+    with open(path, "wb") as f:
+        f.write(FMT_FMT)
+        f.write(fmt_message(20, 76, b"UNIT", b"QbZ", b"TimeUS,Id,Label"))
+        f.write(fmt_message(21, 20, b"MULT", b"Qbd", b"TimeUS,Id,Mult"))
+        f.write(fmt_message(22, 44, b"FMTU", b"QBNN", b"TimeUS,FmtType,UnitIds,MultIds"))
+        f.write(fmt_message(30, 25, b"BAT", b"QHhcLf", b"TimeUS,Volt,Curr,Temp,Lat,Rem"))
+        f.write(fmt_message(31, 15, b"ATT", b"Qf", b"TimeUS,Roll"))
+        for unit_id, label in ((b"s", b"s"), (b"v", b"V"), (b"A", b"A"), (b"O", b"degC"), (b"D", b"deglatitude")):
+            f.write(record(20, "<Qb64s", 0, unit_id[0], label))
+        f.write(record(20, "<Qb64s", 0, ord("%"), b"%"))
+        for mult_id, mult in ((b"F", 1e-6), (b"B", 1e-2), (b"G", 1e-7), (b"0", 1.0), (b"-", 0.0)):
+            f.write(record(21, "<Qbd", 0, mult_id[0], mult))
+        f.write(record(22, "<QB16s16s", 0, 30, b"svAODA", b"FBBBG0"))
+        for i in range(300):
+            f.write(record(30, "<QHhhif", i * 1000, 1234 + i, -50, 2550, 320000000 + i, 87.5))
+            f.write(record(31, "<Qf", i * 1000, 1.5))
+    return str(path)
+
+
+# -------------------------
+# Test the tables
+# -------------------------
+def test_scan_units(sample_file):
+    with open(sample_file, "rb") as f:
+        data = f.read()
+    log_units = scan_units(data, scan_fmts(data))
+    assert log_units["units"]["v"] == "V" and log_units["units"]["%"] == "%"
+    assert log_units["mults"]["B"] == 1e-2 and log_units["mults"]["-"] == 0.0
+    assert log_units["fields"] == {30: ("svAODA", "FBBBG0")}
+
+
+def test_scan_units_without_tables():
+    data = FMT_FMT
+    assert scan_units(data, scan_fmts(data)) == {"units": {}, "mults": {}, "fields": {}}
+
+
+# -------------------------
+# Test the parsers
+# -------------------------
+def test_config_scaling_unchanged(sample_file):
+    with MAVParserLinear(sample_file, type_filter=["BAT"]) as parser:
+        bat = parser.parse_next()
+        units = parser.units
+    assert bat["Volt"] == 1234 and bat["Curr"] == -50
+    assert bat["Temp"] == 25.5 and bat["Lat"] == 32.0
+    # the configured scale leaves Volt and Curr in hundredths
+    assert units["BAT"]["Volt"] == {"unit": "V", "mult": 1e-2}
+    assert units["BAT"]["Lat"] == {"unit": "deglatitude", "mult": 1}
+    assert units["BAT"]["TimeUS"] == {"unit": "s", "mult": 1e-6}
+    assert "ATT" not in units
+
+
+def test_log_scaling_linear(sample_file):
+    with MAVParserLinear(sample_file, type_filter=["BAT", "ATT"], scaling="log") as parser:
+        bat, att = parser.parse_next(), parser.parse_next()
+        units = parser.units
+        assert parser[0]["Volt"] == bat["Volt"]
+    assert bat == {
+        "mavpackettype": "BAT",
+        "TimeUS": 0,
+        "Volt": 12.34,
+        "Curr": -0.5,
+        "Temp": 25.5,
+        "Lat": 32.0,
+        "Rem": 87.5,
+    }
+    assert att == {"mavpackettype": "ATT", "TimeUS": 0, "Roll": 1.5}
+    assert units["BAT"]["Volt"] == {"unit": "V", "mult": 1}
+    assert units["BAT"]["TimeUS"] == {"unit": "s", "mult": 1e-6}
+
+
+@pytest.mark.parametrize("parser_cls", [MAVParserThreads, MAVParserProcess])
+def test_log_scaling_parallel_matches_linear(sample_file, parser_cls):
+    with MAVParserLinear(sample_file, scaling="log") as linear:
+        expected = linear.parse_all()
+    parser = parser_cls(sample_file, workers=2, chunk_size=4096, scaling="log")
+    parser.run()
+    assert parser.messages == expected
+    assert parser.units["BAT"]["Curr"] == {"unit": "A", "mult": 1}
+
+
+def test_dataframes_carry_units(sample_file):
+    pytest.importorskip("pandas")
+    frames = MAVParserThreads(sample_file, workers=2, scaling="log").to_dataframes()
+    assert frames["BAT"]["Volt"].iloc[1] == pytest.approx(12.35)
+    assert frames["BAT"].attrs["units"]["Volt"]["unit"] == "V"
+    with MAVParserLinear(sample_file) as parser:
+        frames = parser.to_dataframes()
+    assert frames["BAT"].attrs["units"]["Volt"] == {"unit": "V", "mult": 1e-2}
+    assert "units" not in frames["ATT"].attrs
+
+
+def test_unknown_scaling(sample_file):
+    with pytest.raises(ValueError):
+        MAVParserThreads(sample_file, scaling="firmware")